@@ -0,0 +1,47 @@
+"""create weather_slots table
+
+Revision ID: 3f9c2a7d1e44
+Revises: 57065a4b6cb6
+Create Date: 2026-10-18 10:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c2a7d1e44'
+down_revision: Union[str, Sequence[str], None] = '57065a4b6cb6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('weather_slots',
+    sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), autoincrement=True, nullable=False),
+    sa.Column('location', sa.String(), nullable=False),
+    sa.Column('kind', sa.String(length=16), nullable=False),
+    sa.Column('ts', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('fetched_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('temp', sa.Float(), nullable=True),
+    sa.Column('feels_like', sa.Float(), nullable=True),
+    sa.Column('humidity', sa.SmallInteger(), nullable=True),
+    sa.Column('wind', sa.Float(), nullable=True),
+    sa.Column('rain', sa.Float(), nullable=True),
+    sa.Column('snow', sa.Float(), nullable=True),
+    sa.Column('description', sa.String(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    # 시간 순 append -> BRIN (block 범위별 min/max만 저장해 btree보다 훨씬 작음)
+    op.create_index('ix_weather_slots_ts_brin', 'weather_slots', ['ts'], unique=False, postgresql_using='brin')
+    op.create_index('ix_weather_slots_location_kind_ts', 'weather_slots', ['location', 'kind', 'ts'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_weather_slots_location_kind_ts', table_name='weather_slots')
+    op.drop_index('ix_weather_slots_ts_brin', table_name='weather_slots', postgresql_using='brin')
+    op.drop_table('weather_slots')
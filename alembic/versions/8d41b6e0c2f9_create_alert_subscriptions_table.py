@@ -0,0 +1,46 @@
+"""create alert_subscriptions table
+
+Revision ID: 8d41b6e0c2f9
+Revises: 3f9c2a7d1e44
+Create Date: 2026-10-18 19:05:12.804317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d41b6e0c2f9'
+down_revision: Union[str, Sequence[str], None] = '3f9c2a7d1e44'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('alert_subscriptions',
+    sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), autoincrement=True, nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('location', sa.String(), nullable=False),
+    sa.Column('metric', sa.String(length=32), nullable=False),
+    sa.Column('op', sa.String(length=2), nullable=False),
+    sa.Column('threshold', sa.Float(), nullable=False),
+    sa.Column('window_days', sa.SmallInteger(), nullable=False),
+    sa.Column('min_days', sa.SmallInteger(), nullable=False),
+    sa.Column('enabled', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_alert_subscriptions_user_id'), 'alert_subscriptions', ['user_id'], unique=False)
+    # 평가 주기마다 enabled인 구독 전체를 읽음
+    op.create_index('ix_alert_subscriptions_enabled_location', 'alert_subscriptions', ['enabled', 'location'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_alert_subscriptions_enabled_location', table_name='alert_subscriptions')
+    op.drop_index(op.f('ix_alert_subscriptions_user_id'), table_name='alert_subscriptions')
+    op.drop_table('alert_subscriptions')
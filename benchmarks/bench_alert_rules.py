@@ -0,0 +1,92 @@
+"""
+알림 rule 평가: rule마다 DataFrame 필터 vs alert_rules.evaluate (한 번에)
+
+--locations개 지역의 예보(40 slot)를 합성해 process_forecast_batch로 집계하고
+--rules개의 무작위 구독(metric, 연산자, 기준값, 기간, 최소 일수)을
+1) per-rule: 예전 check_rain_alert처럼 rule마다 지역 DataFrame을 날짜/값 조건으로 거름
+   (--sample개만 돌려서 전체 시간으로 환산)
+2) vectorized: evaluate 한 번
+으로 평가해 시간을 비교하고, sample rule의 결과(첫 날짜, 일수)가 같은지 확인
+
+실행: python -m benchmarks.bench_alert_rules --rules 500000 --locations 2000
+"""
+import argparse
+import datetime
+import random
+import time
+
+import pandas as pd
+
+from benchmarks.bench_forecast_archive import make_forecast
+from src.utils.alert_rules import METRICS, OPS, RuleSet, evaluate
+from src.utils.util_forecast import process_forecast_batch
+
+
+def make_rules(n: int, locations: list[str], rng: random.Random) -> pd.DataFrame:
+    return pd.DataFrame({
+        "id": range(n),
+        "user_id": [rng.randrange(n // 3 + 1) for _ in range(n)],
+        "location": [rng.choice(locations) for _ in range(n)],
+        "metric": [rng.choice(METRICS) for _ in range(n)],
+        "op": [rng.choice(list(OPS)) for _ in range(n)],
+        "threshold": [round(rng.uniform(-5, 35), 1) for _ in range(n)],
+        "window_days": [rng.randrange(8) for _ in range(n)],
+        "min_days": [rng.randint(1, 3) for _ in range(n)]
+    })
+
+
+def per_rule(daily: pd.DataFrame, rules: pd.DataFrame, today: datetime.date) -> dict:
+    found = {}
+    for rule in rules.itertuples():
+        series = daily.loc[rule.location][rule.metric]
+        end = today + datetime.timedelta(days = rule.window_days)
+        series = series[(series.index >= today) & (series.index <= end)]
+        matched = series[OPS[rule.op](series.to_numpy(), rule.threshold)]
+        if len(matched) >= rule.min_days:
+            found[rule.id] = (matched.index[0], len(matched))
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rules", type = int, default = 500_000)
+    parser.add_argument("--locations", type = int, default = 2000)
+    parser.add_argument("--sample", type = int, default = 2000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    now = int(datetime.datetime.now(datetime.timezone.utc).timestamp())
+    locations = [str(1_000_000 + i) for i in range(args.locations)]
+    payloads = {location: make_forecast(now, rng) for location in locations}
+    df = make_rules(args.rules, locations, rng)
+    today = datetime.date.today()
+
+    start = time.perf_counter()
+    daily = process_forecast_batch(payloads)
+    print(f"process_forecast_batch  {time.perf_counter() - start:7.2f}s  ({len(locations)} locations)")
+
+    sample = df.sample(min(args.sample, len(df)), random_state = 0)
+    start = time.perf_counter()
+    expected = per_rule(daily, sample, today)
+    elapsed = time.perf_counter() - start
+    print(f"per-rule                {elapsed / len(sample) * len(df):7.2f}s  "
+          f"(환산, {len(sample)}개 {elapsed:.2f}s)")
+
+    start = time.perf_counter()
+    rules = RuleSet.from_frame(df)
+    built = time.perf_counter()
+    events = evaluate(daily, rules, today)
+    done = time.perf_counter()
+    print(f"vectorized              {done - start:7.2f}s  (RuleSet {built - start:.2f}s + evaluate "
+          f"{done - built:.2f}s, {len(events)}/{len(df)} rules fired)")
+
+    got = events.set_index("rule_id")
+    fired = got.index.intersection(sample["id"])
+    assert set(fired) == set(expected)
+    assert all((got.at[rule_id, "first_date"], got.at[rule_id, "matched_days"]) == expected[rule_id]
+               for rule_id in fired)
+    print(f"sample match ({len(expected)} fired of {len(sample)})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+사용자 대량 생성 처리량 비교 (SQLite 파일 DB, aiosqlite)
+
+1) one-by-one: 기존 POST /users/ 방식 (hash -> insert -> commit -> refresh, 1명씩)
+2) bulk: src.bulk_users.create_users_bulk (병렬 hash + batch INSERT ... RETURNING)
+   입력의 일부는 일부러 충돌(이미 있는 name, 요청 안 중복 email)하도록 섞음
+
+argon2 cost는 ARGON2_* env로 조절 (기본값이면 오래 걸리므로 --users를 작게)
+실행: ARGON2_MEMORY_COST=8192 python -m benchmarks.bench_bulk_users --users 2000 --workers 4
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from src import models
+from src.bulk_users import create_users_bulk
+from src.utils import hashing
+from src.utils.schemas import UserCreate
+
+
+def make_users(prefix: str, n: int) -> list[UserCreate]:
+    return [UserCreate(name = f"{prefix}{i}", email = f"{prefix}{i}@example.com", password = f"pw-{i}")
+            for i in range(n)]
+
+
+async def one_by_one(SessionLocal, users: list[UserCreate]):
+    async with SessionLocal() as db:
+        for user in users:
+            db_user = models.User(name = user.name, email = user.email,
+                                  hashed_password = hashing.hash_password(user.password))
+            db.add(db_user)
+            await db.commit()
+            await db.refresh(db_user)
+
+
+async def main_async(args):
+    path = tempfile.mktemp(suffix = ".db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    SessionLocal = async_sessionmaker(engine, expire_on_commit = False)
+    async with engine.begin() as conn:
+        await conn.run_sync(models.User.__table__.create)
+
+    try:
+        serial = make_users("serial", args.serial)
+        start = time.perf_counter()
+        await one_by_one(SessionLocal, serial)
+        elapsed = time.perf_counter() - start
+        print(f"one-by-one  {len(serial) / elapsed:8.1f} users/s  ({len(serial)} users, {elapsed:.1f}s)")
+
+        users = make_users("bulk", args.users)
+        users += make_users("serial", 10)                                   # 이미 있는 name
+        users += [UserCreate(name = "dup-email", email = users[0].email, password = "x")]  # 요청 안 중복
+        start = time.perf_counter()
+        async with SessionLocal() as db:
+            result = await create_users_bulk(db, users, args.batch_size)
+        elapsed = time.perf_counter() - start
+        print(f"bulk        {len(users) / elapsed:8.1f} users/s  ({len(users)} rows, {elapsed:.1f}s, "
+              f"{len(result.created)} created, {len(result.conflicts)} conflicts, "
+              f"{hashing.BULK_HASH_WORKERS} hash workers)")
+        assert len(result.created) == args.users and len(result.conflicts) == 11
+    finally:
+        hashing.shutdown_hash_pool()
+        await engine.dispose()
+        os.unlink(path)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type = int, default = 2000)
+    parser.add_argument("--serial", type = int, default = 200, help = "one-by-one로 만들 사용자 수")
+    parser.add_argument("--batch-size", type = int, default = 1000)
+    parser.add_argument("--workers", type = int, default = os.cpu_count())
+    args = parser.parse_args()
+
+    hashing.BULK_HASH_WORKERS = args.workers
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
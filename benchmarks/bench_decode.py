@@ -0,0 +1,55 @@
+"""
+예보 응답 decode + 가공 시간 비교 (payload 1개당)
+
+1) json.loads   -> process_forecast       (기존 경로)
+2) orjson.loads -> process_forecast       (decode_response 경로)
+3) orjson.loads -> ForecastSlots.from_payload -> daily()
+
+실행: python -m benchmarks.bench_decode --slots 40 --repeat 200
+"""
+import argparse
+import json
+import time
+
+from benchmarks.bench_process_forecast import make_payload
+from src.api.decoding import loads
+from src.utils.forecast_slots import ForecastSlots
+from src.utils.util_forecast import process_forecast
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def per_call(fn, repeat: int) -> float:
+    fn()   # warm-up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--slots", type = int, default = 40)
+    parser.add_argument("--repeat", type = int, default = 200)
+    args = parser.parse_args()
+
+    payload = make_payload(args.slots)
+    payload["city"] = {"id": 1835848, "name": "Seoul", "timezone": 32400}
+    raw = json.dumps(payload).encode()
+    print(f"payload: {args.slots} slots, {len(raw) / 1024:.1f} KB")
+
+    cases = {"json + process_forecast": lambda: process_forecast(json.loads(raw))}
+    if orjson is not None:
+        cases["orjson + process_forecast"] = lambda: process_forecast(orjson.loads(raw))
+    cases["loads + ForecastSlots.daily"] = lambda: ForecastSlots.from_payload(loads(raw)).daily()
+    cases["json.loads only"] = lambda: json.loads(raw)
+
+    for label, fn in cases.items():
+        print(f"{label:<34} {per_call(fn, args.repeat) * 1e6:>10.1f} us")
+
+
+if __name__ == "__main__":
+    main()
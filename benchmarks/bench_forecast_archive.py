@@ -0,0 +1,108 @@
+"""
+예보 이력 분석: raw JSON 재생 vs Parquet archive
+
+--cities개 도시 x --days일 동안 3시간마다 받은 예보(40 slot)를 합성해서
+1) replay: 저장해 둔 JSON을 하나씩 json.loads -> process_forecast (기존 분석 방식)
+2) archive: forecast_archive.compact로 날짜 partition Parquet에 병합한 뒤
+            daily_summary(memory-map + partition/location pushdown + Arrow group_by)
+의 시간과 (archive 집계 process의) 최대 RSS를 비교
+archive 결과는 "도시별 마지막 예보"를 process_forecast_batch로 집계한 값과 일치하는지 확인
+
+실행: python -m benchmarks.bench_forecast_archive --cities 20 --days 90
+"""
+import argparse
+import datetime
+import json
+import multiprocessing
+import os
+import random
+import resource
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from src.utils.forecast_archive import compact, daily_summary, table_from_payloads
+from src.utils.util_forecast import process_forecast, process_forecast_batch
+
+SLOT = 3 * 60 * 60
+START = int(datetime.datetime(2026, 1, 1, tzinfo = datetime.timezone.utc).timestamp())
+
+
+def make_forecast(fetched_at: int, rng: random.Random) -> dict:
+    first = fetched_at // SLOT * SLOT + SLOT
+    slots = []
+    for i in range(40):
+        dt = first + i * SLOT
+        slot = {"dt": dt,
+                "main": {"temp": round(rng.uniform(-10, 35), 2),
+                         "feels_like": round(rng.uniform(-15, 40), 2),
+                         "humidity": rng.randint(10, 100)},
+                "wind": {"speed": round(rng.uniform(0, 15), 2)},
+                "dt_txt": datetime.datetime.fromtimestamp(dt, datetime.timezone.utc).strftime("%Y-%m-%d %H:%M:%S")}
+        if rng.random() < 0.3:
+            slot["rain"] = {"3h": round(rng.uniform(0, 10), 2)}
+        slots.append(slot)
+    return {"cod": "200", "list": slots}
+
+
+def summarize(root: str, start: datetime.date, end: datetime.date, queue):
+    begin = time.perf_counter()
+    daily = daily_summary(root, start = start, end = end)
+    elapsed = time.perf_counter() - begin
+    queue.put((elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, daily))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cities", type = int, default = 20)
+    parser.add_argument("--days", type = int, default = 90)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    cities = [f"city{i}" for i in range(args.cities)]
+    fetches = [START + k * SLOT for k in range(args.days * 8)]
+    raw: list[tuple[str, int, bytes]] = [(city, fetched_at, json.dumps(make_forecast(fetched_at, rng)).encode())
+                                         for fetched_at in fetches for city in cities]
+    print(f"{len(raw)} payloads, {sum(len(r) for _, _, r in raw) / 2**20:.0f} MB JSON")
+
+    begin = time.perf_counter()
+    for _, _, body in raw:
+        process_forecast(json.loads(body))
+    print(f"replay (json + process_forecast)  {time.perf_counter() - begin:7.2f}s")
+
+    root = tempfile.mkdtemp(prefix = "forecast-archive-")
+    try:
+        begin = time.perf_counter()
+        per_day = 8 * len(cities)     # 하루치 fetch를 모아 한 번씩 병합 (pipeline 주기)
+        for i in range(0, len(raw), per_day):
+            compact(table_from_payloads((city, json.loads(body), fetched_at)
+                                        for city, fetched_at, body in raw[i:i + per_day]), root)
+        size = sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(root) for f in files)
+        print(f"archive build (compact)           {time.perf_counter() - begin:7.2f}s  "
+              f"({size / 2**20:.1f} MB Parquet)")
+
+        start = datetime.date(2026, 1, 1)
+        end = start + datetime.timedelta(days = args.days + 5)
+        queue = multiprocessing.get_context("spawn").Queue()
+        process = multiprocessing.get_context("spawn").Process(target = summarize,
+                                                               args = (root, start, end, queue))
+        process.start()
+        elapsed, max_rss, daily = queue.get()
+        process.join()
+        print(f"archive daily_summary             {elapsed:7.2f}s  "
+              f"({len(daily)} location-days, max RSS {max_rss:.0f} MB)")
+
+        # 검증: 도시별 마지막 fetch 예보를 직접 집계한 값과 비교
+        last = {city: json.loads(body) for city, _, body in raw[-len(cities):]}
+        expected = process_forecast_batch(last)
+        got = daily.loc[expected.index]
+        assert np.allclose(got.to_numpy(), expected.to_numpy(), rtol = 1e-5, atol = 1e-3)
+        print("last-forecast days match process_forecast_batch")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+connection pooling 유무에 따른 requests/sec 비교
+
+로컬 stub 서버(HTTP/1.1 keep-alive)를 띄우고
+1) 매번 requests.get 호출 (pool 없음)
+2) src.api.http_client의 공유 Session 사용 (pool 있음)
+을 같은 thread 수로 호출해 처리량을 비교
+
+실행: python -m benchmarks.bench_http_pool --requests 2000 --threads 8
+"""
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from src.api.http_client import build_session
+
+PAYLOAD = json.dumps({"cod": 200, "main": {"temp": 15.3, "humidity": 60}}).encode()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive 허용
+    disable_nagle_algorithm = True  # header/body 분할 전송 시 delayed ACK 지연 방지
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(PAYLOAD)))
+        self.end_headers()
+        self.wfile.write(PAYLOAD)
+
+    def log_message(self, *args):
+        pass
+
+
+def run(label: str, get, url: str, n: int, threads: int) -> float:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers = threads) as pool:
+        list(pool.map(lambda _: get(url, timeout = 10).json(), range(n)))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<12} {n / elapsed:10.1f} req/s  ({elapsed:.2f}s)")
+    return n / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type = int, default = 2000)
+    parser.add_argument("--threads", type = int, default = 8)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target = server.serve_forever, daemon = True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/data/2.5/weather"
+
+    try:
+        bare = run("no pool", requests.get, url, args.requests, args.threads)
+        session = build_session(pool_maxsize = args.threads)
+        pooled = run("pooled", session.get, url, args.requests, args.threads)
+        print(f"speedup      {pooled / bare:10.2f}x")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
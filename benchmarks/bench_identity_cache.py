@@ -0,0 +1,88 @@
+"""
+인증 사용자 조회: 매번 DB 조회 vs identity cache
+
+--users명의 사용자를 만들고, 일부 사용자가 요청 대부분을 차지하는(Zipf) 인증 요청 --requests건에 대해
+1) db: db.query(User).filter(User.name == sub).first()  (기존 /users/me)
+2) cache: src.utils.identity_cache.load_user
+의 조회당 latency와 cache hit rate를 비교
+
+기본은 SQLite 파일 DB(로컬 Postgres 대신), --db-url로 Postgres 지정 가능
+실행: python -m benchmarks.bench_identity_cache --users 1000 --requests 20000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from src import models
+from src.utils import identity_cache
+from src.utils.schemas import UserRead
+
+
+def setup(db_url: str, users: int):
+    engine = create_engine(db_url)
+    models.User.__table__.drop(engine, checkfirst = True)
+    models.User.__table__.create(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), [
+            {"name": f"user{i}", "email": f"user{i}@example.com", "hashed_password": "x"}
+            for i in range(users)
+        ])
+    return engine, sessionmaker(bind = engine, autoflush = False)
+
+
+def db_lookup(db, name: str) -> UserRead:
+    return UserRead.model_validate(db.query(models.User).filter(models.User.name == name).first())
+
+
+def run(label: str, lookup, SessionLocal, names: list[str]):
+    latencies = []
+    with SessionLocal() as db:
+        for name in names:
+            start = time.perf_counter()
+            user = lookup(db, name)
+            latencies.append(time.perf_counter() - start)
+            assert user.name == name
+            db.rollback()   # 요청마다 새 transaction (connection은 pool로 반환)
+    p50 = statistics.median(latencies) * 1e6
+    p99 = statistics.quantiles(latencies, n = 100)[98] * 1e6
+    print(f"{label:<8} p50 {p50:8.1f} us  p99 {p99:8.1f} us  total {sum(latencies):6.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type = int, default = 1000)
+    parser.add_argument("--requests", type = int, default = 20000)
+    parser.add_argument("--db-url", default = None)
+    args = parser.parse_args()
+
+    tmp = None
+    db_url = args.db_url
+    if db_url is None:
+        tmp = tempfile.NamedTemporaryFile(suffix = ".db", delete = False)
+        db_url = f"sqlite:///{tmp.name}"
+
+    try:
+        engine, SessionLocal = setup(db_url, args.users)
+        rng = random.Random(0)
+        weights = [1 / (rank + 1) for rank in range(args.users)]
+        names = [f"user{i}" for i in rng.choices(range(args.users), weights, k = args.requests)]
+
+        run("db", db_lookup, SessionLocal, names)
+        run("cache", identity_cache.load_user, SessionLocal, names)
+        stats = identity_cache.identity_cache_stats()
+        print(f"hit rate {stats['hit_rate']:.1%} ({stats['hits']} hits, {stats['misses']} misses, "
+              f"{stats['entries']} entries, {stats['bytes'] / 1024:.0f} KB)")
+        engine.dispose()
+    finally:
+        if tmp is not None:
+            os.unlink(tmp.name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+로컬 IP 위치 DB 조회 시간
+
+--ranges개의 IPv4 대역 + 그 1/10개의 IPv6 대역(대역 사이 빈 구간 포함)을 합성해 binary DB로 만든 뒤
+1) 무작위 IP를 파이썬 int + bisect로 직접 찾은 결과와 IpDatabase.lookup 결과가 같은지 확인
+2) lookup / locate_ip(remote = False, 통계 포함) 1회당 시간(µs)
+3) 파일 크기와 open 시간 (mmap이라 크기와 무관하게 거의 0)
+
+실행: python -m benchmarks.bench_ip_lookup --ranges 3000000
+"""
+import argparse
+import bisect
+import ipaddress
+import os
+import random
+import tempfile
+import time
+
+from src.api import ipgeo
+
+
+def make_ranges(n: int, rng: random.Random) -> list[tuple[int, int, str, str, float, float]]:
+    cities = [(chr(65 + i % 26) + chr(65 + i // 26 % 26), f"city{i}", rng.uniform(-60, 70), rng.uniform(-180, 180))
+              for i in range(20_000)]
+    records = []
+    for base, size, count in ((ipgeo.ip_key("1.0.0.0"), 2 ** 32 - 2 ** 24, n),
+                              (ipgeo.ip_key("2001::"), 2 ** 96, n // 10)):
+        starts = sorted({rng.randrange(size) for _ in range(count)})
+        for i, start in enumerate(starts):
+            limit = starts[i + 1] if i + 1 < len(starts) else size
+            end = start + rng.randrange(max(1, (limit - start) * 9 // 10))   # 뒤쪽 10%는 빈 구간
+            records.append((base + start, base + end, *rng.choice(cities)))
+    return records
+
+
+def random_ip(rng: random.Random) -> str:
+    if rng.random() < 0.9:
+        return str(ipaddress.IPv4Address(rng.randrange(2 ** 24, 2 ** 32)))
+    return str(ipaddress.IPv6Address(int(ipaddress.IPv6Address("2001::")) + rng.randrange(2 ** 96)))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ranges", type = int, default = 3_000_000)
+    parser.add_argument("--lookups", type = int, default = 100_000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    records = make_ranges(args.ranges, rng)
+    path = os.path.join(tempfile.mkdtemp(prefix = "ipgeo-"), "ipgeo.bin")
+    try:
+        start = time.perf_counter()
+        ipgeo.build(records, path)
+        print(f"build      {time.perf_counter() - start:7.2f}s  "
+              f"({len(records)} ranges, {os.path.getsize(path) / 2**20:.0f} MB)")
+
+        start = time.perf_counter()
+        db = ipgeo.IpDatabase.open(path)
+        print(f"open       {(time.perf_counter() - start) * 1e3:7.3f}ms")
+
+        records.sort()
+        starts = [r[0] for r in records]
+        ips = [random_ip(rng) for _ in range(args.lookups)]
+        hits = 0
+        for ip in ips[:20_000]:
+            key = ipgeo.ip_key(ip)
+            i = bisect.bisect_right(starts, key) - 1
+            expected = records[i] if i >= 0 and records[i][1] >= key else None
+            got = db.lookup(ip)
+            if expected is None:
+                assert got is None, ip
+            else:
+                hits += 1
+                assert got is not None and got[2] == expected[3], ip
+        print(f"verified   {min(len(ips), 20_000)} lookups against bisect ({hits} in range)")
+
+        start = time.perf_counter()
+        for ip in ips:
+            db.lookup(ip)
+        print(f"lookup     {(time.perf_counter() - start) / len(ips) * 1e6:7.2f}µs/ip")
+
+        ipgeo.IP_GEO_PATH = path
+        start = time.perf_counter()
+        for ip in ips:
+            ipgeo.locate_ip(ip, remote = False)
+        print(f"locate_ip  {(time.perf_counter() - start) / len(ips) * 1e6:7.2f}µs/ip  {ipgeo.ip_geo_stats()}")
+    finally:
+        os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+login 폭주 중 /users/me 응답 시간 비교
+
+uvicorn으로 app을 띄우고(DB는 in-memory SQLite(aiosqlite)로 교체),
+동시에 --logins개의 /login/ 요청을 보내면서 /users/me를 계속 호출해 latency를 기록
+1) threadpool: 기존처럼 argon2 verify를 request threadpool에서 실행
+2) process pool: src.utils.hashing의 전용 process pool에서 실행 (현재 구현)
+
+실행: python -m benchmarks.bench_login_storm --logins 200 --probes 50
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import threading
+import time
+
+import httpx
+import uvicorn
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import StaticPool
+from starlette.concurrency import run_in_threadpool
+
+os.environ.setdefault("PREFETCH_ENABLED", "0")   # upstream 호출 없이 측정
+
+from src import app_fastapi, models
+from src.database import get_async_db
+from src.utils import hashing
+
+USER = {"name": "storm", "email": "storm@example.com", "password": "correct horse battery"}
+
+
+def setup_db():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass = StaticPool)
+    SessionLocal = async_sessionmaker(engine, autoflush = False, expire_on_commit = False)
+
+    async def create_tables():
+        async with engine.begin() as conn:
+            await conn.run_sync(models.User.__table__.create)
+
+    async def get_test_db():
+        async with SessionLocal() as db:
+            yield db
+
+    app_fastapi.app.dependency_overrides[get_async_db] = get_test_db
+    return create_tables
+
+
+def start_server() -> tuple[uvicorn.Server, str]:
+    config = uvicorn.Config(app_fastapi.app, host = "127.0.0.1", port = 0, log_level = "warning",
+                            timeout_keep_alive = 120)
+    server = uvicorn.Server(config)
+    threading.Thread(target = server.run, daemon = True).start()
+    while not server.started:
+        time.sleep(0.05)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    return server, f"http://127.0.0.1:{port}"
+
+
+async def probe(client: httpx.AsyncClient, token: str, n: int, gap: float) -> list[float]:
+    latencies = []
+    for _ in range(n):
+        start = time.perf_counter()
+        response = await client.get("/users/me", headers = {"Authorization": f"Bearer {token}"})
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(gap)
+    return latencies
+
+
+async def storm(base_url: str, logins: int, probes: int) -> tuple[list[float], list[float], float]:
+    limits = httpx.Limits(max_connections = logins + 10)
+    async with httpx.AsyncClient(base_url = base_url, limits = limits, timeout = 120) as client:
+        form = {"username": USER["name"], "password": USER["password"]}
+        token = (await client.post("/login/", data = form)).json()["access_token"]
+
+        idle = await probe(client, token, 10, 0.01)
+
+        start = time.perf_counter()
+        login_tasks = [asyncio.create_task(client.post("/login/", data = form)) for _ in range(logins)]
+        await asyncio.sleep(0.05)   # login 요청이 먼저 쌓이도록
+        busy = await probe(client, token, probes, 0.02)
+        results = await asyncio.gather(*login_tasks)
+        elapsed = time.perf_counter() - start
+        assert all(r.status_code == 200 for r in results), {r.status_code for r in results}
+    return idle, busy, elapsed
+
+
+def report(label: str, idle: list[float], busy: list[float], elapsed: float, logins: int):
+    def ms(values, q):
+        return statistics.quantiles(values, n = 100)[q - 1] * 1000
+    print(f"{label:<14} /users/me idle p50 {ms(idle, 50):7.1f} ms | "
+          f"storm p50 {ms(busy, 50):7.1f} ms  p95 {ms(busy, 95):7.1f} ms | "
+          f"{logins / elapsed:6.1f} logins/s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type = int, default = 200)
+    parser.add_argument("--probes", type = int, default = 50)
+    args = parser.parse_args()
+
+    asyncio.run(setup_db()())
+    server, base_url = start_server()
+    httpx.post(f"{base_url}/users/", json = USER, timeout = 30).raise_for_status()
+
+    process_verify = app_fastapi.verify_password_async
+
+    async def threadpool_verify(plain, hashed):
+        return await run_in_threadpool(hashing.verify_password, plain, hashed)
+
+    try:
+        app_fastapi.verify_password_async = threadpool_verify
+        report("threadpool", *asyncio.run(storm(base_url, args.logins, args.probes)), args.logins)
+
+        app_fastapi.verify_password_async = process_verify
+        report("process pool", *asyncio.run(storm(base_url, args.logins, args.probes)), args.logins)
+        print(hashing.hash_stats())
+    finally:
+        server.should_exit = True
+        hashing.shutdown_hash_pool()
+
+
+if __name__ == "__main__":
+    main()
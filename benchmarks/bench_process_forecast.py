@@ -0,0 +1,112 @@
+"""
+process_forecast 벤치마크: 기존 Series.apply 방식 vs 한 번에 펼치는 방식
+
+합성 예보 payload(40 ~ 100k slot)로 두 구현의 실행 시간을 비교하고
+결과 DataFrame이 완전히 같은지 확인
+
+실행: python -m benchmarks.bench_process_forecast
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+from src.utils.util_forecast import process_forecast
+
+
+def make_payload(n_slots: int, seed: int = 0) -> dict:
+    """
+    OpenWeatherMap /forecast 형태의 합성 payload
+    (rain/snow는 일부 slot에만, humidity는 int, 나머지는 float)
+    """
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    slots = []
+    for i in range(n_slots):
+        slot = {
+            "dt": int((start + timedelta(hours = 3 * i)).timestamp()),
+            "main": {"temp": round(rng.uniform(-10, 35), 2),
+                     "feels_like": round(rng.uniform(-15, 40), 2),
+                     "humidity": rng.randint(10, 100)},
+            "wind": {"speed": round(rng.uniform(0, 15), 2)},
+            "dt_txt": (start + timedelta(hours = 3 * i)).strftime("%Y-%m-%d %H:%M:%S")
+        }
+        if rng.random() < 0.3:
+            slot["rain"] = {"3h": round(rng.uniform(0, 10), 2)}
+        if rng.random() < 0.1:
+            slot["snow"] = {"3h": round(rng.uniform(0, 5), 2)}
+        slots.append(slot)
+    return {"cod": "200", "list": slots}
+
+
+def process_forecast_legacy(data: dict) -> pd.DataFrame:
+    """
+    비교용: 벡터화 이전의 process_forecast (column마다 Series.apply)
+    """
+    df = pd.DataFrame(data["list"])
+    df["dt_txt"] = pd.to_datetime(df["dt_txt"])
+    df["date"] = df["dt_txt"].dt.date
+    df["temp"] = df["main"].apply(lambda x: x["temp"])
+    df["feels_like"] = df["main"].apply(lambda x: x["feels_like"])
+    if "rain" not in df.columns:
+        df["rain"] = None
+    if "snow" not in df.columns:
+        df["snow"] = None
+    df["rain_3h"] = df["rain"].apply(lambda x: x.get('3h', 0) if isinstance(x, dict) else 0)
+    df["snow_3h"] = df["snow"].apply(lambda x: x.get('3h', 0) if isinstance(x, dict) else 0)
+    df["humidity"] = df["main"].apply(lambda x: x["humidity"])
+    df["wind"] = df["wind"].apply(lambda x: x["speed"])
+
+    daily = (
+        df.groupby("date")
+          .agg(t_min=("temp", "min"), t_max=("temp", "max"), t_mean=("temp", "mean"),
+               flt_min=("feels_like", "min"), flt_max=("feels_like", "max"),
+               flt_mean=("feels_like", "mean"),
+               hu_min=("humidity", "min"), hu_max=("humidity", "max"),
+               hu_mean=("humidity", "mean"),
+               w_min=("wind", "min"), w_max=("wind", "max"), w_mean=("wind", "mean"),
+               rain=("rain_3h", "sum"), mean_rain=("rain_3h", "mean"),
+               max_rain=("rain_3h", "max"),
+               snow=("snow_3h", "sum"), mean_snow=("snow_3h", "mean"),
+               max_snow=("snow_3h", "max"))
+    )
+    return daily.rename(columns = {
+        "t_min": "최저기온", "t_max": "최대기온", "t_mean": "평균기온",
+        "flt_min": "최저체감기온", "flt_max": "최대체감기온", "flt_mean": "평균체감기온",
+        "hu_min": "최저습도", "hu_max": "최대습도", "hu_mean": "평균습도",
+        "w_min": "최저풍속", "w_max": "최대풍속", "w_mean": "평균풍속",
+        "rain": "강수량", "mean_rain": "평균강수량", "max_rain": "최대강수량",
+        "snow": "적설량", "mean_snow": "평균적설량", "max_snow": "최대적설량"
+    })
+
+
+def best_of(fn, data, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(data)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type = int, nargs = "+", default = [40, 1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type = int, default = 5)
+    args = parser.parse_args()
+
+    print(f"{'slots':>8} {'legacy(ms)':>12} {'current(ms)':>12} {'speedup':>8}")
+    for n in args.sizes:
+        data = make_payload(n)
+        assert_frame_equal(process_forecast(data), process_forecast_legacy(data), check_exact = True)
+
+        legacy = best_of(process_forecast_legacy, data, args.repeat)
+        current = best_of(process_forecast, data, args.repeat)
+        print(f"{n:>8} {legacy * 1000:>12.2f} {current * 1000:>12.2f} {legacy / current:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+import logging
+import os
+import threading
+import time
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+from src.api import openweather
+from src.models import AlertSubscription
+from src.utils.alert_rules import RuleSet, evaluate, EVENT_COLUMNS
+from src.utils.util_forecast import process_forecast_batch
+
+# 구독 알림 평가 주기
+# 1. enabled인 구독 전체를 column 단위로 읽어 RuleSet으로 (행마다 ORM 객체를 만들지 않음)
+# 2. 구독 지역의 예보를 캐시에서 꺼냄 (없으면 background 예산으로 ALERT_FETCH_LIMIT개까지 받아옴)
+# 3. process_forecast_batch로 한 번에 집계 -> alert_rules.evaluate로 전체 rule 한 번에 평가
+# 4. 직전 주기에 이미 보낸 (rule, 첫 날짜) 조합은 빼고 listener(events DataFrame)에 전달
+
+logger = logging.getLogger(__name__)
+
+ALERT_INTERVAL = float(os.getenv("ALERT_INTERVAL", 10 * 60))
+ALERT_FETCH_LIMIT = int(os.getenv("ALERT_FETCH_LIMIT", "100"))   # 주기당 캐시에 없는 예보를 받아올 최대 지역 수
+ALERT_CHUNK_SIZE = 100_000
+
+
+def load_rules(engine: Engine,
+               chunk_size: int = ALERT_CHUNK_SIZE) -> RuleSet:
+    """
+    enabled인 구독 전체 -> RuleSet
+    """
+    columns = [AlertSubscription.id, AlertSubscription.user_id, AlertSubscription.location,
+               AlertSubscription.metric, AlertSubscription.op, AlertSubscription.threshold,
+               AlertSubscription.window_days, AlertSubscription.min_days]
+    query = select(*columns).where(AlertSubscription.enabled.is_(True))
+    names = [column.key for column in columns]
+
+    frames = []
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results = True, yield_per = chunk_size).execute(query)
+        for chunk in result.partitions():
+            frames.append(pd.DataFrame.from_records(chunk, columns = names))
+    df = pd.concat(frames, ignore_index = True) if frames else pd.DataFrame(columns = names)
+    return RuleSet.from_frame(df)
+
+
+def _event_keys(events: pd.DataFrame) -> np.ndarray:
+    # (rule id, 첫 날짜) -> int64 하나 (날짜 ordinal은 2^20 미만)
+    ordinals = np.fromiter((date.toordinal() for date in events["first_date"]), dtype = np.int64,
+                           count = len(events))
+    return events["rule_id"].to_numpy(dtype = np.int64) << 20 | ordinals
+
+
+class AlertEvaluator:
+    """
+    evaluator = AlertEvaluator(engine, api_key)
+    evaluator.add_listener(lambda events: ...)   # 새 알림 event DataFrame
+    evaluator.start()                            # ALERT_INTERVAL초마다 run_once
+    evaluator.stop()
+    """
+
+    def __init__(self,
+                 engine: Engine,
+                 api_key: str | None = None,
+                 interval: float = ALERT_INTERVAL,
+                 fetch_limit: int = ALERT_FETCH_LIMIT):
+        self.engine = engine
+        self.api_key = api_key
+        self.interval = interval
+        self.fetch_limit = fetch_limit if api_key else 0
+        self._listeners: list = []
+        self._sent = np.empty(0, dtype = np.int64)     # 직전 주기까지 보낸 event key (정렬됨)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread: threading.Thread | None = None
+        self._stats = {"runs": 0, "rules": 0, "locations": 0, "missing_forecasts": 0, "fetched": 0,
+                       "events": 0, "new_events": 0, "load_seconds": 0.0, "evaluate_seconds": 0.0}
+
+    def add_listener(self, listener):
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _forecasts(self, locations) -> tuple[dict[str, dict], int, int]:
+        payloads, missing, fetched = {}, 0, 0
+        for location in locations:
+            data = openweather.cached_forecast(location)
+            if data is None and fetched < self.fetch_limit:
+                fetched += 1
+                data = openweather.get_forecast(location, self.api_key, priority = openweather.BACKGROUND)
+            if openweather.is_ok_response(data) and data.get("list"):
+                payloads[location] = data
+            else:
+                missing += 1
+        return payloads, missing, fetched
+
+    def run_once(self) -> pd.DataFrame:
+        """
+        전체 구독을 한 번 평가 -> 이번에 새로 생긴 event (listener에도 전달)
+        """
+        start = time.perf_counter()
+        rules = load_rules(self.engine)
+        locations = pd.unique(rules.location)
+        payloads, missing, fetched = self._forecasts(locations)
+        loaded = time.perf_counter()
+
+        if payloads:
+            events = evaluate(process_forecast_batch(payloads), rules)
+        else:
+            events = pd.DataFrame({name: [] for name in EVENT_COLUMNS})
+        keys = _event_keys(events)
+        new = events[~np.isin(keys, self._sent, assume_unique = True)]
+        self._sent = np.sort(keys)     # 조건이 풀렸다가 다시 만족하면 다시 알림
+        finished = time.perf_counter()
+
+        with self._lock:
+            self._stats["runs"] += 1
+            self._stats.update(rules = len(rules), locations = len(locations), missing_forecasts = missing,
+                               events = len(events), load_seconds = round(loaded - start, 4),
+                               evaluate_seconds = round(finished - loaded, 4))
+            self._stats["fetched"] += fetched
+            self._stats["new_events"] += len(new)
+
+        if len(new):
+            for listener in self._listeners:
+                try:
+                    listener(new)
+                except Exception:
+                    logger.exception("alert listener 실패")
+        return new
+
+    def _run(self):
+        while not self._stopping:
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("알림 평가 실패")
+            self._wake.wait(self.interval)
+
+    def start(self):
+        self._stopping = False
+        self._wake.clear()
+        self._thread = threading.Thread(target = self._run, name = "alert-evaluator", daemon = True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopping = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats)
+
+
+def log_events(events: pd.DataFrame):
+    """
+    기본 listener: 지역/metric별 알림 수를 log로 남김 (발송 채널은 listener로 추가)
+    """
+    summary = events.groupby(["location", "metric"]).size()
+    logger.info("새 날씨 알림 %d건: %s", len(events), summary.to_dict())
@@ -0,0 +1,69 @@
+import json
+import mmap
+import os
+import numpy as np
+
+# 이름 붙은 numpy 배열 여러 개를 파일 하나에 저장하고 mmap으로 다시 여는 형식
+#   magic(4) + header 길이(4, little endian) + JSON header {이름: [dtype, shape, offset]}
+#   + 8 byte 정렬된 배열 데이터
+# 여는 비용이 거의 없고 (복사 없이 np.frombuffer), 같은 파일을 여는 process끼리 page를 공유
+# (gazetteer, IP 위치 DB가 사용)
+
+
+def _align(n: int) -> int:
+    return -(-n // 8) * 8
+
+
+def write_arrays(path: str,
+                 magic: bytes,
+                 arrays: dict[str, np.ndarray]) -> str:
+    """
+    배열들을 파일로 저장 (임시 파일에 쓴 뒤 교체)
+    """
+    header, offset = {}, 0
+    for name, array in arrays.items():
+        header[name] = [array.dtype.str, list(array.shape), offset]
+        offset += _align(array.nbytes)
+    raw_header = json.dumps(header).encode()
+    data_start = _align(len(magic) + 4 + len(raw_header))
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok = True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(magic + len(raw_header).to_bytes(4, "little") + raw_header)
+        for name, array in arrays.items():
+            f.seek(data_start + header[name][2])
+            f.write(np.ascontiguousarray(array).tobytes())
+        f.truncate(data_start + offset)
+    os.replace(tmp, path)
+    return path
+
+
+def read_arrays(buffer,
+                magic: bytes) -> dict[str, np.ndarray]:
+    """
+    buffer(mmap, bytes)를 복사하지 않고 배열로 해석
+    """
+    if bytes(buffer[:len(magic)]) != magic:
+        raise ValueError(f"{magic.decode()} 파일 형식이 아닙니다")
+    start = len(magic)
+    header_len = int.from_bytes(buffer[start:start + 4], "little")
+    header = json.loads(bytes(buffer[start + 4:start + 4 + header_len]))
+    data_start = _align(start + 4 + header_len)
+
+    arrays = {}
+    for name, (dtype, shape, offset) in header.items():
+        count = int(np.prod(shape)) if shape else 1
+        array = np.frombuffer(buffer, dtype = dtype, count = count, offset = data_start + offset)
+        arrays[name] = array.reshape(shape)
+    return arrays
+
+
+def map_arrays(path: str,
+               magic: bytes) -> dict[str, np.ndarray]:
+    """
+    파일을 읽기 전용 mmap으로 열어 배열로 해석
+    """
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ)
+    return read_arrays(buffer, magic)
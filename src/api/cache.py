@@ -0,0 +1,443 @@
+import asyncio
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+# 날씨 응답 캐시
+# - TTL: 항목마다 만료 시간을 따로 둠 (현재 날씨 10분, 예보 3시간 등)
+# - LRU: 메모리 상한(max_bytes)을 넘으면 가장 오래 안 쓴 항목부터 제거
+# - backend 교체 가능: 프로세스 내 메모리 / 노드 공유 SQLite 파일 / Redis
+
+
+def estimate_size(value) -> int:
+    """
+    캐시 항목의 대략적인 메모리 크기(byte)
+    JSON 직렬화 길이로 근사함
+    """
+    try:
+        return len(json.dumps(value, ensure_ascii = False, default = str).encode())
+    except (TypeError, ValueError):
+        return 1024
+
+
+class CacheBackend(ABC):
+    """
+    캐시 backend 공통 interface
+
+    값은 JSON 직렬화 가능한 dict라고 가정.
+    acquire_lock/release_lock은 single-flight용 분산 lock
+    (만료된 key를 여러 프로세스가 동시에 upstream으로 가져가지 않도록)
+    """
+
+    @abstractmethod
+    def get(self, key: str):
+        """값이 없거나 만료되었으면 None"""
+
+    @abstractmethod
+    def set(self, key: str, value, ttl: float):
+        """ttl초 동안 유효한 값 저장"""
+
+    @abstractmethod
+    def delete(self, key: str):
+        """key 삭제"""
+
+    @abstractmethod
+    def acquire_lock(self, key: str, ttl: float) -> str | None:
+        """lock 획득 시 token 반환, 이미 잡혀 있으면 None"""
+
+    @abstractmethod
+    def release_lock(self, key: str, token: str):
+        """token이 일치할 때만 lock 해제"""
+
+    def stats(self) -> dict:
+        return {}
+
+
+class TTLCache(CacheBackend):
+    """
+    thread-safe TTL + LRU 캐시 (프로세스 내 메모리)
+    """
+
+    def __init__(self,
+                 max_bytes: int = 64 * 1024 * 1024,
+                 clock = time.monotonic):
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._data: OrderedDict[str, tuple[float, int, object]] = OrderedDict()  # key -> (만료시각, 크기, 값)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._locks: dict[str, tuple[str, float]] = {}   # key -> (token, 만료시각)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str):
+        """
+        값이 없거나 만료되었으면 None
+        """
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+
+            expires_at, size, value = item
+            if expires_at <= self._clock():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)   # 최근 사용으로 갱신
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value, ttl: float):
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return   # 상한보다 큰 항목은 저장하지 않음
+
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (self._clock() + ttl, size, value)
+            self._bytes += size
+
+            # 메모리 상한을 넘으면 LRU 순서대로 제거
+            while self._bytes > self.max_bytes:
+                old_key = next(iter(self._data))
+                self._remove(old_key)
+                self.evictions += 1
+
+    def delete(self, key: str):
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def acquire_lock(self, key: str, ttl: float) -> str | None:
+        with self._lock:
+            held = self._locks.get(key)
+            if held and held[1] > self._clock():
+                return None
+            token = uuid.uuid4().hex
+            self._locks[key] = (token, self._clock() + ttl)
+            return token
+
+    def release_lock(self, key: str, token: str):
+        with self._lock:
+            held = self._locks.get(key)
+            if held and held[0] == token:
+                del self._locks[key]
+
+    def _remove(self, key: str):
+        _, size, _ = self._data.pop(key)
+        self._bytes -= size
+
+    def stats(self) -> dict:
+        """
+        hit/miss/eviction 카운터와 현재 사용량
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "backend": "memory",
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes
+            }
+
+
+class SQLiteBackend(CacheBackend):
+    """
+    같은 노드의 여러 프로세스가 공유하는 SQLite 파일 캐시
+
+    WAL 모드라 읽기는 서로 막지 않음.
+    만료 시각은 프로세스 간 비교가 가능하도록 wall clock(time.time) 기준.
+    max_entries를 넘으면 만료 시각이 가장 이른 항목부터 삭제.
+    """
+
+    def __init__(self,
+                 path: str,
+                 max_entries: int = 50_000,
+                 clock = time.time):
+        self.path = path
+        self.max_entries = max_entries
+        self._clock = clock
+        self._local = threading.local()   # sqlite3 connection은 thread별로 사용
+        self._sets = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS cache_entries ("
+                     "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)")
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_cache_entries_expires_at ON cache_entries (expires_at)")
+        conn.execute("CREATE TABLE IF NOT EXISTS cache_locks ("
+                     "key TEXT PRIMARY KEY, token TEXT NOT NULL, expires_at REAL NOT NULL)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # isolation_level = None: autocommit, 필요한 곳만 명시적으로 BEGIN
+            conn = sqlite3.connect(self.path, timeout = 10, isolation_level = None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str):
+        row = self._conn().execute(
+            "SELECT value FROM cache_entries WHERE key = ? AND expires_at > ?",
+            (key, self._clock())
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key: str, value, ttl: float):
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value, ensure_ascii = False), self._clock() + ttl)
+        )
+        self._sets += 1
+        if self._sets % 100 == 0:
+            self._purge(conn)
+
+    def _purge(self, conn: sqlite3.Connection):
+        """
+        만료된 항목 삭제 후, 그래도 상한을 넘으면 곧 만료될 항목부터 삭제
+        """
+        conn.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (self._clock(),))
+        conn.execute("DELETE FROM cache_locks WHERE expires_at <= ?", (self._clock(),))
+        (count,) = conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            conn.execute(
+                "DELETE FROM cache_entries WHERE key IN ("
+                "SELECT key FROM cache_entries ORDER BY expires_at LIMIT ?)",
+                (overflow,)
+            )
+            self.evictions += overflow
+
+    def delete(self, key: str):
+        self._conn().execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+
+    def acquire_lock(self, key: str, ttl: float) -> str | None:
+        conn = self._conn()
+        token = uuid.uuid4().hex
+        now = self._clock()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM cache_locks WHERE key = ? AND expires_at <= ?", (key, now))
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO cache_locks (key, token, expires_at) VALUES (?, ?, ?)",
+                (key, token, now + ttl)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return token if cur.rowcount == 1 else None
+
+    def release_lock(self, key: str, token: str):
+        self._conn().execute("DELETE FROM cache_locks WHERE key = ? AND token = ?", (key, token))
+
+    def stats(self) -> dict:
+        (count,) = self._conn().execute("SELECT COUNT(*) FROM cache_entries").fetchone()
+        total = self.hits + self.misses
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "hits": self.hits,            # 이 프로세스 기준
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "evictions": self.evictions,
+            "entries": count,
+            "max_entries": self.max_entries
+        }
+
+
+class RedisBackend(CacheBackend):
+    """
+    Redis 호환 서버를 쓰는 캐시 (노드 간 공유)
+
+    client는 redis.Redis와 같은 get/set/delete interface를 가진 객체면 됨
+    (테스트에서는 fakeredis.FakeRedis 사용 가능).
+    만료는 Redis의 EX/PX에 맡김.
+    """
+
+    def __init__(self,
+                 client,
+                 prefix: str = "weather:"):
+        self.client = client
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str):
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(raw)
+
+    def set(self, key: str, value, ttl: float):
+        self.client.set(self.prefix + key,
+                        json.dumps(value, ensure_ascii = False),
+                        ex = max(1, math.ceil(ttl)))
+
+    def delete(self, key: str):
+        self.client.delete(self.prefix + key)
+
+    def acquire_lock(self, key: str, ttl: float) -> str | None:
+        token = uuid.uuid4().hex
+        ok = self.client.set(self.prefix + "lock:" + key, token,
+                             nx = True, px = max(1, int(ttl * 1000)))
+        return token if ok else None
+
+    def release_lock(self, key: str, token: str):
+        lock_key = self.prefix + "lock:" + key
+        held = self.client.get(lock_key)
+        if isinstance(held, bytes):
+            held = held.decode()
+        if held == token:
+            self.client.delete(lock_key)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "backend": "redis",
+            "hits": self.hits,            # 이 프로세스 기준
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0
+        }
+
+
+def backend_from_env() -> CacheBackend:
+    """
+    환경 변수로 backend 선택
+    WEATHER_CACHE_BACKEND = memory(기본) | sqlite | redis
+    """
+    kind = os.getenv("WEATHER_CACHE_BACKEND", "memory").lower()
+    if kind == "sqlite":
+        return SQLiteBackend(os.getenv("WEATHER_CACHE_PATH", "/tmp/weather_cache.sqlite3"))
+    if kind == "redis":
+        import redis   # 선택 의존성
+        return RedisBackend(redis.Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0")))
+    return TTLCache(max_bytes = int(os.getenv("WEATHER_CACHE_MAX_BYTES", 64 * 1024 * 1024)))
+
+
+def cached_fetch(backend: CacheBackend,
+                 key: str,
+                 ttl: float,
+                 fetch,
+                 cacheable = lambda value: True,
+                 lock_ttl: float = 15,
+                 wait: float = 10,
+                 poll: float = 0.05,
+                 refresh: bool = False):
+    """
+    캐시 조회 -> miss면 single-flight로 upstream 호출
+
+    lock을 잡은 한 프로세스만 fetch()를 호출하고,
+    나머지는 값이 채워질 때까지 짧게 polling 하며 기다림.
+    lock holder가 wait초 안에 값을 채우지 못하면(실패 응답/중단) 직접 호출.
+    refresh = True면 캐시에 값이 있어도 다시 가져와 덮어씀 (미리 갱신용)
+    """
+    if not refresh:
+        value = backend.get(key)
+        if value is not None:
+            return value
+
+    deadline = time.monotonic() + wait
+    while True:
+        token = backend.acquire_lock(key, lock_ttl)
+        if token is not None:
+            try:
+                # lock을 기다리는 사이 다른 프로세스가 채웠을 수 있음
+                value = None if refresh else backend.get(key)
+                if value is None:
+                    value = fetch()
+                    if cacheable(value):
+                        backend.set(key, value, ttl)
+                return value
+            finally:
+                backend.release_lock(key, token)
+
+        time.sleep(poll)
+        value = backend.get(key)
+        if value is not None:
+            return value
+        if time.monotonic() >= deadline:
+            return fetch()
+
+
+async def _call(backend: CacheBackend, method: str, *args):
+    # SQLite/Redis 호출은 I/O(파일 lock, network)라 thread에서 실행해 event loop를 막지 않음
+    # 메모리 backend는 짧은 dict 조작이라 바로 호출
+    if isinstance(backend, TTLCache):
+        return getattr(backend, method)(*args)
+    return await asyncio.to_thread(getattr(backend, method), *args)
+
+
+async def async_cached_fetch(backend: CacheBackend,
+                             key: str,
+                             ttl: float,
+                             fetch,
+                             cacheable = lambda value: True,
+                             lock_ttl: float = 15,
+                             wait: float = 10,
+                             poll: float = 0.05,
+                             refresh: bool = False):
+    """
+    cached_fetch의 비동기 버전 (fetch는 coroutine 함수)
+
+    동기 backend 호출은 asyncio.to_thread로 실행하고, 대기는 asyncio.sleep으로 양보.
+    """
+    if not refresh:
+        value = await _call(backend, "get", key)
+        if value is not None:
+            return value
+
+    deadline = time.monotonic() + wait
+    while True:
+        token = await _call(backend, "acquire_lock", key, lock_ttl)
+        if token is not None:
+            try:
+                value = None if refresh else await _call(backend, "get", key)
+                if value is None:
+                    value = await fetch()
+                    if cacheable(value):
+                        await _call(backend, "set", key, value, ttl)
+                return value
+            finally:
+                await _call(backend, "release_lock", key, token)
+
+        await asyncio.sleep(poll)
+        value = await _call(backend, "get", key)
+        if value is not None:
+            return value
+        if time.monotonic() >= deadline:
+            return await fetch()
@@ -0,0 +1,105 @@
+import asyncio
+import threading
+
+# 동일한 upstream 요청 합치기 (single-flight)
+# 같은 key로 동시에 들어온 호출은 먼저 온 하나(leader)만 실행하고
+# 나머지는 그 결과를 기다렸다가 공유함
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    thread용 single-flight
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[str, _Call] = {}
+        self.calls = 0
+        self.leaders = 0
+        self.coalesced = 0
+
+    def do(self, key: str, fn):
+        with self._lock:
+            self.calls += 1
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+                leader = True
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"calls": self.calls,
+                    "upstream": self.leaders,
+                    "coalesced": self.coalesced,
+                    "in_flight": len(self._calls)}
+
+
+class AsyncSingleFlight:
+    """
+    asyncio용 single-flight (event loop별로 진행 중인 호출을 따로 관리)
+
+    fn은 호출한 쪽과 분리된 task로 실행하고 leader를 포함한 모든 호출이 shield로 기다림
+    -> 어느 호출(연결이 끊긴 client 등)이 취소되어도 같은 key를 기다리는 다른 호출은 결과를 받음
+    """
+
+    def __init__(self):
+        self._calls: dict[tuple[int, str], asyncio.Task] = {}
+        self.calls = 0
+        self.leaders = 0
+        self.coalesced = 0
+
+    def _done(self, call_key: tuple[int, str], task: asyncio.Task):
+        if self._calls.get(call_key) is task:
+            del self._calls[call_key]
+        if not task.cancelled():
+            task.exception()   # 기다리는 쪽이 없어도 경고가 남지 않도록 확인 처리
+
+    async def do(self, key: str, fn):
+        loop = asyncio.get_running_loop()
+        call_key = (id(loop), key)
+        self.calls += 1
+
+        task = self._calls.get(call_key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = self._calls[call_key] = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda done: self._done(call_key, done))
+            self.leaders += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        return {"calls": self.calls,
+                "upstream": self.leaders,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls)}
@@ -0,0 +1,23 @@
+import json
+
+# upstream 응답 JSON decode
+# orjson이 설치되어 있으면 사용 (stdlib json보다 수 배 빠름), 없으면 stdlib
+
+try:
+    import orjson
+except ImportError:   # 선택 의존성
+    orjson = None
+
+
+def loads(raw: bytes | str):
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def decode_response(response) -> dict:
+    """
+    requests.Response / httpx.Response의 .json() 대체
+    (body bytes를 바로 decode 해서 text 변환 단계를 건너뜀)
+    """
+    return loads(response.content)
@@ -0,0 +1,368 @@
+import argparse
+import csv
+import difflib
+import math
+import os
+import re
+import logging
+import tempfile
+import threading
+import time
+import unicodedata
+from typing import NamedTuple
+import numpy as np
+from .arrayfile import write_arrays, map_arrays
+
+# 오프라인 도시 사전 (gazetteer)
+# - 번들 CSV(src/data/cities.csv) 또는 GeoNames cities*.txt로 만든 binary 파일 하나를 mmap으로 읽음
+#   (도시 배열 + 정렬된 검색 key + 3차원 KD-tree 순서 -> 여는 비용이 거의 없고 process끼리 page 공유)
+# - 이름 검색: 정규화한 key(소문자, 공백/기호 제거)를 정렬해 두고 이분 탐색 -> prefix 검색
+#              prefix 결과가 부족하면 첫 글자가 같은 key 중에서 fuzzy 검색 (오타 허용)
+# - 좌표 -> 가장 가까운 도시: 단위 구 위의 (x, y, z)로 만든 KD-tree (경도 ±180 경계 문제 없음)
+# - binary 파일은 package 밖 cache dir(GAZETTEER_CACHE_DIR)에 만듦 (package dir은 읽기 전용일 수 있음)
+#   GAZETTEER_PATH를 지정하면 미리 만든 파일을 그대로 사용 (자동 build 안 함)
+# - build/open에 실패하면 GAZETTEER_RETRY_INTERVAL초 동안은 다시 시도하지 않고 같은 오류를 냄
+#   (도시 이름을 받을 때마다 CSV를 다시 읽고 경고를 남기지 않도록)
+# 실행: python -m src.api.gazetteer build [--geonames cities15000.txt] [--out path]
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+DEFAULT_CSV = os.path.join(DATA_DIR, "cities.csv")
+GAZETTEER_CACHE_DIR = os.getenv("GAZETTEER_CACHE_DIR", os.path.join(tempfile.gettempdir(), "weather-dashboard"))
+GAZETTEER_PATH = os.getenv("GAZETTEER_PATH", os.path.join(GAZETTEER_CACHE_DIR, "gazetteer.bin"))
+GAZETTEER_RETRY_INTERVAL = float(os.getenv("GAZETTEER_RETRY_INTERVAL", 5 * 60))
+
+MAGIC = b"GAZ1"
+EARTH_RADIUS_KM = 6371.0
+FUZZY_CANDIDATES = 2000       # fuzzy 비교할 최대 후보 수 (인구 많은 순)
+_HANGUL = re.compile(r"[가-힣]")
+_IGNORED = re.compile(r"[\s\-'’`.,()]+")
+
+
+class City(NamedTuple):
+    id: int              # GeoNames id (= OpenWeatherMap city id)
+    name: str
+    label: str           # 화면 표시용 (한글 이름이 있으면 한글)
+    country: str
+    lat: float
+    lon: float
+    population: int
+
+
+def normalize_key(text: str) -> str:
+    """
+    검색 key 정규화: 유니코드 호환 문자 통일, 소문자, 공백/기호 제거
+    """
+    return _IGNORED.sub("", unicodedata.normalize("NFKC", text).casefold())
+
+
+def _xyz(lat, lon) -> np.ndarray:
+    lat, lon = np.radians(lat), np.radians(lon)
+    return np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis = -1)
+
+
+# ---------------------------------------------------------------
+# build
+# ---------------------------------------------------------------
+def read_cities_csv(path: str = DEFAULT_CSV) -> list[dict]:
+    with open(path, newline = "", encoding = "utf-8") as f:
+        return [{"id": int(row["id"]),
+                 "name": row["name"],
+                 "country": row["country"],
+                 "lat": float(row["lat"]),
+                 "lon": float(row["lon"]),
+                 "population": int(row["population"] or 0),
+                 "alt_names": [name for name in row["alt_names"].split(";") if name]}
+                for row in csv.DictReader(f)]
+
+
+def read_geonames(path: str) -> list[dict]:
+    """
+    GeoNames cities500/1000/5000/15000.txt (tab 구분, alternatenames는 쉼표 구분)
+    """
+    records = []
+    with open(path, encoding = "utf-8") as f:
+        for line in f:
+            cols = line.rstrip("\n").split("\t")
+            records.append({"id": int(cols[0]),
+                            "name": cols[1],
+                            "country": cols[8],
+                            "lat": float(cols[4]),
+                            "lon": float(cols[5]),
+                            "population": int(cols[14] or 0),
+                            "alt_names": [cols[2]] + [name for name in cols[3].split(",") if name]})
+    return records
+
+
+def _blob(strings: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    encoded = [s.encode() for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype = np.uint32)
+    np.cumsum([len(b) for b in encoded], out = offsets[1:])
+    return offsets, np.frombuffer(b"".join(encoded), dtype = np.uint8)
+
+
+def _kd_order(points: np.ndarray) -> np.ndarray:
+    """
+    암묵적 KD-tree: 구간 [lo, hi)의 node는 가운데(mid) 원소, 축은 깊이 % 3
+    """
+    order = np.arange(len(points), dtype = np.int32)
+    stack = [(0, len(points), 0)]
+    while stack:
+        lo, hi, depth = stack.pop()
+        if hi - lo <= 1:
+            continue
+        mid = (lo + hi) // 2
+        segment = order[lo:hi]
+        order[lo:hi] = segment[np.argpartition(points[segment, depth % 3], mid - lo)]
+        stack.append((lo, mid, depth + 1))
+        stack.append((mid + 1, hi, depth + 1))
+    return order
+
+
+def build(records: list[dict],
+          path: str = GAZETTEER_PATH) -> str:
+    """
+    도시 목록 -> mmap 가능한 binary 파일 (임시 파일에 쓴 뒤 교체)
+    """
+    records = sorted(records, key = lambda r: -r["population"])   # 같은 key면 인구 많은 도시 먼저
+    labels = [next((n for n in r["alt_names"] if _HANGUL.search(n)), r["name"]) for r in records]
+
+    keys = {}
+    for index, record in enumerate(records):
+        for name in [record["name"], *record["alt_names"]]:
+            key = normalize_key(name)
+            if key:
+                keys.setdefault((key, index), None)
+    sorted_keys = sorted(keys, key = lambda item: (item[0].encode(), item[1]))
+
+    name_off, name_blob = _blob([r["name"] for r in records])
+    label_off, label_blob = _blob(labels)
+    key_off, key_blob = _blob([key for key, _ in sorted_keys])
+    lat = np.array([r["lat"] for r in records], dtype = np.float32)
+    lon = np.array([r["lon"] for r in records], dtype = np.float32)
+    xyz = _xyz(lat.astype(np.float64), lon.astype(np.float64)).astype(np.float32)
+
+    arrays = {
+        "ids": np.array([r["id"] for r in records], dtype = np.int64),
+        "population": np.array([r["population"] for r in records], dtype = np.int64),
+        "lat": lat,
+        "lon": lon,
+        "country": np.array([r["country"] for r in records], dtype = "S2"),
+        "name_off": name_off, "name_blob": name_blob,
+        "label_off": label_off, "label_blob": label_blob,
+        "key_off": key_off, "key_blob": key_blob,
+        "key_city": np.array([index for _, index in sorted_keys], dtype = np.int32),
+        "xyz": xyz,
+        "kd": _kd_order(xyz)
+    }
+
+    return write_arrays(path, MAGIC, arrays)
+
+
+# ---------------------------------------------------------------
+# read
+# ---------------------------------------------------------------
+class Gazetteer:
+    """
+    gazetteer = Gazetteer.open(path)
+    gazetteer.search("서")          # prefix (+ fuzzy) 검색
+    gazetteer.resolve("서울특별시")  # 정확히 일치하는 도시
+    gazetteer.nearest(37.5, 127.0)  # 가장 가까운 도시, 거리(km)
+    """
+
+    def __init__(self, arrays: dict[str, np.ndarray]):
+        for name, array in arrays.items():
+            setattr(self, f"_{name}", array)
+        self._key_blob_bytes = memoryview(self._key_blob)
+
+    @classmethod
+    def open(cls, path: str = GAZETTEER_PATH) -> "Gazetteer":
+        return cls(map_arrays(path, MAGIC))
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _string(self, offsets, blob, index: int) -> str:
+        return bytes(blob[offsets[index]:offsets[index + 1]]).decode()
+
+    def _key(self, index: int) -> bytes:
+        return bytes(self._key_blob_bytes[self._key_off[index]:self._key_off[index + 1]])
+
+    def city(self, index: int) -> City:
+        return City(int(self._ids[index]),
+                    self._string(self._name_off, self._name_blob, index),
+                    self._string(self._label_off, self._label_blob, index),
+                    self._country[index].decode(),
+                    float(self._lat[index]),
+                    float(self._lon[index]),
+                    int(self._population[index]))
+
+    def get(self, city_id: int) -> City | None:
+        matches = np.flatnonzero(self._ids == city_id)
+        return self.city(int(matches[0])) if len(matches) else None
+
+    def _lower_bound(self, key: bytes) -> int:
+        lo, hi = 0, len(self._key_city)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def resolve(self, text: str) -> City | None:
+        """
+        정규화한 이름이 정확히 일치하는 도시 (여러 개면 인구가 가장 많은 도시)
+        숫자만 있으면 도시 id로 찾음
+        """
+        if text.strip().isdigit():
+            return self.get(int(text))
+        key = normalize_key(text).encode()
+        if not key:
+            return None
+        position = self._lower_bound(key)
+        if position < len(self._key_city) and self._key(position) == key:
+            return self.city(int(self._key_city[position]))
+        return None
+
+    def _range(self, key: bytes) -> tuple[int, int]:
+        # key로 시작하는 검색 key 구간 (UTF-8에는 0xff byte가 없으므로 key + 0xff가 상한)
+        return self._lower_bound(key), self._lower_bound(key + b"\xff")
+
+    def _by_population(self, cities: np.ndarray,
+                       limit: int) -> np.ndarray:
+        cities = np.unique(cities)
+        if len(cities) > limit:
+            cities = cities[np.argpartition(-self._population[cities], limit - 1)[:limit]]
+        return cities[np.argsort(-self._population[cities], kind = "stable")]
+
+    def _prefix(self, key: bytes,
+                limit: int) -> list[int]:
+        lo, hi = self._range(key)
+        return self._by_population(self._key_city[lo:hi], limit).tolist()
+
+    def _fuzzy(self, key: str,
+               limit: int,
+               cutoff: float) -> list[int]:
+        # 첫 글자가 같고 길이가 비슷한 key 중 인구 많은 후보만 비교
+        lo, hi = self._range(key[0].encode())
+        raw = key.encode()
+        max_diff = max(1, len(raw) // 3)
+        positions = np.arange(lo, hi)
+        lengths = (self._key_off[lo + 1:hi + 1] - self._key_off[lo:hi]).astype(np.int64)
+        positions = positions[np.abs(lengths - len(raw)) <= max_diff]
+        if len(positions) > FUZZY_CANDIDATES:
+            top = np.argpartition(-self._population[self._key_city[positions]], FUZZY_CANDIDATES - 1)
+            positions = positions[top[:FUZZY_CANDIDATES]]
+
+        matcher = difflib.SequenceMatcher(b = key, autojunk = False)
+        scores: dict[int, float] = {}
+        for position in positions.tolist():
+            matcher.set_seq1(self._key(position).decode())
+            if matcher.quick_ratio() >= cutoff and (score := matcher.ratio()) >= cutoff:
+                index = int(self._key_city[position])
+                scores[index] = max(score, scores.get(index, 0.0))
+        ranked = sorted(scores, key = lambda index: (-scores[index], -self._population[index]))
+        return ranked[:limit]
+
+    def search(self, text: str,
+               limit: int = 10,
+               fuzzy: bool = True,
+               cutoff: float = 0.75) -> list[City]:
+        """
+        입력 중인 이름으로 후보 도시 검색 (prefix 우선, 부족하면 fuzzy로 채움)
+        """
+        key = normalize_key(text)
+        if not key:
+            return []
+        found = self._prefix(key.encode(), limit)
+        if fuzzy and len(found) < limit and len(key) >= 2:
+            for index in self._fuzzy(key, limit, cutoff):
+                if index not in found:
+                    found.append(index)
+                if len(found) >= limit:
+                    break
+        return [self.city(index) for index in found]
+
+    def nearest(self, lat: float,
+                lon: float) -> tuple[City, float] | None:
+        """
+        가장 가까운 도시와 거리(km)
+        """
+        if len(self._ids) == 0:
+            return None
+        target = _xyz(lat, lon)
+        best, best_dist = -1, math.inf
+        stack = [(0, len(self._kd), 0)]
+        while stack:
+            lo, hi, depth = stack.pop()
+            if lo >= hi:
+                continue
+            mid = (lo + hi) // 2
+            index = self._kd[mid]
+            point = self._xyz[index]
+            dist = float(((point - target) ** 2).sum())
+            if dist < best_dist:
+                best, best_dist = int(index), dist
+            diff = float(target[depth % 3] - point[depth % 3])
+            near, far = ((lo, mid), (mid + 1, hi)) if diff < 0 else ((mid + 1, hi), (lo, mid))
+            if diff * diff < best_dist:
+                stack.append((*far, depth + 1))      # 분할 평면 너머에 더 가까운 점이 있을 수 있음
+            stack.append((*near, depth + 1))
+        chord = math.sqrt(best_dist)
+        return self.city(best), 2 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2))
+
+
+_gazetteer: Gazetteer | None = None
+_failure: tuple[float, Exception] | None = None    # (실패 시각 monotonic, 오류)
+_lock = threading.Lock()
+logger = logging.getLogger(__name__)
+
+
+def get_gazetteer() -> Gazetteer:
+    """
+    공유 gazetteer (파일이 없거나 번들 CSV보다 오래됐으면 먼저 build)
+    실패하면 GAZETTEER_RETRY_INTERVAL초 동안은 build 없이 같은 오류(OSError / ValueError)
+    """
+    global _gazetteer, _failure
+    with _lock:
+        if _gazetteer is not None:
+            return _gazetteer
+        if _failure is not None and time.monotonic() - _failure[0] < GAZETTEER_RETRY_INTERVAL:
+            raise _failure[1].with_traceback(None)
+        try:
+            stale = (not os.path.exists(GAZETTEER_PATH)
+                     or os.path.getmtime(GAZETTEER_PATH) < os.path.getmtime(DEFAULT_CSV))
+            if stale and "GAZETTEER_PATH" not in os.environ:
+                os.makedirs(GAZETTEER_CACHE_DIR, exist_ok = True)
+                build(read_cities_csv(DEFAULT_CSV), GAZETTEER_PATH)
+            _gazetteer = Gazetteer.open(GAZETTEER_PATH)
+        except (OSError, ValueError) as e:
+            _failure = (time.monotonic(), e)
+            logger.warning("gazetteer를 만들거나 읽지 못했습니다 (%s초 뒤 다시 시도)",
+                           GAZETTEER_RETRY_INTERVAL, exc_info = True)
+            raise
+        _failure = None
+        return _gazetteer
+
+
+def main():
+    parser = argparse.ArgumentParser(description = "도시 gazetteer")
+    sub = parser.add_subparsers(dest = "command", required = True)
+    build_parser = sub.add_parser("build", help = "binary gazetteer 생성")
+    build_parser.add_argument("--geonames", default = None, help = "GeoNames cities*.txt (기본: 번들 CSV)")
+    build_parser.add_argument("--out", default = GAZETTEER_PATH)
+    search_parser = sub.add_parser("search", help = "이름 검색")
+    search_parser.add_argument("text")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        records = read_geonames(args.geonames) if args.geonames else read_cities_csv()
+        print(f"{len(records)}개 도시 -> {build(records, args.out)}")
+    else:
+        for city in get_gazetteer().search(args.text):
+            print(city)
+
+
+if __name__ == "__main__":
+    main()
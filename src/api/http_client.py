@@ -0,0 +1,124 @@
+import asyncio
+import os
+import threading
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# OpenWeatherMap / ip-api 호출이 공유하는 HTTP client
+# 매 호출마다 requests.get을 쓰면 TCP/TLS handshake가 반복되므로
+# 하나의 Session에 keep-alive connection pool을 두고 재사용
+
+POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "10"))  # host별 pool 개수
+POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "20"))          # host당 최대 connection 수
+RETRY_TOTAL = int(os.getenv("HTTP_RETRY_TOTAL", "3"))
+RETRY_BACKOFF = float(os.getenv("HTTP_RETRY_BACKOFF", "0.5"))     # 0.5s, 1s, 2s ...
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_session: requests.Session | None = None
+_lock = threading.Lock()
+
+
+def build_session(pool_connections: int = POOL_CONNECTIONS,
+                  pool_maxsize: int = POOL_MAXSIZE,
+                  retries: int = RETRY_TOTAL,
+                  backoff: float = RETRY_BACKOFF) -> requests.Session:
+    """
+    connection pool + retry 설정이 적용된 Session 생성
+    """
+    retry = Retry(
+        total = retries,
+        backoff_factor = backoff,
+        status_forcelist = RETRY_STATUSES,
+        allowed_methods = frozenset(["GET"]),
+        respect_retry_after_header = True,   # 429의 Retry-After 존중
+        raise_on_status = False              # 재시도 후에도 실패하면 마지막 응답을 그대로 반환
+    )
+    adapter = HTTPAdapter(pool_connections = pool_connections,
+                          pool_maxsize = pool_maxsize,
+                          max_retries = retry)
+
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """
+    프로세스 전체에서 공유하는 Session 반환 (최초 호출 시 생성)
+    """
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = build_session()
+    return _session
+
+
+def configure_session(**kwargs) -> requests.Session:
+    """
+    pool 크기/재시도 설정을 바꿔 공유 Session을 다시 생성
+    (예: configure_session(pool_maxsize = 50))
+    """
+    global _session
+    with _lock:
+        old = _session
+        _session = build_session(**kwargs)
+    if old is not None:
+        old.close()
+    return _session
+
+
+# 비동기 client (httpx)
+# httpx.AsyncClient는 생성된 event loop에 묶이므로 loop마다 하나씩 둠
+_async_clients: dict[int, tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = {}
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    현재 event loop에서 공유하는 httpx.AsyncClient 반환
+    """
+    loop = asyncio.get_running_loop()
+    entry = _async_clients.get(id(loop))
+    if entry is None or entry[0] is not loop or entry[1].is_closed:
+        # 이미 닫힌 loop의 client는 정리
+        for key, (old_loop, _) in list(_async_clients.items()):
+            if old_loop.is_closed():
+                del _async_clients[key]
+
+        client = httpx.AsyncClient(
+            limits = httpx.Limits(max_connections = POOL_CONNECTIONS * POOL_MAXSIZE,
+                                  max_keepalive_connections = POOL_MAXSIZE),
+            transport = httpx.AsyncHTTPTransport(retries = RETRY_TOTAL)   # 연결 오류 재시도
+        )
+        entry = _async_clients[id(loop)] = (loop, client)
+    return entry[1]
+
+
+async def async_get(url: str,
+                    params: dict | None = None,
+                    timeout: float = 10) -> httpx.Response:
+    """
+    동기 Session과 같은 정책으로 429/5xx를 backoff 재시도하는 GET
+    """
+    client = get_async_client()
+    for attempt in range(RETRY_TOTAL + 1):
+        response = await client.get(url, params = params, timeout = timeout)
+        if response.status_code not in RETRY_STATUSES or attempt == RETRY_TOTAL:
+            break
+
+        retry_after = response.headers.get("Retry-After", "")
+        delay = float(retry_after) if retry_after.isdigit() else RETRY_BACKOFF * (2 ** attempt)
+        await asyncio.sleep(delay)
+    return response
+
+
+async def close_async_client():
+    """
+    현재 event loop의 client 종료 (FastAPI shutdown 등에서 호출)
+    """
+    entry = _async_clients.pop(id(asyncio.get_running_loop()), None)
+    if entry is not None:
+        await entry[1].aclose()
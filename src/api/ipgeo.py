@@ -0,0 +1,357 @@
+import argparse
+import csv
+import gzip
+import ipaddress
+import logging
+import os
+import socket
+import threading
+import time
+import numpy as np
+from .arrayfile import write_arrays, map_arrays
+from .cache import TTLCache
+from .decoding import decode_response
+from .http_client import get_session, async_get
+
+# 로컬 IP 위치 DB
+# - IP 대역 CSV(DB-IP "IP to City Lite" / IP2Location LITE DB5)로 만든 binary 파일을 mmap으로 읽음
+# - IPv4는 IPv4-mapped IPv6(::ffff:a.b.c.d)로 바꿔 모든 주소를 128bit (상위 64bit, 하위 64bit)로 다룸
+#   -> 대역 시작 주소가 정렬돼 있으므로 np.searchsorted 두 번으로 대역을 찾음 (network 없음, 수 µs)
+# - 요청한 사용자의 IP는 기본적으로 직접 연결한 주소 (X-Forwarded-For는 누구나 넣을 수 있으므로 무시)
+#   reverse proxy/load balancer 뒤에 배포하면 TRUSTED_PROXY_HOPS를 proxy 수로 설정해야
+#   proxy가 붙인 X-Forwarded-For에서 (오른쪽에서 hops번째) 사용자 IP를 꺼냄
+# - 로컬 DB에 없거나 DB 파일이 없으면 원격 서비스(ip-api)로 조회 (선택, 결과는 캐시)
+# - 사설/loopback 주소(개발 환경)는 이 서버의 공인 IP 위치로 대신함
+# 실행: python -m src.api.ipgeo build dbip-city-lite-2026-10.csv.gz [--out path]
+#       python -m src.api.ipgeo lookup 1.1.1.1
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+IP_GEO_PATH = os.getenv("IP_GEO_PATH", os.path.join(DATA_DIR, "ipgeo.bin"))
+TRUSTED_PROXY_HOPS = int(os.getenv("TRUSTED_PROXY_HOPS", "0"))   # X-Forwarded-For를 붙이는 proxy 수 (0: 헤더 무시)
+IP_GEO_REMOTE = os.getenv("IP_GEO_REMOTE", "1") == "1"            # 로컬 DB에 없으면 원격 조회
+IP_GEO_REMOTE_TIMEOUT = float(os.getenv("IP_GEO_REMOTE_TIMEOUT", "2"))
+IP_GEO_CACHE_TTL = int(os.getenv("IP_GEO_CACHE_TTL", 24 * 60 * 60))
+IP_LOCATION_URL = "https://ip-api.com/json/"
+
+MAGIC = b"IPG1"
+_MAPPED_V4 = 0xFFFF << 32
+_LOW = (1 << 64) - 1
+
+Location = tuple[float | None, float | None, str | None]   # (위도, 경도, 도시)
+UNKNOWN: Location = (None, None, None)
+
+
+def ip_key(ip: str) -> int:
+    """
+    IP -> 128bit 정수 (IPv4는 IPv4-mapped IPv6 주소로, 잘못된 IP면 ValueError)
+    ipaddress.ip_address보다 빠른 inet_pton 사용 (조회마다 호출되므로)
+    """
+    try:
+        return _MAPPED_V4 | int.from_bytes(socket.inet_pton(socket.AF_INET, ip), "big")
+    except OSError:
+        pass
+    try:
+        return int.from_bytes(socket.inet_pton(socket.AF_INET6, ip), "big")
+    except OSError:
+        raise ValueError(f"잘못된 IP 주소: {ip!r}") from None
+
+
+def _parse_bound(value: str) -> int:
+    # IP2Location은 IPv4 정수, DB-IP는 주소 문자열
+    value = value.strip()
+    return _MAPPED_V4 | int(value) if value.isdigit() else ip_key(value)
+
+
+def read_range_csv(path: str) -> list[tuple[int, int, str, str, float, float]]:
+    """
+    IP 대역 CSV -> (시작, 끝, 국가, 도시, 위도, 경도)
+    DB-IP city lite: start, end, continent, country, region, city, lat, lon
+    IP2Location DB5: start, end, country, country name, region, city, lat, lon
+    """
+    opener = gzip.open if path.endswith(".gz") else open
+    records = []
+    with opener(path, "rt", encoding = "utf-8", newline = "") as f:
+        for row in csv.reader(f):
+            if len(row) < 8 or not row[0].strip():
+                continue
+            try:
+                start, end = _parse_bound(row[0]), _parse_bound(row[1])
+            except ValueError:
+                continue            # header 행
+            country = row[3] if len(row[3]) == 2 else row[2]
+            if country in ("-", "ZZ") or not row[6]:      # 예약/사설 대역
+                continue
+            records.append((start, end, country, row[5], float(row[6]), float(row[7])))
+    return records
+
+
+def build(records: list[tuple[int, int, str, str, float, float]],
+          path: str = IP_GEO_PATH) -> str:
+    """
+    IP 대역 목록 -> mmap 가능한 binary 파일
+    위치(국가, 도시, 좌표)는 중복을 제거해 따로 두고 대역은 위치 번호만 가짐
+    """
+    records = sorted(records)
+    locations: dict[tuple, int] = {}
+    location_of = [locations.setdefault((country, city, lat, lon), len(locations))
+                   for _, _, country, city, lat, lon in records]
+    unique = list(locations)
+
+    city_blob = [city.encode() for _, city, _, _ in unique]
+    city_off = np.zeros(len(unique) + 1, dtype = np.uint32)
+    np.cumsum([len(b) for b in city_blob], out = city_off[1:])
+
+    arrays = {
+        "start_hi": np.array([start >> 64 for start, *_ in records], dtype = np.uint64),
+        "start_lo": np.array([start & _LOW for start, *_ in records], dtype = np.uint64),
+        "end_hi": np.array([end >> 64 for _, end, *_ in records], dtype = np.uint64),
+        "end_lo": np.array([end & _LOW for _, end, *_ in records], dtype = np.uint64),
+        "location": np.array(location_of, dtype = np.int32),
+        "country": np.array([country for country, *_ in unique], dtype = "S2"),
+        "lat": np.array([lat for *_, lat, _ in unique], dtype = np.float32),
+        "lon": np.array([lon for *_, lon in unique], dtype = np.float32),
+        "city_off": city_off,
+        "city_blob": np.frombuffer(b"".join(city_blob), dtype = np.uint8)
+    }
+    return write_arrays(path, MAGIC, arrays)
+
+
+class IpDatabase:
+    """
+    db = IpDatabase.open(path)
+    db.lookup("1.1.1.1")   # (위도, 경도, 도시) 또는 None
+    """
+
+    def __init__(self, arrays: dict[str, np.ndarray]):
+        for name, array in arrays.items():
+            setattr(self, f"_{name}", array)
+        self._hi_ranges: dict[int, tuple[int, int]] = {}
+        self._locations: dict[int, Location] = {}
+
+    @classmethod
+    def open(cls, path: str = IP_GEO_PATH) -> "IpDatabase":
+        return cls(map_arrays(path, MAGIC))
+
+    def __len__(self) -> int:
+        return len(self._start_hi)
+
+    def _hi_range(self, hi: int) -> tuple[int, int]:
+        # 상위 64bit가 hi인 대역 구간 (IPv4는 모두 hi = 0이라 거의 항상 같은 구간 -> 캐시)
+        found = self._hi_ranges.get(hi)
+        if found is None:
+            value = np.uint64(hi)
+            found = (int(np.searchsorted(self._start_hi, value, "left")),
+                     int(np.searchsorted(self._start_hi, value, "right")))
+            if len(self._hi_ranges) < 4096:
+                self._hi_ranges[hi] = found
+        return found
+
+    def _find(self, key: int) -> int | None:
+        # 시작 주소가 key 이하인 마지막 대역: 상위 64bit 구간 안에서 하위 64bit로 이분 탐색
+        # (해당 구간에 없으면 left - 1 = 그 앞 대역)
+        hi, lo = key >> 64, key & _LOW
+        left, right = self._hi_range(hi)
+        index = left + int(self._start_lo[left:right].searchsorted(np.uint64(lo), "right")) - 1
+        if index < 0:
+            return None
+        if (int(self._end_hi[index]) << 64 | int(self._end_lo[index])) < key:
+            return None             # 대역 사이 빈 구간
+        return int(self._location[index])
+
+    def lookup(self, ip: str) -> Location | None:
+        """
+        IP가 속한 대역의 위치 (DB에 없으면 None)
+        """
+        location = self._find(ip_key(ip))
+        if location is None:
+            return None
+        found = self._locations.get(location)
+        if found is None:
+            city = bytes(self._city_blob[self._city_off[location]:self._city_off[location + 1]]).decode()
+            found = (float(self._lat[location]), float(self._lon[location]), city or None)
+            self._locations[location] = found      # 위치 종류는 대역 수보다 훨씬 적음
+        return found
+
+
+def client_ip(headers,
+              peer: str | None = None,
+              hops: int = TRUSTED_PROXY_HOPS) -> str | None:
+    """
+    요청한 사용자의 IP
+    X-Forwarded-For는 proxy마다 오른쪽에 주소를 덧붙이므로 신뢰하는 proxy 수(hops)만큼
+    오른쪽에서 센 주소를 사용 (사용자가 임의로 넣은 왼쪽 값은 무시), 없으면 직접 연결한 주소
+    """
+    forwarded = headers.get("x-forwarded-for") or headers.get("X-Forwarded-For")
+    if forwarded and hops > 0:
+        chain = [part.strip() for part in forwarded.split(",") if part.strip()]
+        if chain:
+            peer = chain[-min(hops, len(chain))]
+    if not peer:
+        return None
+    try:
+        return str(ipaddress.ip_address(peer))
+    except ValueError:
+        return None
+
+
+_db: IpDatabase | None = None
+_db_checked = False
+_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_remote_cache = TTLCache(max_bytes = 4 * 1024 * 1024)
+_stats = {"local": 0, "remote": 0, "cached": 0, "private": 0, "unknown": 0, "local_seconds": 0.0}
+
+
+def get_database() -> IpDatabase | None:
+    """
+    공유 IP DB (파일이 없거나 읽지 못하면 None -> 원격 조회만 사용)
+    """
+    global _db, _db_checked
+    with _lock:
+        if not _db_checked:
+            _db_checked = True
+            try:
+                _db = IpDatabase.open(IP_GEO_PATH)
+            except FileNotFoundError:
+                logger.info("IP 위치 DB(%s)가 없어 원격 조회만 사용합니다", IP_GEO_PATH)
+            except (OSError, ValueError):
+                logger.warning("IP 위치 DB(%s)를 읽지 못했습니다", IP_GEO_PATH, exc_info = True)
+        return _db
+
+
+def _count(name: str,
+           seconds: float = 0.0):
+    with _stats_lock:
+        _stats[name] += 1
+        if seconds:
+            _stats["local_seconds"] += seconds
+
+
+def _from_remote(data: dict) -> Location:
+    if data.get("status", "success") != "success":
+        return UNKNOWN
+    return data.get("lat"), data.get("lon"), data.get("city")
+
+
+def _remote(ip: str | None) -> Location:
+    # ip가 None이면 이 서버의 공인 IP 기준 (예전 동작)
+    try:
+        return _from_remote(decode_response(get_session().get(f"{IP_LOCATION_URL}{ip or ''}",
+                                                               timeout = IP_GEO_REMOTE_TIMEOUT)))
+    except Exception:
+        return UNKNOWN
+
+
+async def _remote_async(ip: str | None) -> Location:
+    try:
+        return _from_remote(decode_response(await async_get(f"{IP_LOCATION_URL}{ip or ''}",
+                                                            timeout = IP_GEO_REMOTE_TIMEOUT)))
+    except Exception:
+        return UNKNOWN
+
+
+def _public(ip: str | None) -> str | None:
+    # 사설/loopback 주소(개발 환경, 같은 망)는 이 서버의 공인 IP 위치로 대신함 -> None
+    if ip is not None and not ipaddress.ip_address(ip).is_global:
+        _count("private")
+        return None
+    return ip
+
+
+def _local(ip: str | None) -> Location | None:
+    if ip is None:
+        return None
+    database = get_database()
+    if database is not None:
+        start = time.perf_counter()
+        found = database.lookup(ip)
+        if found is not None:
+            _count("local", time.perf_counter() - start)
+            return found
+    return None
+
+
+def _cached_remote(ip: str | None) -> tuple[str, Location | None]:
+    key = ip or "self"
+    cached = _remote_cache.get(key)
+    if cached is not None:
+        _count("cached")
+        return key, tuple(cached)
+    return key, None
+
+
+def _remember(key: str,
+              found: Location) -> Location:
+    _count("remote")
+    # 실패도 짧게 캐시해서 같은 IP로 원격 호출이 몰리지 않게 함
+    _remote_cache.set(key, list(found), IP_GEO_CACHE_TTL if found[0] is not None else 60)
+    return found
+
+
+def locate_ip(ip: str | None,
+              remote: bool = IP_GEO_REMOTE) -> Location:
+    """
+    IP -> (위도, 경도, 도시)
+    로컬 DB 우선, 없으면 (remote일 때) 원격 조회 결과를 IP_GEO_CACHE_TTL 동안 캐시
+    사설/loopback 주소나 None이면 이 서버의 공인 IP 기준 (잘못된 IP면 ValueError)
+    """
+    found = _local(ip)
+    if found is not None:
+        return found
+    ip = _public(ip)
+    if not remote:
+        _count("unknown")
+        return UNKNOWN
+    key, found = _cached_remote(ip)
+    return found if found is not None else _remember(key, _remote(ip))
+
+
+async def locate_ip_async(ip: str | None,
+                          remote: bool = IP_GEO_REMOTE) -> Location:
+    """
+    locate_ip의 비동기 버전 (원격 조회만 비동기, 로컬 DB 조회는 바로 끝남)
+    """
+    found = _local(ip)
+    if found is not None:
+        return found
+    ip = _public(ip)
+    if not remote:
+        _count("unknown")
+        return UNKNOWN
+    key, found = _cached_remote(ip)
+    return found if found is not None else _remember(key, await _remote_async(ip))
+
+
+def ip_geo_stats() -> dict:
+    database = get_database()
+    with _stats_lock:
+        stats = dict(_stats)
+    seconds = stats.pop("local_seconds")
+    return {"database": IP_GEO_PATH if database is not None else None,
+            "ranges": len(database) if database is not None else 0,
+            **stats,
+            "local_avg_us": round(seconds / stats["local"] * 1e6, 2) if stats["local"] else None,
+            "remote_cache": _remote_cache.stats()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description = "로컬 IP 위치 DB")
+    sub = parser.add_subparsers(dest = "command", required = True)
+    build_parser = sub.add_parser("build", help = "IP 대역 CSV로 binary DB 생성")
+    build_parser.add_argument("csv", help = "DB-IP city lite 또는 IP2Location LITE DB5 CSV (.gz 가능)")
+    build_parser.add_argument("--out", default = IP_GEO_PATH)
+    lookup_parser = sub.add_parser("lookup", help = "IP 조회")
+    lookup_parser.add_argument("ip")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        records = read_range_csv(args.csv)
+        print(f"{len(records)}개 대역 -> {build(records, args.out)}")
+    else:
+        print(locate_ip(args.ip, remote = False))
+
+
+if __name__ == "__main__":
+    main()
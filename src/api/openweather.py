@@ -1,8 +1,29 @@
-import requests
-import pandas as pd
+import logging
+import os
 import streamlit as st
+from .http_client import get_session
+from .cache import CacheBackend, backend_from_env, cached_fetch
+from .coalesce import SingleFlight, AsyncSingleFlight
+from .decoding import decode_response
+from .gazetteer import City, get_gazetteer
+from .ipgeo import locate_ip
+from .ratelimit import QuotaGovernor, QuotaExceeded, INTERACTIVE, BACKGROUND
 
-API_KEY = st.secrets["OPENWEATHERMAP_API_KEY"]
+def _load_api_key() -> str | None:
+    """
+    환경 변수 우선, 없으면 Streamlit secrets
+    (FastAPI처럼 secrets.toml이 없는 프로세스에서도 import 가능하도록)
+    """
+    key = os.getenv("OPENWEATHERMAP_API_KEY")
+    if key:
+        return key
+    try:
+        return st.secrets["OPENWEATHERMAP_API_KEY"]
+    except Exception:
+        return None
+
+
+API_KEY = _load_api_key()
 
 """
 특정 도시의 현재 날씨 정보를 OpenWeatherMap API에서 가져옴.
@@ -32,73 +53,320 @@ CITY_MAP = {
     "울산": "Ulsan"
 }
 
-# 1. 특정 장소의 데이터 가져오기 => API 호출
-def get_weather(city_name: str,
-                API_KEY: str) -> dict:
+# 응답 캐시 설정
+# upstream 갱신 주기에 맞춘 TTL: 현재 날씨 약 10분, 예보 3시간 단위
+CURRENT_WEATHER_TTL = int(os.getenv("CURRENT_WEATHER_TTL", 10 * 60))
+FORECAST_TTL = int(os.getenv("FORECAST_TTL", 3 * 60 * 60))
+COORD_GRID = float(os.getenv("WEATHER_COORD_GRID", "0.01"))   # 좌표 반올림 격자 (약 1km)
+
+# WEATHER_CACHE_BACKEND = memory | sqlite | redis (여러 worker가 공유하려면 sqlite/redis)
+_backend: CacheBackend = backend_from_env()
+
+# 같은 정규화 key로 동시에 들어온 호출은 upstream 요청 하나를 공유
+_flight = SingleFlight()
+_async_flight = AsyncSingleFlight()
+
+# API key 호출 예산 (분당/일당). 예산이 없으면 마지막 정상 응답(stale)을 대신 반환
+_governor = QuotaGovernor.from_env()
+STALE_TTL = int(os.getenv("WEATHER_STALE_TTL", 24 * 60 * 60))
+STALE_PREFIX = "stale:"
+
+# 사용자 요청 관찰용 listener (예: 인기 지역 미리 갱신 scheduler)
+# listener(kind, key, args) 형태로 interactive 요청마다 호출됨
+_request_listeners: list = []
+
+# upstream에서 새로 받은 정상 응답 listener (예: 관측/예보 이력 저장)
+# listener(key, data) 형태로 캐시 hit이 아닌 실제 upstream 응답마다 호출됨
+_payload_listeners: list = []
+
+logger = logging.getLogger(__name__)
+
+
+def resolve_city(city_name: str) -> City | None:
     """
-    특정 도시의 현재 날씨 정보를 가져옴 => API 호출
+    gazetteer에서 이름이 정확히 일치하는 도시 (없거나 gazetteer를 못 읽으면 None)
+    gazetteer 오류 경고는 get_gazetteer가 재시도 주기마다 한 번만 남김
+    """
+    try:
+        return get_gazetteer().resolve(city_name)
+    except (OSError, ValueError):
+        return None
+
+
+def _city_key(city_name: str,
+              city: City | None) -> str:
+    if city is not None:
+        return str(city.id)
+    name = city_name.strip()
+    return CITY_MAP.get(name, name).casefold()
+
+
+def normalize_city(city_name: str) -> str:
+    """
+    캐시 key용 도시 이름 정규화
+    gazetteer에 있는 도시는 도시 id (표기가 달라도 같은 key), 없으면 CITY_MAP 변환 후 소문자
+    """
+    return _city_key(city_name, resolve_city(city_name))
+
+
+def _city_params(city_name: str,
+                 city: City | None) -> dict:
+    # gazetteer에 있는 도시는 id로 조회 (동명 도시/표기 차이로 다른 도시가 나오지 않음)
+    if city is not None:
+        return {"id": city.id}
+    # 한글 입력 -> 영어 변환, CITY_MAP에 없으면 그대로 사용(예: 이미 영어로 입력한 경우)
+    return {"q": CITY_MAP.get(city_name, city_name)}
+
+
+def _city_request(city_name: str) -> tuple[str, dict]:
+    """
+    도시 이름 -> (캐시 key용 도시 key, 조회 params), gazetteer 조회는 한 번만
+    """
+    city = resolve_city(city_name)
+    return _city_key(city_name, city), _city_params(city_name, city)
+
+
+def normalize_coords(lat: float,
+                     lon: float,
+                     grid: float = COORD_GRID) -> tuple[float, float]:
+    """
+    가까운 좌표가 같은 key가 되도록 격자에 맞춰 반올림
+    """
+    return (round(round(lat / grid) * grid, 6),
+            round(round(lon / grid) * grid, 6))
+
+
+def set_cache_backend(backend: CacheBackend):
+    """
+    캐시 backend 교체 (예: SQLiteBackend, RedisBackend)
+    """
+    global _backend
+    _backend = backend
+
+
+def cache_stats() -> dict:
+    """
+    응답 캐시의 hit/miss/eviction 카운터
     """
+    return _backend.stats()
 
-    # 한글 입력 -> 영어 변환
-    query = CITY_MAP.get(city_name, city_name)
-    # 만약 CITY_MAP에 없으면, 그대로 사용(예: 이미 영어로 입력한 경우)
 
+def coalesce_stats() -> dict:
+    """
+    진행 중인 동일 요청을 합친(coalesced) 횟수
+    """
+    return {"threaded": _flight.stats(),
+            "async": _async_flight.stats()}
+
+
+def quota_stats() -> dict:
+    """
+    API key 남은 예산(분당/일당)과 대기/포기 카운터
+    """
+    return _governor.stats()
+
+
+def _remember(key: str,
+              data) -> dict:
+    """
+    정상 응답은 예산 소진 시 대신 쓸 수 있도록 긴 TTL로 따로 보관
+    """
+    if is_ok_response(data):
+        _backend.set(STALE_PREFIX + key, data, STALE_TTL)
+        for listener in _payload_listeners:
+            try:
+                listener(key, data)
+            except Exception:
+                logger.exception("payload listener 실패: %s", key)
+    return data
+
+
+def _stale_or_error(key: str,
+                    error: QuotaExceeded) -> dict:
+    """
+    예산 초과 시: 마지막 정상 응답(stale 표시) 또는 429 형태의 오류 dict
+    """
+    stale = _backend.get(STALE_PREFIX + key)
+    if stale is not None:
+        return {**stale, "stale": True}
+    return {"cod": "429", "message": str(error)}
+
+
+def cached_forecast(location: str) -> dict | None:
+    """
+    캐시에 있는 예보만 반환 (upstream 호출 없음), 만료됐으면 마지막 정상 응답(stale)
+    location: normalize_city 결과
+    """
+    key = f"forecast:{location}"
+    return _backend.get(key) or _backend.get(STALE_PREFIX + key)
+
+
+def add_request_listener(listener):
+    _request_listeners.append(listener)
+
+
+def remove_request_listener(listener):
+    if listener in _request_listeners:
+        _request_listeners.remove(listener)
+
+
+def add_payload_listener(listener):
+    _payload_listeners.append(listener)
+
+
+def remove_payload_listener(listener):
+    if listener in _payload_listeners:
+        _payload_listeners.remove(listener)
+
+
+def _notify(kind: str,
+            key: str,
+            args: tuple,
+            priority: str):
+    if priority != INTERACTIVE:
+        return   # background 갱신은 인기도에 포함하지 않음
+    for listener in _request_listeners:
+        listener(kind, key, args)
+
+
+def _cached(key: str,
+            ttl: int,
+            fetch,
+            priority: str = INTERACTIVE,
+            refresh: bool = False) -> dict:
+    """
+    캐시에 있으면 그대로 반환, 없으면 fetch() 호출 후
+    정상 응답(cod == 200)만 저장
+    (만료 직후 여러 프로세스가 몰려도 lock을 잡은 하나만 upstream 호출,
+     같은 프로세스 안의 동시 호출은 single-flight로 하나로 합침,
+     upstream 호출 전에는 호출 예산 확인)
+    """
+    def governed():
+        try:
+            _governor.acquire(priority)
+        except QuotaExceeded as e:
+            return _stale_or_error(key, e)
+        return _remember(key, fetch())
+
+    return _flight.do(key, lambda: cached_fetch(_backend, key, ttl, governed,
+                                                cacheable = is_fresh_response,
+                                                refresh = refresh))
+
+
+def is_ok_response(data) -> bool:
+    return isinstance(data, dict) and str(data.get("cod")) == "200"
+
+
+def is_fresh_response(data) -> bool:
+    """
+    캐시에 저장해도 되는 응답 (정상 + stale 아님)
+    """
+    return is_ok_response(data) and not data.get("stale")
+
+# upstream 요청 정의: (캐시 key, url, params)
+# 동기/비동기 client가 같은 요청을 만들도록 공유
+def weather_request(city_name: str,
+                    API_KEY: str) -> tuple[str, str, dict]:
     url = "http://api.openweathermap.org/data/2.5/weather"
+    location, city_params = _city_request(city_name)
     params = {
-        "q": query,
+        **city_params,
         "appid": API_KEY,
         "units": "metric",  # 섭씨 단위
         "lang": "KR"        # 한국어 응답
     }
-    response = requests.get(url, params=params, timeout=10)
-    return response.json()
+    return f"weather:{location}", url, params
+
+
+def forecast_request(city_name: str,
+                     API_KEY: str) -> tuple[str, str, dict]:
+    url = "http://api.openweathermap.org/data/2.5/forecast"
+    location, city_params = _city_request(city_name)
+    params = {
+        **city_params,
+        "appid": API_KEY,
+        "units": "metric",
+        "lang": "KR"
+    }
+    return f"forecast:{location}", url, params
+
+
+def coords_request(lat: float,
+                   lon: float,
+                   API_KEY: str) -> tuple[str, str, dict]:
+    # 격자에 맞춰 반올림한 좌표로 조회 -> 근처 좌표는 캐시 공유
+    lat, lon = normalize_coords(lat, lon)
+    url = f"https://api.openweathermap.org/data/2.5/weather?lat={lat}&lon={lon}&appid={API_KEY}&units=metric&lang=kr"
+    return f"current:{lat}:{lon}", url, {}
+
+
+# 1. 특정 장소의 데이터 가져오기 => API 호출
+def get_weather(city_name: str,
+                API_KEY: str,
+                priority: str = INTERACTIVE,
+                refresh: bool = False) -> dict:
+    """
+    특정 도시의 현재 날씨 정보를 가져옴 => API 호출
+    """
+    key, url, params = weather_request(city_name, API_KEY)
+    _notify("weather", key, (city_name,), priority)
+
+    def fetch():
+        response = get_session().get(url, params=params, timeout=10)
+        return decode_response(response)
+
+    return _cached(key, CURRENT_WEATHER_TTL, fetch, priority, refresh)
 
 
 # 2. 날씨 데이터 가져오기 => API 호출
 def get_forecast(city_name: str,
-                 API_KEY: str) -> dict:
+                 API_KEY: str,
+                 priority: str = INTERACTIVE,
+                 refresh: bool = False) -> dict:
     """
     특정 도시의 5일치 3시간 단위 예보를 가져옴 => API 호출
     """
+    key, url, params = forecast_request(city_name, API_KEY)
+    _notify("forecast", key, (city_name,), priority)
 
-    # 한글 입력 -> 영어 변환
-    query = CITY_MAP.get(city_name, city_name)
-    # 만약 CITY_MAP에 없으면, 그대로 사용(예: 이미 영어로 입력한 경우)
+    def fetch():
+        response = get_session().get(url, params=params, timeout=10)
+        return decode_response(response)
 
-    url = f"http://api.openweathermap.org/data/2.5/forecast?q={query}&appid={API_KEY}&units=metric&lang=kr"
-    params = {
-        "q": query,
-        "appid": API_KEY,
-        "units": "metric",
-        "lang": "KR"
-    }
-    response = requests.get(url, params=params, timeout=10)
-    return response.json()
+    return _cached(key, FORECAST_TTL, fetch, priority, refresh)
 
 # 3. 위도(lat), 경도(lon)로 현재 날씨를 가져옴
 def get_current_weather_by_coords(lat: float,
                                   lon: float,
-                                  API_KEY: str) -> dict:
+                                  API_KEY: str,
+                                  priority: str = INTERACTIVE,
+                                  refresh: bool = False) -> dict:
     """
     위도(latitude): lat
     경도(longitude): lon
     """
-    url = f"https://api.openweathermap.org/data/2.5/weather?lat={lat}&lon={lon}&appid={API_KEY}&units=metric&lang=kr"
-    try:
-        response = requests.get(url, timeout = 10)
-        return response.json()  # 실패해도 dict 반환
-    except Exception as e:
-        return {"cod": "500", "message": str(e)}
+    key, url, params = coords_request(lat, lon, API_KEY)
+    _notify("current", key, (lat, lon), priority)
+
+    def fetch():
+        try:
+            response = get_session().get(url, timeout = 10)
+            return decode_response(response)  # 실패해도 dict 반환
+        except Exception as e:
+            return {"cod": "500", "message": str(e)}
+
+    return _cached(key, CURRENT_WEATHER_TTL, fetch, priority, refresh)
 
 # 4. IP 기반 대략적인 위치를 가져옴 => API 사용
-def get_location_by_ip() -> tuple[float | None,
-                                  float | None,
-                                  str | None]:
+def get_location_by_ip(ip: str | None = None) -> tuple[float | None,
+                                                     float | None,
+                                                     str | None]:
     """
-    tuple로 항목을 가져옴
+    IP 기반 대략적인 위치 (위도, 경도, 도시) tuple
+    ip: 요청한 사용자의 IP (ipgeo.client_ip), 로컬 IP DB에서 먼저 찾음
+        None이면 원격 서비스가 보는 이 서버의 IP 기준
     """
     try:
-        data = requests.get("https://ip-api.com/json/", timeout=8).json()
-        return data.get("lat"), data.get("lon"), data.get("city")
-    except Exception:
+        return locate_ip(ip)
+    except ValueError:
         return None, None, None
@@ -0,0 +1,133 @@
+import asyncio
+from .http_client import async_get
+from .cache import async_cached_fetch
+from .decoding import decode_response
+from .ipgeo import locate_ip_async
+from . import openweather
+from .openweather import CURRENT_WEATHER_TTL, FORECAST_TTL, \
+                         weather_request, forecast_request, coords_request, \
+                         is_fresh_response
+from .ratelimit import QuotaExceeded, INTERACTIVE
+
+# openweather.py의 비동기(httpx) 버전
+# 함수 이름/인자/반환값은 동기 client와 같고, 캐시 backend도 공유함
+# 한 페이지에 필요한 여러 호출(IP 위치, 현재 날씨, 예보)을 동시에 보낼 수 있음
+
+
+async def _cached(key: str,
+                  ttl: int,
+                  fetch,
+                  priority: str = INTERACTIVE,
+                  refresh: bool = False) -> dict:
+    async def governed():
+        # stale 조회/저장(SQLite/Redis)과 payload listener(이력 저장 등)는 thread에서 실행
+        try:
+            await openweather._governor.acquire_async(priority)
+        except QuotaExceeded as e:
+            return await asyncio.to_thread(openweather._stale_or_error, key, e)
+        data = await fetch()
+        return await asyncio.to_thread(openweather._remember, key, data)
+
+    return await openweather._async_flight.do(
+        key,
+        lambda: async_cached_fetch(openweather._backend, key, ttl, governed,
+                                   cacheable = is_fresh_response,
+                                   refresh = refresh)
+    )
+
+
+# 1. 특정 도시의 현재 날씨
+async def get_weather(city_name: str,
+                      API_KEY: str,
+                      priority: str = INTERACTIVE,
+                      refresh: bool = False) -> dict:
+    key, url, params = weather_request(city_name, API_KEY)
+    openweather._notify("weather", key, (city_name,), priority)
+
+    async def fetch():
+        response = await async_get(url, params = params, timeout = 10)
+        return decode_response(response)
+
+    return await _cached(key, CURRENT_WEATHER_TTL, fetch, priority, refresh)
+
+
+# 2. 특정 도시의 5일치 3시간 단위 예보
+async def get_forecast(city_name: str,
+                       API_KEY: str,
+                       priority: str = INTERACTIVE,
+                       refresh: bool = False) -> dict:
+    key, url, params = forecast_request(city_name, API_KEY)
+    openweather._notify("forecast", key, (city_name,), priority)
+
+    async def fetch():
+        response = await async_get(url, params = params, timeout = 10)
+        return decode_response(response)
+
+    return await _cached(key, FORECAST_TTL, fetch, priority, refresh)
+
+
+# 3. 위도(lat), 경도(lon)로 현재 날씨
+async def get_current_weather_by_coords(lat: float,
+                                        lon: float,
+                                        API_KEY: str,
+                                        priority: str = INTERACTIVE,
+                                        refresh: bool = False) -> dict:
+    key, url, params = coords_request(lat, lon, API_KEY)
+    openweather._notify("current", key, (lat, lon), priority)
+
+    async def fetch():
+        try:
+            response = await async_get(url, timeout = 10)
+            return decode_response(response)  # 실패해도 dict 반환
+        except Exception as e:
+            return {"cod": "500", "message": str(e)}
+
+    return await _cached(key, CURRENT_WEATHER_TTL, fetch, priority, refresh)
+
+
+# 4. IP 기반 대략적인 위치
+async def get_location_by_ip(ip: str | None = None) -> tuple[float | None,
+                                                           float | None,
+                                                           str | None]:
+    try:
+        return await locate_ip_async(ip)
+    except ValueError:
+        return None, None, None
+
+
+async def gather_limited(*aws,
+                         limit: int = 10,
+                         return_exceptions: bool = True) -> list:
+    """
+    asyncio.gather와 같지만 동시에 실행되는 호출 수를 limit개로 제한
+    (coroutine 순서대로 결과 반환)
+
+    예)
+    loc, current, forecast = await gather_limited(
+        get_location_by_ip(),
+        get_current_weather_by_coords(lat, lon, API_KEY),
+        get_forecast("서울", API_KEY),
+    )
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(aw):
+        async with semaphore:
+            return await aw
+
+    return await asyncio.gather(*(run(aw) for aw in aws),
+                                return_exceptions = return_exceptions)
+
+
+async def get_forecasts(city_names: list[str],
+                        API_KEY: str,
+                        limit: int = 10,
+                        priority: str = INTERACTIVE) -> dict[str, dict]:
+    """
+    여러 도시의 예보를 동시에 가져옴 -> {도시 이름: 응답}
+    """
+    results = await gather_limited(*(get_forecast(city, API_KEY, priority) for city in city_names),
+                                   limit = limit)
+    return {city: (result if not isinstance(result, Exception)
+                   else {"cod": "500", "message": str(result)})
+            for city, result in zip(city_names, results)}
@@ -0,0 +1,170 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from . import openweather
+from .openweather import CITY_MAP, CURRENT_WEATHER_TTL, FORECAST_TTL, BACKGROUND, \
+                         forecast_request, is_ok_response
+
+# 인기 지역 예보/현재 날씨 미리 갱신
+# - 사용자 요청(openweather request listener)으로 key별 인기도를 집계 (시간이 지나면 감쇠)
+# - 상위 N개 key는 캐시 TTL이 끝나기 lead_time초 전에 background 우선순위로 다시 가져옴
+#   -> 인기 key는 만료된 상태로 사용자에게 가지 않음
+# - background 호출이라 API 예산이 부족하면 governor가 포기시킴 (그 주기는 중단)
+
+logger = logging.getLogger(__name__)
+
+TTLS = {"forecast": FORECAST_TTL,
+        "weather": CURRENT_WEATHER_TTL,
+        "current": CURRENT_WEATHER_TTL}
+
+
+class PrefetchScheduler:
+    """
+    scheduler = PrefetchScheduler(API_KEY)
+    scheduler.attach()                     # 사용자 요청 관찰 시작
+    await scheduler.run_forever()          # 또는 테스트에서 scheduler.run_once()
+    """
+
+    def __init__(self,
+                 api_key: str,
+                 top_n: int = 20,
+                 lead_time: float = 60,
+                 half_life: float = 60 * 60,
+                 interval: float = 30,
+                 clock = time.monotonic,
+                 fetchers: dict | None = None):
+        self.api_key = api_key
+        self.top_n = top_n
+        self.lead_time = lead_time       # 만료 몇 초 전에 갱신할지
+        self.half_life = half_life       # 인기도 반감기
+        self.interval = interval         # run_forever 주기
+        self._clock = clock
+        self._fetchers = fetchers or {
+            "forecast": lambda city: openweather.get_forecast(city, api_key, priority = BACKGROUND,
+                                                              refresh = True),
+            "weather": lambda city: openweather.get_weather(city, api_key, priority = BACKGROUND,
+                                                            refresh = True),
+            "current": lambda lat, lon: openweather.get_current_weather_by_coords(
+                lat, lon, api_key, priority = BACKGROUND, refresh = True)
+        }
+        self._scores: dict[str, tuple[float, float]] = {}     # key -> (점수, 마지막 갱신 시각)
+        self._requests: dict[str, tuple[str, tuple]] = {}     # key -> (kind, 호출 인자)
+        self._expires: dict[str, float] = {}                  # key -> 예상 캐시 만료 시각
+        self._lock = threading.Lock()   # record는 요청 thread들, run_once는 scheduler thread
+        self.refreshed = 0
+        self.failed = 0
+        self.skipped = 0      # 예산 부족으로 미룬 갱신
+
+    @classmethod
+    def from_env(cls, api_key: str) -> "PrefetchScheduler":
+        return cls(api_key,
+                   top_n = int(os.getenv("PREFETCH_TOP_N", "20")),
+                   lead_time = float(os.getenv("PREFETCH_LEAD_TIME", "60")),
+                   interval = float(os.getenv("PREFETCH_INTERVAL", "30")))
+
+    def attach(self):
+        openweather.add_request_listener(self.record)
+
+    def detach(self):
+        openweather.remove_request_listener(self.record)
+
+    def seed(self, cities = tuple(CITY_MAP)):
+        """
+        자주 찾는 도시(CITY_MAP)를 낮은 점수로 미리 등록
+        """
+        with self._lock:
+            for city in cities:
+                key, _, _ = forecast_request(city, self.api_key)
+                self._requests.setdefault(key, ("forecast", (city,)))
+                self._scores.setdefault(key, (0.5, self._clock()))
+
+    def _score(self, key: str, now: float) -> float:
+        score, updated = self._scores.get(key, (0.0, now))
+        return score * 0.5 ** ((now - updated) / self.half_life)
+
+    def record(self, kind: str, key: str, args: tuple):
+        """
+        사용자 요청 1건 반영 (openweather request listener)
+        """
+        now = self._clock()
+        with self._lock:
+            self._scores[key] = (self._score(key, now) + 1, now)
+            self._requests[key] = (kind, args)
+            # 캐시가 비었거나 만료됐으면 이 요청이 upstream을 호출해 새로 채움
+            if self._expires.get(key, 0) <= now:
+                self._expires[key] = now + TTLS[kind]
+
+    def hot_keys(self) -> list[str]:
+        now = self._clock()
+        with self._lock:
+            scores = {key: self._score(key, now) for key in self._scores}
+        return sorted(scores, key = scores.get, reverse = True)[:self.top_n]
+
+    def due(self) -> list[str]:
+        """
+        곧 만료될 인기 key
+        """
+        hot = self.hot_keys()
+        now = self._clock()
+        with self._lock:
+            return [key for key in hot
+                    if self._expires.get(key, 0) - self.lead_time <= now]
+
+    def _prune(self):
+        # 거의 찾지 않는 long tail key 정리
+        now = self._clock()
+        with self._lock:
+            for key in [key for key in self._scores if self._score(key, now) < 0.01]:
+                self._scores.pop(key, None)
+                self._requests.pop(key, None)
+                self._expires.pop(key, None)
+
+    def run_once(self) -> int:
+        """
+        곧 만료될 인기 key를 갱신 -> 갱신한 수
+        """
+        self._prune()
+        refreshed = 0
+        for key in self.due():
+            with self._lock:
+                if key not in self._requests:
+                    continue
+                kind, args = self._requests[key]
+            try:
+                data = self._fetchers[kind](*args)
+            except Exception:
+                logger.exception("prefetch 실패: %s", key)
+                self.failed += 1
+                continue
+
+            if isinstance(data, dict) and (data.get("stale") or str(data.get("cod")) == "429"):
+                self.skipped += 1
+                break     # 예산 부족 -> 다음 주기에
+            if is_ok_response(data):
+                with self._lock:
+                    self._expires[key] = self._clock() + TTLS[kind]
+                refreshed += 1
+            else:
+                self.failed += 1
+        self.refreshed += refreshed
+        return refreshed
+
+    async def run_forever(self):
+        """
+        FastAPI lifespan task로 실행 (동기 client 호출은 thread에서)
+        """
+        while True:
+            try:
+                await asyncio.to_thread(self.run_once)
+            except Exception:
+                logger.exception("prefetch 주기 실패")
+            await asyncio.sleep(self.interval)
+
+    def stats(self) -> dict:
+        return {"tracked": len(self._requests),
+                "hot": self.hot_keys(),
+                "refreshed": self.refreshed,
+                "failed": self.failed,
+                "skipped": self.skipped}
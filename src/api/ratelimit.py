@@ -0,0 +1,158 @@
+import asyncio
+import os
+import threading
+import time
+
+# OpenWeatherMap API key 사용량 제한 (token bucket)
+# - 분당/일당 호출 수를 각각 bucket으로 관리, 두 bucket 모두에서 token을 꺼내야 호출 가능
+# - 우선순위: interactive(사용자 요청)는 token이 생길 때까지 잠시 대기,
+#             background(예보 미리 갱신 등)는 남은 예산이 reserve 아래면 바로 포기(shed)
+# - thread와 asyncio task가 같은 governor를 공유 (상태 변경은 lock 안에서 짧게)
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+
+class QuotaExceeded(Exception):
+    """
+    예산 부족으로 upstream 호출을 하지 못함
+    """
+
+
+class TokenBucket:
+    """
+    capacity개의 token이 period초에 걸쳐 일정하게 다시 채워지는 bucket
+    (lock은 QuotaGovernor가 잡음)
+    """
+
+    def __init__(self,
+                 capacity: float,
+                 period: float,
+                 clock = time.monotonic):
+        self.capacity = capacity
+        self.rate = capacity / period      # 초당 충전량
+        self._clock = clock
+        self.tokens = capacity
+        self._updated = clock()
+
+    def refill(self):
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, n: float = 1) -> float:
+        """
+        n개를 꺼낼 수 있을 때까지 남은 시간(초)
+        """
+        return max(0.0, (n - self.tokens) / self.rate)
+
+    def take(self, n: float = 1):
+        self.tokens -= n
+
+
+class QuotaGovernor:
+    """
+    분당/일당 호출 예산을 지키는 governor
+    """
+
+    def __init__(self,
+                 per_minute: int = 60,
+                 per_day: int = 30_000,
+                 background_reserve: float = 0.2,
+                 max_wait: float = 5,
+                 clock = time.monotonic):
+        self.minute = TokenBucket(per_minute, 60, clock)
+        self.day = TokenBucket(per_day, 24 * 60 * 60, clock)
+        self.background_reserve = background_reserve   # background가 쓰지 못하는 예산 비율
+        self.max_wait = max_wait                       # interactive 최대 대기 시간(초)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.granted = {INTERACTIVE: 0, BACKGROUND: 0}
+        self.waited = 0       # token을 기다린 뒤 통과한 호출
+        self.shed = 0         # 예산 보호를 위해 포기한 background 호출
+        self.rejected = 0     # 최대 대기 시간 안에 token을 얻지 못한 호출
+
+    @classmethod
+    def from_env(cls) -> "QuotaGovernor":
+        return cls(per_minute = int(os.getenv("OPENWEATHER_CALLS_PER_MINUTE", "60")),
+                   per_day = int(os.getenv("OPENWEATHER_CALLS_PER_DAY", "30000")),
+                   background_reserve = float(os.getenv("OPENWEATHER_BACKGROUND_RESERVE", "0.2")),
+                   max_wait = float(os.getenv("OPENWEATHER_MAX_WAIT", "5")))
+
+    def _try_acquire(self, priority: str) -> float:
+        """
+        token을 얻으면 0, 아니면 기다려야 할 시간(초)
+        background는 reserve 아래로 내려가면 QuotaExceeded
+        """
+        with self._lock:
+            self.minute.refill()
+            self.day.refill()
+
+            if priority == BACKGROUND:
+                floor_minute = self.minute.capacity * self.background_reserve
+                floor_day = self.day.capacity * self.background_reserve
+                if self.minute.tokens - 1 < floor_minute or self.day.tokens - 1 < floor_day:
+                    self.shed += 1
+                    raise QuotaExceeded("background 요청 예산 부족")
+
+            wait = max(self.minute.wait_time(), self.day.wait_time())
+            if wait == 0:
+                self.minute.take()
+                self.day.take()
+                self.granted[priority] = self.granted.get(priority, 0) + 1
+            return wait
+
+    def _give_up(self, wait: float, deadline: float) -> bool:
+        if self._clock() + wait <= deadline:
+            return False
+        with self._lock:
+            self.rejected += 1
+        return True
+
+    def acquire(self, priority: str = INTERACTIVE):
+        """
+        thread용: token을 얻을 때까지 최대 max_wait초 대기
+        """
+        deadline = self._clock() + self.max_wait
+        waited = False
+        while (wait := self._try_acquire(priority)) > 0:
+            if self._give_up(wait, deadline):
+                raise QuotaExceeded(f"API 호출 한도 초과 ({wait:.0f}초 후 가능)")
+            waited = True
+            time.sleep(wait)
+        if waited:
+            with self._lock:
+                self.waited += 1
+
+    async def acquire_async(self, priority: str = INTERACTIVE):
+        """
+        asyncio용: 대기 중에는 event loop에 양보
+        """
+        deadline = self._clock() + self.max_wait
+        waited = False
+        while (wait := self._try_acquire(priority)) > 0:
+            if self._give_up(wait, deadline):
+                raise QuotaExceeded(f"API 호출 한도 초과 ({wait:.0f}초 후 가능)")
+            waited = True
+            await asyncio.sleep(wait)
+        if waited:
+            with self._lock:
+                self.waited += 1
+
+    def stats(self) -> dict:
+        """
+        남은 예산과 통과/대기/포기 카운터
+        """
+        with self._lock:
+            self.minute.refill()
+            self.day.refill()
+            return {
+                "remaining_minute": int(self.minute.tokens),
+                "remaining_day": int(self.day.tokens),
+                "limit_minute": int(self.minute.capacity),
+                "limit_day": int(self.day.capacity),
+                "granted": dict(self.granted),
+                "waited": self.waited,
+                "shed": self.shed,
+                "rejected": self.rejected
+            }
@@ -1,42 +1,110 @@
-from fastapi import FastAPI, HTTPException, Depends, Form
+from fastapi import FastAPI, HTTPException, Depends, Form, Request, Query
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from src.database import get_db
+from sqlalchemy import select, delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from contextlib import asynccontextmanager, suppress
+from src.database import get_async_db, async_engine, engine
 from src import models
-from src.utils.hashing import hash_password, verify_password
+from src.api import openweather_async as weather
+from src.api.openweather import API_KEY, CURRENT_WEATHER_TTL, BACKGROUND, normalize_city, is_ok_response, \
+                                cached_forecast, cache_stats, coalesce_stats, quota_stats
+from src.api.http_client import close_async_client
+from src.api.prefetch import PrefetchScheduler
+from src.api.gazetteer import get_gazetteer
+from src.api.ipgeo import client_ip, ip_geo_stats
+from src.utils.hashing import hash_password_async, verify_password_async, hash_stats, \
+                             shutdown_hash_pool, HashQueueFull
+from src.utils.identity_cache import get_cached_user, fetch_user_async, identity_cache_stats
 from src.utils.jwt import create_access_token, verify_token
-from src.utils.schemas import UserCreate, UserLogin, UserRead
-from datetime import timedelta
+from src.utils.schemas import UserCreate, UserLogin, UserRead, BulkUserResult, \
+                              AlertSubscriptionCreate, AlertSubscriptionRead, AlertEvent
+from src.utils.alert_rules import METRICS, RuleSet, evaluate
+from src.alerts import AlertEvaluator, log_events
+from src.bulk_users import create_users_bulk
+from src.weather_history import WeatherHistoryWriter, RESOLUTIONS, OBSERVATION, FORECAST, \
+                                coords_location, query_history, to_utc
+from src.utils.forecast_fields import flatten_slots
+from src.utils.util_forecast import process_forecast, process_forecast_batch
+from src.utils.http_cache import cached_json_response
+from src.utils.pool_metrics import pool_stats
+from datetime import datetime, timedelta, timezone
+import asyncio
+import os
+import time
 import uvicorn
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 인기 지역 예보/현재 날씨를 만료 전에 미리 갱신하는 background task
+    task = None
+    # upstream에서 받은 관측/예보를 weather_slots에 batch로 쌓음
+    history = None
+    if os.getenv("WEATHER_HISTORY_ENABLED", "1") == "1":
+        history = app.state.history = WeatherHistoryWriter(engine)
+        history.start()
+    # 구독 알림 전체를 주기마다 한 번에 평가
+    alerts = None
+    if os.getenv("ALERTS_ENABLED", "1") == "1":
+        alerts = app.state.alerts = AlertEvaluator(engine, API_KEY)
+        alerts.add_listener(log_events)
+        alerts.start()
+    if API_KEY and os.getenv("PREFETCH_ENABLED", "1") == "1":
+        app.state.prefetch = PrefetchScheduler.from_env(API_KEY)
+        app.state.prefetch.seed()
+        app.state.prefetch.attach()
+        task = asyncio.create_task(app.state.prefetch.run_forever())
+    yield
+    if task is not None:
+        app.state.prefetch.detach()
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    await close_async_client()   # upstream keep-alive connection 정리
+    if alerts is not None:
+        await asyncio.to_thread(alerts.stop)
+    if history is not None:
+        await asyncio.to_thread(history.stop)
+    shutdown_hash_pool()
+    await async_engine.dispose()
+
+
+app = FastAPI(lifespan = lifespan)
 
 # OAuth2PasswordBearer는, swagger UI의 Authorize 버튼과 연동됨
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl = '/login/')
 
+async def _hash_or_503(coro):
+    # argon2 hash/verify는 전용 process pool에서 (request threadpool을 막지 않음)
+    try:
+        return await coro
+    except HashQueueFull as e:
+        raise HTTPException(status_code = 503, detail = str(e), headers = {"Retry-After": "1"})
+
 @app.post('/users/', response_model = UserRead)
-def create_user(user: UserCreate,
-                db: Session = Depends(get_db)):
+async def create_user(user: UserCreate,
+                      db: AsyncSession = Depends(get_async_db)):
     db_user = models.User(
         name = user.name,
         email = user.email,
-        hashed_password = hash_password(user.password)
+        hashed_password = await _hash_or_503(hash_password_async(user.password))
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     return db_user
 
 @app.post('/login/')
-def login(username: str = Form(...),
-          password: str = Form(...),
-          db: Session = Depends(get_db)):
+async def login(username: str = Form(...),
+                password: str = Form(...),
+                db: AsyncSession = Depends(get_async_db)):
     # Form 데이터 -> pydantic 모델로 변환
     user_data = UserLogin(username = username,
                           password = password)
 
-    db_user = db.query(models.User).filter(models.User.name == user_data.username).first()
-    if not db_user or not verify_password(user_data.password, db_user.hashed_password):
+    db_user = (await db.scalars(select(models.User).where(models.User.name == user_data.username))).first()
+    if not db_user or not await _hash_or_503(verify_password_async(user_data.password,
+                                                                   db_user.hashed_password)):
         raise HTTPException(status_code = 400, detail = "해당 사용자가 없습니다")
     
     # JWT token 생성
@@ -49,9 +117,11 @@ def login(username: str = Form(...),
 
 
 
-@app.get('/users/me', response_model = UserRead)
-def read_users_me(token: str = Depends(oauth2_scheme),
-                  db: Session = Depends(get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme),
+                           db: AsyncSession = Depends(get_async_db)) -> UserRead:
+    """
+    token의 sub로 사용자 확인 (identity cache hit이면 DB 조회 없음)
+    """
     payload = verify_token(token)
     if not payload:
         raise HTTPException(status_code = 401, detail = '확인되지 않은 token입니다')
@@ -60,12 +130,334 @@ def read_users_me(token: str = Depends(oauth2_scheme),
     if username is None:
         raise HTTPException(status_code = 401, detail = '확인되지 않은 token payload입니다')
     
-    user = db.query(models.User).filter(models.User.name == username).first()
+    user = get_cached_user(username)
+    if user is None:
+        user = await fetch_user_async(db, username)
     if not user:
         raise HTTPException(status_code = 401, detail = '유저를 찾을 수 없습니다')
     
     return user
 
+@app.get('/users/me', response_model = UserRead)
+async def read_users_me(user: UserRead = Depends(get_current_user)):
+    return user
+
+BULK_MAX_USERS = int(os.getenv("BULK_MAX_USERS", "10000"))
+# /users/bulk를 호출할 수 있는 사용자 name (쉼표 구분), 비어 있으면 API로는 막고 CLI(python -m src.bulk_users)만 허용
+BULK_ADMIN_USERS = frozenset(name.strip() for name in os.getenv("BULK_ADMIN_USERS", "").split(",") if name.strip())
+
+async def get_bulk_admin(current_user: UserRead = Depends(get_current_user)) -> UserRead:
+    if current_user.name not in BULK_ADMIN_USERS:
+        raise HTTPException(status_code = 403, detail = '사용자 대량 생성 권한이 없습니다')
+    return current_user
+
+@app.post('/users/bulk', response_model = BulkUserResult)
+async def create_users(users: list[UserCreate],
+                       current_user: UserRead = Depends(get_bulk_admin),
+                       db: AsyncSession = Depends(get_async_db)):
+    """
+    여러 사용자를 한 번에 생성 (BULK_ADMIN_USERS에 있는 사용자만)
+    충돌(이미 있는 name/email, 요청 안 중복)은 행 단위로 보고하고 나머지는 생성
+    """
+    if len(users) > BULK_MAX_USERS:
+        raise HTTPException(status_code = 413, detail = f'한 번에 최대 {BULK_MAX_USERS}명까지 생성할 수 있습니다')
+    return await _hash_or_503(create_users_bulk(db, users))
+
+ALERT_MAX_SUBSCRIPTIONS = int(os.getenv("ALERT_MAX_SUBSCRIPTIONS", "50"))   # 사용자당
+ALERT_ME_FETCH_LIMIT = int(os.getenv("ALERT_ME_FETCH_LIMIT", "5"))          # /alerts/me 요청당 캐시에 없는 예보를 받아올 최대 지역 수
+
+@app.post('/alerts/subscriptions', response_model = AlertSubscriptionRead)
+async def create_alert_subscription(subscription: AlertSubscriptionCreate,
+                                    current_user: UserRead = Depends(get_current_user),
+                                    db: AsyncSession = Depends(get_async_db)):
+    """
+    날씨 알림 구독 (예: 강수량 > 0, 7일 이내)
+    """
+    if subscription.metric not in METRICS:
+        raise HTTPException(status_code = 422, detail = f'metric은 {", ".join(METRICS)} 중 하나입니다')
+    count = await db.scalar(select(func.count()).select_from(models.AlertSubscription)
+                            .where(models.AlertSubscription.user_id == current_user.id))
+    if count >= ALERT_MAX_SUBSCRIPTIONS:
+        raise HTTPException(status_code = 409, detail = f'알림은 최대 {ALERT_MAX_SUBSCRIPTIONS}개까지 등록할 수 있습니다')
+
+    db_subscription = models.AlertSubscription(
+        user_id = current_user.id,
+        location = normalize_city(subscription.city),
+        **subscription.model_dump(exclude = {"city"})
+    )
+    db.add(db_subscription)
+    await db.commit()
+    await db.refresh(db_subscription)
+    return db_subscription
+
+@app.get('/alerts/subscriptions', response_model = list[AlertSubscriptionRead])
+async def list_alert_subscriptions(current_user: UserRead = Depends(get_current_user),
+                                   db: AsyncSession = Depends(get_async_db)):
+    return (await db.scalars(select(models.AlertSubscription)
+                             .where(models.AlertSubscription.user_id == current_user.id)
+                             .order_by(models.AlertSubscription.id))).all()
+
+@app.delete('/alerts/subscriptions/{subscription_id}', status_code = 204)
+async def delete_alert_subscription(subscription_id: int,
+                                    current_user: UserRead = Depends(get_current_user),
+                                    db: AsyncSession = Depends(get_async_db)):
+    result = await db.execute(delete(models.AlertSubscription)
+                              .where(models.AlertSubscription.id == subscription_id,
+                                     models.AlertSubscription.user_id == current_user.id))
+    await db.commit()
+    if result.rowcount == 0:
+        raise HTTPException(status_code = 404, detail = '알림 구독이 없습니다')
+
+@app.get('/alerts/me', response_model = list[AlertEvent])
+async def my_alerts(current_user: UserRead = Depends(get_current_user),
+                    db: AsyncSession = Depends(get_async_db)):
+    """
+    내 구독 중 지금 예보 기준으로 조건을 만족하는 알림
+    """
+    subscriptions = (await db.scalars(select(models.AlertSubscription)
+                                      .where(models.AlertSubscription.user_id == current_user.id,
+                                             models.AlertSubscription.enabled.is_(True)))).all()
+    if not subscriptions:
+        return []
+    locations = list(dict.fromkeys(sub.location for sub in subscriptions))
+    # 캐시(만료됐으면 stale)에 있는 예보를 먼저 쓰고, 없는 지역만 ALERT_ME_FETCH_LIMIT개까지 background 예산으로
+    cached = await asyncio.to_thread(lambda: {location: cached_forecast(location) for location in locations})
+    missing = [location for location, data in cached.items() if data is None][:ALERT_ME_FETCH_LIMIT]
+    if missing:
+        cached.update(await weather.get_forecasts(missing, API_KEY, priority = BACKGROUND))
+    payloads = {location: data for location, data in cached.items()
+                if is_ok_response(data) and data.get("list")}
+    if not payloads:
+        return []
+
+    rules = RuleSet(*zip(*[(sub.id, sub.user_id, sub.location, sub.metric, sub.op, sub.threshold,
+                            sub.window_days, sub.min_days) for sub in subscriptions]))
+    events = evaluate(process_forecast_batch(payloads), rules)
+    return events.to_dict("records")
+
+@app.get('/metrics/db')
+def db_metrics():
+    """
+    DB connection pool 사용량, checkout 대기 시간, timeout/pre-ping 실패
+    """
+    return {"async": pool_stats(async_engine.sync_engine),
+            "sync": pool_stats(engine)}
+
+@app.get('/metrics/identity')
+def identity_metrics():
+    """
+    인증 사용자 캐시 hit/miss
+    """
+    return identity_cache_stats()
+
+# ---------------------------------------------------------------
+# 날씨 API: Streamlit과 같은 캐시/집계 결과를 다른 client에서도 사용
+# upstream 시각 기준 Last-Modified, 내용 기준 ETag -> 조건부 요청이면 304
+# ---------------------------------------------------------------
+SLOT_SECONDS = 3 * 60 * 60
+
+
+def _raise_upstream_error(data):
+    cod = str(data.get("cod", "502")) if isinstance(data, dict) else "502"
+    message = data.get("message", "알 수 없는 오류") if isinstance(data, dict) else "API 응답 오류"
+    raise HTTPException(status_code = 404 if cod == "404" else 502, detail = message)
+
+
+def _forecast_freshness(data: dict) -> tuple[datetime, int]:
+    """
+    예보는 3시간 slot 단위로 갱신됨
+    Last-Modified: 첫 slot이 속한 3시간 구간의 시작
+    max-age: 첫 slot 시작까지 남은 시간 (그 이후엔 예보 구간이 한 칸 밀림)
+    """
+    first_dt = data["list"][0]["dt"]
+    last_modified = datetime.fromtimestamp(first_dt - SLOT_SECONDS, timezone.utc)
+    max_age = min(SLOT_SECONDS, max(60, first_dt - int(time.time())))
+    return last_modified, max_age
+
+
+async def _forecast_or_error(city: str) -> dict:
+    data = await weather.get_forecast(city, API_KEY)
+    if not is_ok_response(data) or not data.get("list"):
+        _raise_upstream_error(data)
+    return data
+
+
+@app.get('/cities/search')
+def cities_search(q: str,
+                  limit: int = Query(10, ge = 1, le = 50)):
+    """
+    입력 중인 도시 이름 자동완성 (prefix + 오타 허용)
+    """
+    return [city._asdict() for city in get_gazetteer().search(q, limit)]
+
+
+@app.get('/cities/nearest')
+def cities_nearest(lat: float = Query(..., ge = -90, le = 90),
+                   lon: float = Query(..., ge = -180, le = 180)):
+    """
+    좌표에서 가장 가까운 도시와 거리(km)
+    """
+    found = get_gazetteer().nearest(lat, lon)
+    if found is None:
+        raise HTTPException(status_code = 404, detail = '등록된 도시가 없습니다')
+    city, distance = found
+    return {**city._asdict(), "distance_km": round(distance, 1)}
+
+
+@app.get('/location')
+async def location(request: Request):
+    """
+    요청한 사용자의 IP 기반 대략적인 위치 (X-Forwarded-For 기준)
+    """
+    ip = client_ip(request.headers, request.client.host if request.client else None)
+    lat, lon, city = await weather.get_location_by_ip(ip)
+    return {"ip": ip, "lat": lat, "lon": lon, "city": city}
+
+
+@app.get('/weather/current')
+async def weather_current(request: Request,
+                          city: str | None = None,
+                          lat: float | None = Query(None, ge = -90, le = 90),
+                          lon: float | None = Query(None, ge = -180, le = 180)):
+    if city:
+        data = await weather.get_weather(city, API_KEY)
+    elif lat is not None and lon is not None:
+        data = await weather.get_current_weather_by_coords(lat, lon, API_KEY)
+    else:
+        raise HTTPException(status_code = 422, detail = 'city 또는 lat/lon이 필요합니다')
+
+    if not is_ok_response(data):
+        _raise_upstream_error(data)
+
+    main = data.get("main", {})
+    body = {
+        "name": data.get("name"),
+        "dt": data.get("dt"),
+        "temp": main.get("temp"),
+        "feels_like": main.get("feels_like"),
+        "humidity": main.get("humidity"),
+        "wind": data.get("wind", {}).get("speed"),
+        "rain_1h": data.get("rain", {}).get("1h", 0),
+        "snow_1h": data.get("snow", {}).get("1h", 0),
+        "description": (data.get("weather") or [{}])[0].get("description")
+    }
+    # 관측 시각(dt) 기준, 다음 갱신 예상 시각까지 캐시 허용
+    observed = data.get("dt") or int(time.time())
+    max_age = min(CURRENT_WEATHER_TTL, max(60, observed + CURRENT_WEATHER_TTL - int(time.time())))
+    return cached_json_response(request, body,
+                                datetime.fromtimestamp(observed, timezone.utc),
+                                max_age)
+
+
+@app.get('/weather/forecast')
+async def weather_forecast(request: Request,
+                           city: str):
+    data = await _forecast_or_error(city)
+
+    # 3시간 slot을 column 단위 배열로 (slot마다 key를 반복하지 않아 compact)
+    columns = flatten_slots(data["list"])
+    del columns["dt_txt"]
+    body = {
+        "city": normalize_city(city),
+        "timezone": data.get("city", {}).get("timezone", 0),
+        **columns
+    }
+    last_modified, max_age = _forecast_freshness(data)
+    return cached_json_response(request, body, last_modified, max_age)
+
+
+@app.get('/weather/daily')
+async def weather_daily(request: Request,
+                        city: str):
+    data = await _forecast_or_error(city)
+    daily = process_forecast(data)
+
+    body = {
+        "city": normalize_city(city),
+        "columns": list(daily.columns),
+        "index": [date.isoformat() for date in daily.index],
+        "data": daily.round(2).values.tolist()
+    }
+    last_modified, max_age = _forecast_freshness(data)
+    return cached_json_response(request, body, last_modified, max_age)
+
+
+HISTORY_MAX_WINDOW = timedelta(days = 366)
+
+
+@app.get('/weather/history')
+async def weather_history(city: str | None = None,
+                          lat: float | None = Query(None, ge = -90, le = 90),
+                          lon: float | None = Query(None, ge = -180, le = 180),
+                          start: datetime | None = None,
+                          end: datetime | None = None,
+                          resolution: str = "hour",
+                          kind: str = OBSERVATION,
+                          db: AsyncSession = Depends(get_async_db)):
+    """
+    저장된 관측/예보 이력 (기본: 최근 24시간, 1시간 단위)
+    """
+    if city:
+        location = normalize_city(city)
+    elif lat is not None and lon is not None:
+        location = coords_location(lat, lon)
+    else:
+        raise HTTPException(status_code = 422, detail = 'city 또는 lat/lon이 필요합니다')
+    if resolution not in RESOLUTIONS:
+        raise HTTPException(status_code = 422, detail = f'resolution은 {", ".join(RESOLUTIONS)} 중 하나입니다')
+    if kind not in (OBSERVATION, FORECAST):
+        raise HTTPException(status_code = 422, detail = f'kind는 {OBSERVATION} 또는 {FORECAST}입니다')
+
+    # tz가 없는 시각은 UTC로 간주 (한쪽만 tz가 있어도 비교 가능하도록)
+    end = to_utc(end) if end else datetime.now(timezone.utc)
+    start = to_utc(start) if start else end - timedelta(days = 1)
+    if not timedelta(0) < end - start <= HISTORY_MAX_WINDOW:
+        raise HTTPException(status_code = 422, detail = '조회 구간은 0초 초과 366일 이하여야 합니다')
+
+    return {"location": location,
+            "kind": kind,
+            "resolution": resolution,
+            "data": await query_history(db, location, start, end, resolution, kind)}
+
+
+@app.get('/metrics/weather')
+def weather_metrics(request: Request):
+    """
+    캐시 hit/miss, 요청 합치기, API key 남은 예산, 미리 갱신 현황, 이력 저장 현황
+    """
+    prefetch = getattr(request.app.state, "prefetch", None)
+    history = getattr(request.app.state, "history", None)
+    return {"cache": cache_stats(),
+            "coalesce": coalesce_stats(),
+            "quota": quota_stats(),
+            "prefetch": prefetch.stats() if prefetch else None,
+            "history": history.stats() if history else None}
+
+
+@app.get('/metrics/alerts')
+def alerts_metrics(request: Request):
+    """
+    알림 평가 주기: 구독/지역 수, 예보 없는 지역, 발생/신규 알림 수, 구간별 소요 시간
+    """
+    alerts = getattr(request.app.state, "alerts", None)
+    return alerts.stats() if alerts is not None else {}
+
+
+@app.get('/metrics/ipgeo')
+def ipgeo_metrics():
+    """
+    IP 위치 조회: 로컬 DB hit, 원격 조회/캐시 hit 수, 로컬 조회 평균 시간(µs)
+    """
+    return ip_geo_stats()
+
+
+@app.get('/metrics/hashing')
+def hashing_metrics():
+    """
+    비밀번호 hash process pool 대기열 현황
+    """
+    return hash_stats()
+
 # users = []
 
 # @app.get('/ping-db')
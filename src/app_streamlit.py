@@ -1,15 +1,20 @@
 import streamlit as st
 import pandas as pd
 # import uvicorn
-import os
+import time
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
 # from dotenv import load_dotenv # local 환경에서 실행 시 사용.
-from api.openweather import get_forecast, \
-                            get_current_weather_by_coords, \
-                            get_location_by_ip
-from utils.util_forecast import process_forecast
+from api.openweather import get_current_weather_by_coords, \
+                            get_location_by_ip, \
+                            is_ok_response, \
+                            FORECAST_TTL
+from api.gazetteer import get_gazetteer
+from api.ipgeo import client_ip
 from ui.ui_forecast import show_forecast, \
                            show_current_details, \
-                           show_current_weather
+                           fetch_current_weather, \
+                           fetch_daily_forecast, \
+                           WeatherAPIError
 
 # # .env 파일에서 환경 변수를 로드
 # load_dotenv()
@@ -18,21 +23,59 @@ from ui.ui_forecast import show_forecast, \
 # API_KEY = os.getenv("OPENWEATHERMAP_API_KEY")
 API_KEY = st.secrets["OPENWEATHERMAP_API_KEY"]
 
-def main():
+# 위젯 조작 시 Streamlit은 스크립트 전체를 다시 실행함
+# -> 섹션별로 st.fragment로 나눠, 조작한 섹션만 다시 그림
+# -> upstream 호출은 ui_forecast의 캐시(st.cache_data / session_state)를 거침
+
+# 첫 화면은 skeleton을 먼저 그리고,
+# IP 위치 -> 현재 날씨, 기본 도시 예보를 background thread에서 동시에 가져와
+# 끝나는 순서대로 각 섹션을 채움 (느린 섹션은 timeout 후 안내 문구)
+DEFAULT_CITY = "서울"
+SECTION_TIMEOUTS = {
+    "location": 3,     # 로컬 IP DB (없으면 ip-api, timeout 2초)
+    "current": 13,     # IP 위치 + 현재 날씨
+    "forecast": 10
+}
+
+
+@st.cache_resource
+def _executor() -> ThreadPoolExecutor:
     """
-    각 기능별 함수들을 불러와
-    UI를 표시
+    모든 session이 공유하는 background executor
+    (thread 안에서는 st.* 를 호출하지 않고 데이터만 가져옴)
     """
-    st.title("🌤️ 날씨 대시보드")
+    return ThreadPoolExecutor(max_workers = 8, thread_name_prefix = "prefetch")
+
+
+def _current_for(location_future: Future):
+    lat, lon, city_name = location_future.result()
+    if not (lat and lon):
+        return None
+    return get_current_weather_by_coords(lat, lon, API_KEY)
+
+
+def load_gazetteer():
+    """
+    도시 사전 (파일을 만들거나 읽지 못하면 None -> 입력한 이름 그대로 사용)
+    """
+    try:
+        return get_gazetteer()
+    except (OSError, ValueError):
+        return None
 
-    # 1. 현재 위치(IP 기반) 자동 표시
-    lat, lon, city_name = get_location_by_ip()
-    if lat and lon:
-        show_current_weather(lat, lon, f"📍 현재 위치: {city_name or '알 수 없음'}")
-    
-    st.divider()
 
-    # 2. 내 위치 직접 입력
+def nearest_city(lat: float,
+                 lon: float):
+    gazetteer = load_gazetteer()
+    return gazetteer.nearest(lat, lon) if gazetteer is not None else None
+
+
+@st.fragment
+def show_custom_location(lat: float | None,
+                         lon: float | None):
+    """
+    2. 내 위치 직접 입력
+    """
     st.subheader("📍 내 위치 직접 입력")
     c1, c2, c3 = st.columns([1, 1, 1])
     with c1:
@@ -47,35 +90,189 @@ def main():
         go = st.button("내 위치 날씨 보기")
     
     if go:
-        current = get_current_weather_by_coords(lat_input, lon_input, API_KEY)
+        try:
+            current = fetch_current_weather(lat_input, lon_input)
+            title = "📍 사용자 지정 위치"
+            found = nearest_city(lat_input, lon_input)
+            if found is not None:
+                title += f" ({found[0].label} 부근 {found[1]:.0f}km)"
+            show_current_details(current, title)
+        except WeatherAPIError as e:
+            st.error(f"사용자 지정 위치 호출 실패: {e}")
 
-        if isinstance(current, dict) and str(current.get("cod")) == "200":
-            show_current_details(current, "📍 사용자 지정 위치")
-        else:
-            st.error(
-                f"사용자 지정 위치 호출 실패: "
-                f"{current.get('message', '알 수 없는 오류') if isinstance(current, dict) else 'API 응답 오류'}"
-            )
-    
-    st.divider()
 
-    # 3. 도시 검색 -> 5일치 예보
+@st.fragment
+def show_city_forecast():
+    """
+    3. 도시 검색 -> 5일치 예보
+    조회 전에는 미리 가져온 기본 도시 예보를 표시.
+    아직 준비되지 않았으면 채워 넣을 placeholder를 반환
+    """
     st.subheader("🔎 도시 검색(5일치 예보)")
-    city = st.text_input("도시 이름을 입력하세요:", "서울")
-    if st.button("날씨 조회"):
-        data = get_forecast(city, API_KEY)
-
-        if isinstance(data, dict) and str(data.get("cod")) == "200":
-            try:            
-                daily = process_forecast(data)
-                show_forecast(daily)
-            except Exception as e:
-                st.error(f"데이터 가공 오류: {e}")
+    city = st.text_input("도시 이름을 입력하세요:", DEFAULT_CITY)
+    # 정확히 일치하는 도시가 없으면 gazetteer 후보(prefix + 오타 허용) 중에서 고르게 함
+    gazetteer = load_gazetteer()
+    if gazetteer is None:
+        st.caption("도시 사전을 읽지 못해 입력한 이름 그대로 조회합니다")
+    elif city.strip() and gazetteer.resolve(city) is None:
+        candidates = gazetteer.search(city)
+        if candidates:
+            choice = st.selectbox("혹시 이 도시인가요?", candidates,
+                                  format_func = lambda c: f"{c.label} ({c.name}, {c.country})")
+            city = str(choice.id)
+    clicked = st.button("날씨 조회")
+    slot = st.empty()
+
+    if clicked:
+        _show_city_forecast(slot, city)
+        return None
+
+    prefetched = st.session_state.get("default_forecast")
+    if prefetched and time.time() - prefetched[0] < FORECAST_TTL:
+        with slot.container():
+            st.caption(f"{DEFAULT_CITY} 예보")
+            show_forecast(prefetched[1])
+        return None
+
+    if st.session_state.get("forecast_prefetching"):
+        # 전체 실행 중: main()이 background에서 가져와 채움
+        slot.info(f"⏳ {DEFAULT_CITY} 예보를 불러오는 중...")
+        return slot
+
+    # fragment만 다시 실행됐는데 미리 가져온 예보가 없음 (prefetch 실패/timeout) -> 직접 조회
+    daily = _show_city_forecast(slot, DEFAULT_CITY, caption = f"{DEFAULT_CITY} 예보")
+    if daily is not None:
+        st.session_state["default_forecast"] = (time.time(), daily)
+    return None
+
+
+def _show_city_forecast(slot,
+                        city: str,
+                        caption: str | None = None) -> pd.DataFrame | None:
+    with slot.container():
+        try:
+            daily = fetch_daily_forecast(city)
+        except WeatherAPIError as e:
+            st.error(f"도시를 찾을 수 없습니다: {e}")
+            return None
+        except Exception as e:
+            st.error(f"데이터 가공 오류: {e}")
+            return None
+        if caption:
+            st.caption(caption)
+        show_forecast(daily)
+        return daily
+
+
+def _fill_sections(futures: dict[str, Future],
+                   slots: dict[str, "st.delta_generator.DeltaGenerator"]):
+    """
+    background 작업이 끝나는 순서대로 섹션을 채움
+    섹션별 timeout이 지나면 안내 문구를 남기고 더 기다리지 않음
+    """
+    start = time.monotonic()
+    pending = {future: name for name, future in futures.items()}
+
+    while pending:
+        now = time.monotonic()
+        for future, name in list(pending.items()):
+            if not future.done() and now - start >= SECTION_TIMEOUTS[name]:
+                del pending[future]
+                slots[name].warning("⌛ 응답이 늦어지고 있습니다. 잠시 후 새로고침 해주세요.")
+        if not pending:
+            break
+
+        timeout = min(start + SECTION_TIMEOUTS[name] for name in pending.values()) - now
+        done, _ = wait(pending, timeout = max(timeout, 0), return_when = FIRST_COMPLETED)
+        # 위치 섹션을 먼저 그려야 같은 자리의 현재 날씨가 덮이지 않음
+        for future in sorted(done, key = lambda f: pending[f] != "location"):
+            _render_section(pending.pop(future), future, slots)
+
+
+def _render_section(name: str,
+                    future: Future,
+                    slots: dict):
+    slot = slots[name]
+    try:
+        result = future.result()
+    except WeatherAPIError as e:
+        slot.error(f"도시를 찾을 수 없습니다: {e}")
+        return
+    except Exception as e:
+        slot.error(f"데이터 가공 오류: {e}")
+        return
+
+    if name == "location":
+        st.session_state["location"] = result
+        lat, lon, city_name = result
+        if lat and lon:
+            slots["current"].info(f"⏳ 현재 위치({city_name or '알 수 없음'}) 날씨를 불러오는 중...")
         else:
-            st.error(
-                f"도시를 찾을 수 없습니다: "
-                f"{data.get('message', '알 수 없는 오류') if isinstance(data, dict) else 'API 응답 오류'}"
-            )
+            slots["current"].empty()
+
+    elif name == "current":
+        if result is None:
+            return
+        lat, lon, city_name = st.session_state.get("location", (None, None, None))
+        title = f"📍 현재 위치: {city_name or '알 수 없음'}"
+        if is_ok_response(result):
+            with slot.container():
+                show_current_details(result, title)
+        else:
+            slot.error(f"{title} 호출 실패: {result.get('message', '알 수 없는 오류')}")
+
+    elif name == "forecast":
+        st.session_state["default_forecast"] = (time.time(), result)
+        with slot.container():
+            st.caption(f"{DEFAULT_CITY} 예보")
+            show_forecast(result)
+
+
+def main():
+    """
+    각 기능별 함수들을 불러와
+    UI를 표시
+    """
+    st.title("🌤️ 날씨 대시보드")
+    executor = _executor()
+    futures: dict[str, Future] = {}
+
+    # 1. 현재 위치(IP 기반) 자동 표시 -> background에서 IP 위치 조회 후 바로 현재 날씨
+    current_slot = st.empty()
+    location = st.session_state.get("location")
+    if location is None:
+        current_slot.info("⏳ 현재 위치를 확인하는 중...")
+        # 이 서버가 아니라 접속한 사용자의 IP (proxy 뒤에서는 X-Forwarded-For)
+        # thread 안에서는 st.context를 읽을 수 없으므로 여기서 꺼내 넘김
+        ip = client_ip(st.context.headers, st.context.ip_address)
+        futures["location"] = executor.submit(get_location_by_ip, ip)
+        location_future = futures["location"]
+    else:
+        location_future = Future()
+        location_future.set_result(location)
+    if location is None or (location[0] and location[1]):
+        futures["current"] = executor.submit(_current_for, location_future)
+
+    lat, lon, _ = location or (None, None, None)
+
+    st.divider()
+    show_custom_location(lat, lon)
+
+    st.divider()
+    # 3. 기본 도시 예보도 동시에 가져옴 (이미 표시됐으면 생략)
+    # fetch_daily_forecast는 st.* UI 호출이 없어 thread에서 불러도 됨 (st.cache_data 공유)
+    st.session_state["forecast_prefetching"] = True
+    forecast_slot = show_city_forecast()
+    if forecast_slot is not None:
+        futures["forecast"] = executor.submit(fetch_daily_forecast, DEFAULT_CITY)
+
+    try:
+        _fill_sections(futures, {"location": current_slot,
+                                 "current": current_slot,
+                                 "forecast": forecast_slot})
+    finally:
+        # 이후 fragment rerun은 main()이 채워주지 않으므로 직접 조회
+        st.session_state["forecast_prefetching"] = False
 
 
 if __name__ == '__main__':
@@ -0,0 +1,148 @@
+import argparse
+import asyncio
+import csv
+import sys
+import time
+from sqlalchemy import select, or_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from src import models
+from src.utils import hashing
+from src.utils.schemas import UserCreate, UserRead, BulkUserConflict, BulkUserResult
+
+# 대량 가입 (파트너 onboarding 등)
+# 1. 요청 안 중복 / 이미 있는 name, email을 먼저 걸러냄 (충돌할 행은 hash하지 않음)
+# 2. 남은 비밀번호를 process pool의 모든 worker에서 병렬 hash
+# 3. batch 단위 INSERT ... ON CONFLICT DO NOTHING RETURNING (executemany)
+#    -> 그 사이 다른 요청이 먼저 넣은 행은 반환되지 않으므로 충돌로 보고, batch 전체는 계속 진행
+# 실행: python -m src.bulk_users users.csv   (column: name,email,password)
+
+BULK_BATCH_SIZE = 1000
+LOOKUP_CHUNK = 1000     # IN (...) 목록 크기
+
+
+def _insert(db: AsyncSession):
+    dialect = db.bind.dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(models.User)
+    if dialect == "sqlite":
+        return sqlite.insert(models.User)
+    raise RuntimeError(f"bulk insert를 지원하지 않는 DB입니다: {dialect}")
+
+
+async def _existing(db: AsyncSession,
+                    users: list[UserCreate]) -> tuple[set[str], set[str]]:
+    names, emails = set(), set()
+    for i in range(0, len(users), LOOKUP_CHUNK):
+        chunk = users[i:i + LOOKUP_CHUNK]
+        rows = await db.execute(
+            select(models.User.name, models.User.email)
+            .where(or_(models.User.name.in_([user.name for user in chunk]),
+                       models.User.email.in_([user.email for user in chunk]))))
+        for name, email in rows:
+            names.add(name)
+            emails.add(email)
+    return names, emails
+
+
+async def create_users_bulk(db: AsyncSession,
+                            users: list[UserCreate],
+                            batch_size: int = BULK_BATCH_SIZE) -> BulkUserResult:
+    """
+    충돌한 행은 conflicts로 보고하고 나머지는 모두 생성
+    batch마다 commit (실패해도 앞 batch는 유지)
+    """
+    conflicts: list[BulkUserConflict] = []
+
+    def conflict(index: int, user: UserCreate, reason: str):
+        conflicts.append(BulkUserConflict(index = index, name = user.name,
+                                          email = user.email, reason = reason))
+
+    existing_names, existing_emails = await _existing(db, users)
+    seen_names, seen_emails = set(), set()
+    pending: list[tuple[int, UserCreate]] = []
+    for index, user in enumerate(users):
+        if user.name in existing_names:
+            conflict(index, user, "name already exists")
+        elif user.email in existing_emails:
+            conflict(index, user, "email already exists")
+        elif user.name in seen_names:
+            conflict(index, user, "duplicate name in request")
+        elif user.email in seen_emails:
+            conflict(index, user, "duplicate email in request")
+        else:
+            seen_names.add(user.name)
+            seen_emails.add(user.email)
+            pending.append((index, user))
+
+    hashed = await hashing.hash_passwords_async([user.password for _, user in pending])
+
+    created: list[UserRead] = []
+    stmt = _insert(db).on_conflict_do_nothing().returning(models.User.id,
+                                                          models.User.name,
+                                                          models.User.email)
+    for start in range(0, len(pending), batch_size):
+        batch = pending[start:start + batch_size]
+        rows = [{"name": user.name, "email": user.email, "hashed_password": hashed_password}
+                for (_, user), hashed_password in zip(batch, hashed[start:start + batch_size])]
+        result = await db.execute(stmt, rows)
+        inserted = {row.name: UserRead(id = row.id, name = row.name, email = row.email)
+                    for row in result}
+        await db.commit()
+
+        for index, user in batch:
+            if user.name in inserted:
+                created.append(inserted[user.name])
+            else:
+                conflict(index, user, "already exists")    # 조회 이후 다른 요청이 먼저 생성
+
+    conflicts.sort(key = lambda item: item.index)
+    return BulkUserResult(created = created, conflicts = conflicts)
+
+
+def read_users_csv(path: str) -> list[UserCreate]:
+    with open(path, newline = "", encoding = "utf-8") as f:
+        return [UserCreate(name = row["name"], email = row["email"], password = row["password"])
+                for row in csv.DictReader(f)]
+
+
+async def _run(args) -> BulkUserResult:
+    from src.database import AsyncSessionLocal, async_engine
+
+    users = read_users_csv(args.csv)
+    start = time.perf_counter()
+    try:
+        async with AsyncSessionLocal() as db:
+            result = await create_users_bulk(db, users, args.batch_size)
+    finally:
+        hashing.shutdown_hash_pool()
+        await async_engine.dispose()
+    elapsed = time.perf_counter() - start
+
+    print(f"{len(users)}명 중 {len(result.created)}명 생성, 충돌 {len(result.conflicts)}건 "
+          f"({elapsed:.1f}s, {len(users) / elapsed:.1f} users/s, hash worker {hashing.BULK_HASH_WORKERS}개)")
+    if args.conflicts:
+        with open(args.conflicts, "w", newline = "", encoding = "utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames = ["index", "name", "email", "reason"])
+            writer.writeheader()
+            writer.writerows(conflict.model_dump() for conflict in result.conflicts)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description = "CSV(name,email,password)로 사용자 대량 생성")
+    parser.add_argument("csv")
+    parser.add_argument("--batch-size", type = int, default = BULK_BATCH_SIZE)
+    parser.add_argument("--workers", type = int, default = None,
+                        help = "hash process 수 (기본: BULK_HASH_WORKERS)")
+    parser.add_argument("--conflicts", default = None, help = "충돌 행을 저장할 CSV 경로")
+    args = parser.parse_args()
+
+    if args.workers:
+        hashing.BULK_HASH_WORKERS = args.workers
+    result = asyncio.run(_run(args))
+    sys.exit(1 if result.conflicts and not result.created else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,15 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, declarative_base
 from dotenv import load_dotenv
+from src.utils.pool_metrics import InstrumentedQueuePool, InstrumentedAsyncQueuePool, instrument
 import os
 
 # ORM으로 데이터베이스와 python을 연결하기 
 # 1. 엔진 2. 세션 3. Base 모델
+# 동기 엔진(psycopg2): Alembic, 스크립트용
+# 비동기 엔진(asyncpg): FastAPI route용 -> DB를 기다리는 동안 event loop가 다른 요청 처리
+#                       (threadpool 크기에 묶이지 않음)
 
 load_dotenv()
 DB_USER = os.getenv("DB_USER", "user")
@@ -16,20 +21,59 @@ DB_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}"
 if not DB_URL:
     raise RuntimeError("DB_URL이 준비되지 않았습니다.")
 
+# connection pool 크기 preset (DB_POOL_PRESET)
+# - web: 요청 처리 process (동시 요청이 많고 오래 기다리면 안 됨)
+# - worker: batch/background process (동시성이 낮고 오래 걸리는 작업)
+# 개별 값은 DB_POOL_SIZE / DB_MAX_OVERFLOW / DB_POOL_TIMEOUT / DB_POOL_RECYCLE로 덮어씀
+# (async engine은 ASYNC_DB_ 접두사)
+POOL_PRESETS = {
+    "web": {"pool_size": 10, "max_overflow": 20, "pool_timeout": 30, "pool_recycle": 1800},
+    "worker": {"pool_size": 2, "max_overflow": 2, "pool_timeout": 120, "pool_recycle": 3600}
+}
+DB_POOL_PRESET = os.getenv("DB_POOL_PRESET", "web")
+
+
+def pool_settings(prefix: str = "DB") -> dict:
+    settings = dict(POOL_PRESETS[DB_POOL_PRESET])
+    for key, env, cast in (("pool_size", "POOL_SIZE", int),
+                           ("max_overflow", "MAX_OVERFLOW", int),
+                           ("pool_timeout", "POOL_TIMEOUT", float),
+                           ("pool_recycle", "POOL_RECYCLE", int)):
+        value = os.getenv(f"{prefix}_{env}")
+        if value is not None:
+            settings[key] = cast(value)
+    return settings
+
+
 engine = create_engine(
     DB_URL,
     pool_pre_ping = True,
     future = True,
-    pool_size = 10,
-    max_overflow = 20,
-    pool_timeout = 30
+    poolclass = InstrumentedQueuePool,
+    **pool_settings("DB")
 )
+instrument(engine, "sync")
+
+ASYNC_DB_URL = os.getenv("ASYNC_DB_URL",
+                         f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}")
+
+async_engine = create_async_engine(
+    ASYNC_DB_URL,
+    pool_pre_ping = True,
+    poolclass = InstrumentedAsyncQueuePool,
+    **pool_settings("ASYNC_DB")
+)
+instrument(async_engine.sync_engine, "async")
 
 SessionLocal = sessionmaker(autocommit = False,   # 확정 자동 x
                             autoflush = False,    # 자동 새로고침 x
                             bind = engine,        # 어떤 DB와 연결하여 Session 생성?
                             future = True)
 
+AsyncSessionLocal = async_sessionmaker(async_engine,
+                                       autoflush = False,
+                                       expire_on_commit = False)   # commit 후 속성 접근 시 다시 조회하지 않음
+
 # 이 클래스는 데이터 베이스 테이블과 파이썬의 클래스와 연결 역할
 Base = declarative_base()
 
@@ -41,4 +85,8 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
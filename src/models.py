@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, BigInteger, SmallInteger, String, Float, DateTime, Boolean, \
+                       ForeignKey, Index, func
 from src.database import Base
 
 class User(Base):
@@ -7,4 +8,54 @@ class User(Base):
     id = Column(Integer, primary_key = True, autoincrement = True)
     name = Column(String, unique = True, index = True, nullable = False)
     email = Column(String, unique = True, index = True, nullable = False)
-    hashed_password = Column(String, nullable = False)
\ No newline at end of file
+    hashed_password = Column(String, nullable = False)
+
+class WeatherSlot(Base):
+    """
+    upstream에서 받은 관측값(observation) / 3시간 예보 slot(forecast) 이력
+    - 시간 순으로 계속 append -> ts는 BRIN index (작고, 시간 범위 조회에 충분)
+    - 지역별 범위 조회는 (location, kind, ts) index
+    """
+    __tablename__ = 'weather_slots'
+
+    id = Column(BigInteger().with_variant(Integer, 'sqlite'), primary_key = True, autoincrement = True)
+    location = Column(String, nullable = False)       # 정규화된 도시 이름 또는 "lat,lon"
+    kind = Column(String(16), nullable = False)       # observation | forecast
+    ts = Column(DateTime(timezone = True), nullable = False)          # 관측/예보 대상 시각
+    fetched_at = Column(DateTime(timezone = True), nullable = False)  # upstream에서 받은 시각
+    temp = Column(Float)
+    feels_like = Column(Float)
+    humidity = Column(SmallInteger)
+    wind = Column(Float)
+    rain = Column(Float)      # mm (observation: 1시간, forecast: 3시간)
+    snow = Column(Float)
+    description = Column(String)
+
+    __table_args__ = (
+        Index('ix_weather_slots_ts_brin', 'ts', postgresql_using = 'brin'),
+        Index('ix_weather_slots_location_kind_ts', 'location', 'kind', 'ts'),
+    )
+
+class AlertSubscription(Base):
+    """
+    사용자별 날씨 알림 rule
+    "location의 오늘부터 window_days일 뒤까지 metric op threshold인 날이 min_days일 이상이면 알림"
+    (metric: forecast_fields.DAILY_AGG column, op: > >= < <=)
+    - 주기마다 enabled인 행 전부를 읽어 한 번에 평가 -> (enabled, location) index
+    """
+    __tablename__ = 'alert_subscriptions'
+
+    id = Column(BigInteger().with_variant(Integer, 'sqlite'), primary_key = True, autoincrement = True)
+    user_id = Column(Integer, ForeignKey('users.id', ondelete = 'CASCADE'), nullable = False, index = True)
+    location = Column(String, nullable = False)       # 정규화된 도시 key (normalize_city)
+    metric = Column(String(32), nullable = False)
+    op = Column(String(2), nullable = False)
+    threshold = Column(Float, nullable = False)
+    window_days = Column(SmallInteger, nullable = False, default = 7)
+    min_days = Column(SmallInteger, nullable = False, default = 1)
+    enabled = Column(Boolean, nullable = False, default = True)
+    created_at = Column(DateTime(timezone = True), nullable = False, server_default = func.now())
+
+    __table_args__ = (
+        Index('ix_alert_subscriptions_enabled_location', 'enabled', 'location'),
+    )
@@ -1,10 +1,56 @@
 import pandas as pd
 import streamlit as st
-from api.openweather import get_current_weather_by_coords
-from utils.util_forecast import check_rain_alert, check_snow_alert
+from api.openweather import get_current_weather_by_coords, \
+                            get_forecast, \
+                            normalize_coords, \
+                            is_ok_response, \
+                            CURRENT_WEATHER_TTL, \
+                            FORECAST_TTL
+from utils.util_forecast import process_forecast, check_rain_alert, check_snow_alert
 
 API_KEY = st.secrets["OPENWEATHERMAP_API_KEY"]
 
+
+class WeatherAPIError(Exception):
+    """
+    API 호출 실패 (st.cache_data는 예외를 캐시하지 않으므로 실패 응답은 다음 rerun에 재시도)
+    """
+
+
+# Streamlit rerun 캐시
+# - st.cache_data: 모든 session이 공유, TTL은 upstream 갱신 주기에 맞춤
+
+@st.cache_data(ttl = CURRENT_WEATHER_TTL, show_spinner = False)
+def _cached_current_weather(lat: float,
+                            lon: float) -> dict:
+    current = get_current_weather_by_coords(lat, lon, API_KEY)
+    if not is_ok_response(current):
+        raise WeatherAPIError(current.get("message", "알 수 없는 오류")
+                              if isinstance(current, dict) else "API 응답 오류")
+    return current
+
+
+def fetch_current_weather(lat: float,
+                          lon: float) -> dict:
+    """
+    현재 날씨 (근처 좌표는 같은 캐시 항목을 쓰도록 격자 반올림 후 조회)
+    실패 시 WeatherAPIError
+    """
+    return _cached_current_weather(*normalize_coords(lat, lon))
+
+
+@st.cache_data(ttl = FORECAST_TTL, show_spinner = False)
+def fetch_daily_forecast(city: str) -> pd.DataFrame:
+    """
+    도시 예보 조회 + process_forecast 결과를 함께 캐시
+    실패 시 WeatherAPIError
+    """
+    data = get_forecast(city, API_KEY)
+    if not is_ok_response(data):
+        raise WeatherAPIError(data.get("message", "알 수 없는 오류")
+                              if isinstance(data, dict) else "API 응답 오류")
+    return process_forecast(data)
+
 def show_forecast(daily: pd.DataFrame):
     """
     Streamlit에서 예보 테이블과 그래프를 출력
@@ -37,30 +83,6 @@ def show_forecast(daily: pd.DataFrame):
         st.line_chart(daily[["강수량","최대강수량","적설량","최대적설량"]])
 
 
-def show_current_weather(lat: float,
-                         lon: float,
-                         title: str):
-    """
-    현재 위치 날씨를 안전하게 가져와서 출력
-    """
-    current = get_current_weather_by_coords(lat,
-                                            lon,
-                                            API_KEY)
-    
-    # 1. 응답이 dict인지 확인
-    if not isinstance(current, dict):
-        st.error("API 응답이 올바르지 않습니다.")
-        return
-
-    # 2. 정상 응답 여부 확인
-    cod = str(current.get("cod", "500"))
-    if cod != "200":
-        st.error(f"{title} 호출 실패: {current.get('message', '알 수 없는 오류')}")
-        return
-    
-    # 3. 정상일 때만 상세 출력
-    show_current_details(current, title)
-
 def show_current_details(data: dict,
                          title: str):
     """
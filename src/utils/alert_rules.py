@@ -0,0 +1,140 @@
+import datetime
+import numpy as np
+import pandas as pd
+from .forecast_fields import DAILY_AGG
+
+# 날씨 알림 rule engine (Streamlit 없이 동작)
+# rule: "location의 오늘부터 window_days일 뒤까지 중 metric(DAILY_AGG column) op threshold인 날이
+#        min_days일 이상이면 알림"
+# - 구독(rule) 수십만 개를 한 번에 평가: rule을 column 배열(RuleSet)로 들고
+#   지역 x 날짜 행렬에서 rule마다 자기 지역 행을 gather -> 비교 -> 기간 mask -> 일수 합계
+#   (rule마다 DataFrame을 거르지 않음, python loop는 metric/연산자 종류 수만큼만)
+# - 입력 daily는 process_forecast_batch 결과 ((location, date) MultiIndex)
+
+OPS = {
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "<": np.less,
+    "<=": np.less_equal
+}
+METRICS = tuple(DAILY_AGG)
+MAX_WINDOW_DAYS = 7
+
+EVENT_COLUMNS = ["rule_id", "user_id", "location", "metric", "op", "threshold",
+                 "first_date", "matched_days", "value"]
+
+
+class RuleSet:
+    """
+    rule 목록을 column별 numpy 배열로 보관
+    metric/op는 METRICS/OPS 순서의 번호로 바꿔 둠 (문자열 비교 없이 묶기 위해)
+    """
+
+    def __init__(self,
+                 rule_id,
+                 user_id,
+                 location,
+                 metric,
+                 op,
+                 threshold,
+                 window_days,
+                 min_days):
+        self.rule_id = np.asarray(rule_id, dtype = np.int64)
+        self.user_id = np.asarray(user_id, dtype = np.int64)
+        self.location = np.asarray(location, dtype = object)
+        self.metric = pd.Index(METRICS).get_indexer(np.asarray(metric, dtype = object))
+        self.op = pd.Index(list(OPS)).get_indexer(np.asarray(op, dtype = object))
+        self.threshold = np.asarray(threshold, dtype = np.float64)
+        self.window_days = np.clip(np.asarray(window_days, dtype = np.int64), 0, MAX_WINDOW_DAYS)
+        self.min_days = np.maximum(np.asarray(min_days, dtype = np.int64), 1)
+        if (self.metric < 0).any() or (self.op < 0).any():
+            raise ValueError("지원하지 않는 metric 또는 연산자가 있습니다")
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "RuleSet":
+        """
+        column: id, user_id, location, metric, op, threshold, window_days, min_days
+        """
+        return cls(df["id"], df["user_id"], df["location"], df["metric"], df["op"],
+                   df["threshold"], df["window_days"], df["min_days"])
+
+    def __len__(self) -> int:
+        return len(self.rule_id)
+
+
+def _empty_events() -> pd.DataFrame:
+    return pd.DataFrame({name: [] for name in EVENT_COLUMNS})
+
+
+def evaluate(daily: pd.DataFrame,
+             rules: RuleSet,
+             today: datetime.date | None = None) -> pd.DataFrame:
+    """
+    모든 rule을 한 번에 평가 -> 조건을 만족한 rule의 알림 event (rule 하나당 최대 1행)
+    first_date: 조건을 만족한 첫 날, value: 그 날의 metric 값
+    예보가 없는 지역의 rule은 평가하지 않음
+    """
+    today = today or datetime.date.today()
+    if len(rules) == 0 or daily.empty:
+        return _empty_events()
+
+    # 지역 x 날짜(오늘 ~ 오늘 + MAX_WINDOW_DAYS) 행렬, 예보가 없는 칸은 NaN (비교 결과 False)
+    dates = [today + datetime.timedelta(days = offset) for offset in range(MAX_WINDOW_DAYS + 1)]
+    used = [METRICS[code] for code in np.unique(rules.metric)]
+    grid = daily[used].unstack("date").reindex(columns = pd.MultiIndex.from_product([used, dates]))
+    offsets = np.arange(len(dates))
+
+    row = grid.index.get_indexer(rules.location)       # 예보가 없는 지역이면 -1
+    found = []
+    for code in np.unique(rules.metric):
+        selected = np.flatnonzero((rules.metric == code) & (row >= 0))
+        if len(selected) == 0:
+            continue
+        values = grid[METRICS[code]].to_numpy(dtype = np.float64)[row[selected]]   # (rule 수, 날짜 수)
+        thresholds = rules.threshold[selected][:, None]
+
+        matched = np.zeros(values.shape, dtype = bool)
+        op_codes = rules.op[selected]
+        for op_code, compare in enumerate(OPS.values()):
+            same_op = op_codes == op_code
+            if same_op.any():
+                matched[same_op] = compare(values[same_op], thresholds[same_op])
+        matched &= offsets[None, :] <= rules.window_days[selected][:, None]
+
+        counts = matched.sum(axis = 1)
+        fired = counts >= rules.min_days[selected]
+        if not fired.any():
+            continue
+        first = matched[fired].argmax(axis = 1)
+        found.append((selected[fired], first, counts[fired],
+                      values[fired][np.arange(len(first)), first]))
+
+    if not found:
+        return _empty_events()
+    index, first, counts, values = (np.concatenate(parts) for parts in zip(*found))
+    return pd.DataFrame({
+        "rule_id": rules.rule_id[index],
+        "user_id": rules.user_id[index],
+        "location": rules.location[index],
+        "metric": np.asarray(METRICS, dtype = object)[rules.metric[index]],
+        "op": np.asarray(list(OPS), dtype = object)[rules.op[index]],
+        "threshold": rules.threshold[index],
+        "first_date": np.asarray(dates, dtype = object)[first],
+        "matched_days": counts,
+        "value": values
+    })
+
+
+def evaluate_single(daily: pd.DataFrame,
+                    metric: str,
+                    op: str,
+                    threshold: float,
+                    window_days: int = MAX_WINDOW_DAYS,
+                    min_days: int = 1,
+                    today: datetime.date | None = None) -> pd.DataFrame:
+    """
+    지역 하나의 process_forecast 결과(date index)에 rule 하나 적용 (화면 표시용)
+    """
+    batch = pd.concat({"": daily}, names = ["location"])
+    return evaluate(batch, RuleSet([0], [0], [""], [metric], [op], [threshold], [window_days], [min_days]),
+                    today)
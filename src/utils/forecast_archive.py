@@ -0,0 +1,242 @@
+import argparse
+import datetime
+import os
+import uuid
+from collections.abc import Iterable
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from pyarrow import fs
+from .forecast_slots import ForecastSlots, DTYPES
+from .forecast_fields import DAILY_AGG
+
+# 예보 slot 이력 columnar archive (Parquet, hive 날짜 partition)
+#   root/date=2026-10-18/part-0.parquet   <- 그 날(UTC) 예보 대상 slot 전부 (모든 지역)
+# - 같은 (location, dt) slot은 가장 나중에 받은 예보만 남김 (compact 때 병합)
+# - 읽을 때는 memory-map + date/location 조건을 partition/row group 단계에서 걸러냄
+# - 일별 집계는 partition(=날짜) 하나씩 Arrow group_by로 계산 -> 메모리는 하루치만 사용
+# 실행: python -m src.utils.forecast_archive compact ./archive --since 2026-09-01
+#       python -m src.utils.forecast_archive summary ./archive --location seoul --start 2026-09-01
+
+SCHEMA = pa.schema(
+    [("location", pa.string()),
+     ("dt", pa.timestamp("s", tz = "UTC")),
+     ("fetched_at", pa.timestamp("s", tz = "UTC"))]
+    + [(name, pa.from_numpy_dtype(dtype)) for name, dtype in DTYPES.items() if name != "dt"]
+)
+PARTITIONING = ds.partitioning(pa.schema([("date", pa.date32())]), flavor = "hive")
+ROW_GROUP_SIZE = 64 * 1024
+
+
+def table_from_payloads(items: Iterable[tuple[str, dict, int]]) -> pa.Table:
+    """
+    (지역, get_forecast 응답, 받은 시각 epoch 초) -> SCHEMA 형태의 Arrow table
+    """
+    columns: dict[str, list] = {name: [] for name in SCHEMA.names}
+    for location, data, fetched_at in items:
+        slots = ForecastSlots.from_payload(data)
+        columns["location"].append(pa.array([location] * len(slots), pa.string()))
+        columns["fetched_at"].append(pa.array([fetched_at] * len(slots), pa.int64()))
+        for name, values in slots.columns().items():
+            columns[name].append(pa.array(values))
+
+    return pa.table({name: pa.concat_arrays(arrays).cast(SCHEMA.field(name).type) if arrays
+                     else pa.array([], SCHEMA.field(name).type)
+                     for name, arrays in columns.items()},
+                    schema = SCHEMA)
+
+
+def table_from_rows(rows: list[dict]) -> pa.Table:
+    """
+    weather_slots(kind=forecast) 행 -> SCHEMA 형태의 Arrow table
+    """
+    return pa.table({
+        "location": [row["location"] for row in rows],
+        "dt": [row["ts"] for row in rows],
+        "fetched_at": [row["fetched_at"] for row in rows],
+        "temp": [row["temp"] for row in rows],
+        "feels_like": [row["feels_like"] for row in rows],
+        "humidity": [row["humidity"] for row in rows],
+        "wind": [row["wind"] for row in rows],
+        "rain_3h": [row["rain"] or 0 for row in rows],
+        "snow_3h": [row["snow"] or 0 for row in rows]
+    }, schema = SCHEMA)
+
+
+def _partition_path(root: str,
+                    date: datetime.date) -> str:
+    return os.path.join(root, f"date={date.isoformat()}", "part-0.parquet")
+
+
+def _latest_only(table: pa.Table) -> pa.Table:
+    # 같은 (location, dt) slot은 마지막으로 받은 예보만
+    df = table.to_pandas()
+    df = df.sort_values("fetched_at", kind = "stable").drop_duplicates(["location", "dt"], keep = "last")
+    df = df.sort_values(["location", "dt"])     # location 순 정렬 -> row group 통계로 걸러내기 쉬움
+    return pa.Table.from_pandas(df, schema = SCHEMA, preserve_index = False)
+
+
+def compact(table: pa.Table,
+            root: str) -> list[datetime.date]:
+    """
+    새 slot들을 날짜 partition에 병합 (partition 파일은 임시 파일에 쓴 뒤 교체)
+    반환: 갱신한 날짜
+    """
+    if table.num_rows == 0:
+        return []
+    dates = pc.cast(table["dt"], pa.date32())
+    updated = []
+    for date in pc.unique(dates).to_pylist():
+        part = table.filter(pc.equal(dates, pa.scalar(date, pa.date32())))
+        path = _partition_path(root, date)
+        if os.path.exists(path):
+            part = pa.concat_tables([pq.read_table(path, schema = SCHEMA), part])
+
+        os.makedirs(os.path.dirname(path), exist_ok = True)
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        pq.write_table(_latest_only(part), tmp, row_group_size = ROW_GROUP_SIZE, compression = "zstd")
+        os.replace(tmp, path)
+        updated.append(date)
+    return sorted(updated)
+
+
+def compact_from_db(engine,
+                    root: str,
+                    since: datetime.datetime | None = None,
+                    until: datetime.datetime | None = None,
+                    chunk_size: int = 100_000) -> int:
+    """
+    weather_slots의 forecast 행을 chunk 단위로 읽어 archive에 병합 -> 옮긴 행 수
+    """
+    from sqlalchemy import select
+    from src.models import WeatherSlot
+
+    query = select(WeatherSlot.location, WeatherSlot.ts, WeatherSlot.fetched_at, WeatherSlot.temp,
+                   WeatherSlot.feels_like, WeatherSlot.humidity, WeatherSlot.wind,
+                   WeatherSlot.rain, WeatherSlot.snow).where(WeatherSlot.kind == "forecast")
+    if since is not None:
+        query = query.where(WeatherSlot.ts >= since)
+    if until is not None:
+        query = query.where(WeatherSlot.ts < until)
+
+    moved = 0
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results = True, yield_per = chunk_size).execute(query)
+        for chunk in result.mappings().partitions():
+            compact(table_from_rows(chunk), root)
+            moved += len(chunk)
+    return moved
+
+
+def open_archive(root: str) -> ds.Dataset:
+    """
+    archive 전체를 하나의 dataset으로 (파일은 memory-map으로 읽음)
+    """
+    return ds.dataset(root, format = "parquet", partitioning = PARTITIONING,
+                      filesystem = fs.LocalFileSystem(use_mmap = True))
+
+
+def _predicate(locations: Iterable[str] | None,
+               start: datetime.date | None,
+               end: datetime.date | None):
+    # date는 partition 경로로, location은 row group 통계로 걸러냄
+    parts = []
+    if start is not None:
+        parts.append(ds.field("date") >= pa.scalar(start, pa.date32()))
+    if end is not None:
+        parts.append(ds.field("date") <= pa.scalar(end, pa.date32()))
+    if locations is not None:
+        parts.append(ds.field("location").isin(list(locations)))
+    expr = None
+    for part in parts:
+        expr = part if expr is None else expr & part
+    return expr
+
+
+def read_slots(root: str,
+               locations: Iterable[str] | None = None,
+               start: datetime.date | None = None,
+               end: datetime.date | None = None,
+               columns: list[str] | None = None) -> pa.Table:
+    """
+    조건에 맞는 slot만 읽음 (start/end는 UTC 날짜, 양 끝 포함)
+    """
+    return open_archive(root).to_table(columns = columns,
+                                       filter = _predicate(locations, start, end))
+
+
+def daily_from_arrow(table: pa.Table) -> pd.DataFrame:
+    """
+    (location, date, slot column...) Arrow table -> DAILY_AGG 집계
+    process_forecast_batch와 같은 (location, date) MultiIndex DataFrame
+    """
+    # DAILY_AGG의 함수 이름(min/max/mean/sum)은 Arrow hash 집계 이름과 같음
+    pairs = list(dict.fromkeys(DAILY_AGG.values()))
+    grouped = table.group_by(["location", "date"]).aggregate(pairs)
+
+    index = pd.MultiIndex.from_arrays(
+        [grouped["location"].to_numpy(zero_copy_only = False),
+         pd.Index(grouped["date"].to_pylist())],
+        names = ["location", "date"])
+    daily = pd.DataFrame({name: grouped[f"{col}_{func}"].to_numpy(zero_copy_only = False)
+                          for name, (col, func) in DAILY_AGG.items()},
+                         index = index)
+    return daily.sort_index()
+
+
+def daily_summary(root: str,
+                  locations: Iterable[str] | None = None,
+                  start: datetime.date | None = None,
+                  end: datetime.date | None = None) -> pd.DataFrame:
+    """
+    기간/지역의 일별 집계
+    partition(날짜) 하나씩 읽어 집계하므로 한 번에 메모리에 올리는 건 하루치뿐
+    """
+    dataset = open_archive(root)
+    expr = _predicate(locations, start, end)
+    columns = ["location"] + list(dict.fromkeys(col for col, _ in DAILY_AGG.values()))
+
+    frames = []
+    for fragment in dataset.get_fragments(filter = expr):
+        date = ds.get_partition_keys(fragment.partition_expression)["date"]
+        table = fragment.to_table(columns = columns, filter = expr, schema = dataset.schema)
+        if table.num_rows == 0:
+            continue
+        table = table.append_column("date", pa.array([date] * table.num_rows, pa.date32()))
+        frames.append(daily_from_arrow(table))
+
+    if not frames:
+        return daily_from_arrow(pa.table({"location": pa.array([], pa.string()),
+                                          "date": pa.array([], pa.date32()),
+                                          **{col: pa.array([], SCHEMA.field(col).type)
+                                             for col in columns[1:]}}))
+    return pd.concat(frames).sort_index()
+
+
+def main():
+    parser = argparse.ArgumentParser(description = "예보 이력 Parquet archive")
+    sub = parser.add_subparsers(dest = "command", required = True)
+
+    compact_parser = sub.add_parser("compact", help = "weather_slots(forecast)를 archive로 병합")
+    compact_parser.add_argument("root")
+    compact_parser.add_argument("--since", type = datetime.datetime.fromisoformat, default = None)
+    compact_parser.add_argument("--until", type = datetime.datetime.fromisoformat, default = None)
+
+    summary_parser = sub.add_parser("summary", help = "일별 집계 출력")
+    summary_parser.add_argument("root")
+    summary_parser.add_argument("--location", action = "append", default = None)
+    summary_parser.add_argument("--start", type = datetime.date.fromisoformat, default = None)
+    summary_parser.add_argument("--end", type = datetime.date.fromisoformat, default = None)
+    args = parser.parse_args()
+
+    if args.command == "compact":
+        from src.database import engine
+        print(f"{compact_from_db(engine, args.root, args.since, args.until)}행 병합")
+    else:
+        print(daily_summary(args.root, args.location, args.start, args.end).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# 예보 slot / 날짜별 요약의 column 정의와 slot 펼치기
+# util_forecast(Streamlit 표시), alert_rules, forecast_slots 등이 함께 쓰는 부분만 모음
+# (streamlit / alert_rules를 import하지 않으므로 어느 쪽에서 import해도 순환하지 않음)
+
+# 날짜별 집계 정의: 결과 column명 -> (원본 column, 집계 함수)
+# 사용자 친화적 column명으로 바로 집계
+DAILY_AGG = {
+    "최저기온": ("temp", "min"),
+    "최대기온": ("temp", "max"),
+    "평균기온": ("temp", "mean"),
+    "최저체감기온": ("feels_like", "min"),
+    "최대체감기온": ("feels_like", "max"),
+    "평균체감기온": ("feels_like", "mean"),
+    "최저습도": ("humidity", "min"),
+    "최대습도": ("humidity", "max"),
+    "평균습도": ("humidity", "mean"),
+    "최저풍속": ("wind", "min"),
+    "최대풍속": ("wind", "max"),
+    "평균풍속": ("wind", "mean"),
+    "강수량": ("rain_3h", "sum"),
+    "평균강수량": ("rain_3h", "mean"),
+    "최대강수량": ("rain_3h", "max"),
+    "적설량": ("snow_3h", "sum"),
+    "평균적설량": ("snow_3h", "mean"),
+    "최대적설량": ("snow_3h", "max")
+}
+
+
+# slot 하나에서 꺼내는 값 (slot_values 반환 순서)
+SLOT_FIELDS = ("temp", "feels_like", "humidity", "wind", "rain_3h", "snow_3h")
+
+
+def slot_values(slot: dict,
+                period: str = "3h") -> tuple:
+    """
+    예보 slot(또는 현재 날씨 응답) 하나 -> SLOT_FIELDS 순서의 값
+    rain / snow가 dict일 때만 period("3h", 현재 날씨는 "1h") 값을 꺼냄. 없으면 0
+    """
+    main = slot["main"]
+    rain = slot.get("rain")
+    snow = slot.get("snow")
+    return (main["temp"],
+            main["feels_like"],
+            main["humidity"],
+            slot["wind"]["speed"],
+            rain.get(period, 0) if isinstance(rain, dict) else 0,
+            snow.get(period, 0) if isinstance(snow, dict) else 0)
+
+
+def flatten_slots(slots: list[dict]) -> dict[str, list]:
+    """
+    3시간 단위 예보(list of dict)를 한 번만 순회하며 column별 list로 펼침
+    (column마다 Series.apply를 돌리지 않도록)
+    """
+    rows = [slot_values(slot) for slot in slots]
+    columns = zip(*rows) if rows else [()] * len(SLOT_FIELDS)
+    return {
+        "dt": [slot["dt"] for slot in slots],
+        "dt_txt": [slot["dt_txt"] for slot in slots],
+        **{name: list(values) for name, values in zip(SLOT_FIELDS, columns)}
+    }
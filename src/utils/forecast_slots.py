@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+from .forecast_fields import DAILY_AGG, flatten_slots
+
+# 예보 slot의 compact 표현
+# dict-of-dicts / object dtype DataFrame 대신 column별 고정 타입 배열로 보관
+# 40 slot 기준 약 1KB (원본 JSON dict는 수십 KB)
+# 응답 body를 바로 이 배열로 decode 하지는 않음: 캐시/stale 응답/이력 저장/payload listener가
+# 모두 원본 dict를 공유하므로 upstream 응답은 decode_response(orjson)로 dict decode 후 from_payload
+
+DTYPES = {
+    "dt": np.int64,            # UTC epoch 초
+    "temp": np.float32,
+    "feels_like": np.float32,
+    "humidity": np.uint8,      # 0 ~ 100 %
+    "wind": np.float32,
+    "rain_3h": np.float32,
+    "snow_3h": np.float32
+}
+
+
+class ForecastSlots:
+    """
+    예보 slot들을 column별 numpy 배열로 보관하는 container
+
+    slots = ForecastSlots.from_payload(get_forecast("서울", API_KEY))
+    slots.to_frame()   # 배열을 복사하지 않는 DataFrame
+    slots.daily()      # process_forecast와 같은 column의 날짜별 요약
+    """
+
+    __slots__ = tuple(DTYPES)
+
+    def __init__(self, **columns):
+        for name, dtype in DTYPES.items():
+            setattr(self, name, np.asarray(columns[name], dtype = dtype))
+
+    @classmethod
+    def from_payload(cls, data: dict) -> "ForecastSlots":
+        if data.get("cod") != "200" or "list" not in data:
+            raise ValueError(f"예보 데이터가 유효하지 않습니다: {data.get('message', 'list 없음')}")
+
+        return cls(**flatten_slots(data["list"]))
+
+    def __len__(self) -> int:
+        return len(self.dt)
+
+    def __repr__(self) -> str:
+        return f"ForecastSlots({len(self)} slots, {self.nbytes} bytes)"
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in DTYPES)
+
+    def columns(self) -> dict[str, np.ndarray]:
+        """
+        column 이름 -> 배열 (복사 없음)
+        """
+        return {name: getattr(self, name) for name in DTYPES}
+
+    def times(self) -> np.ndarray:
+        """
+        dt를 datetime64[s] view로 (복사 없음)
+        """
+        return self.dt.view("datetime64[s]")
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        배열을 그대로 column으로 쓰는 DataFrame (copy = False)
+        dt는 datetime64[s] 시각 column
+        """
+        columns = self.columns()
+        columns["dt"] = self.times()
+        return pd.DataFrame(columns, copy = False)
+
+    def daily(self) -> pd.DataFrame:
+        """
+        UTC 날짜별 요약 (process_forecast와 같은 column, float32 정밀도)
+
+        slot이 시간순이면 같은 날짜가 연속하므로 groupby 대신
+        ufunc.reduceat으로 날짜 구간별 min/max/sum을 한 번에 계산
+        """
+        if len(self) == 0:
+            return pd.DataFrame(columns = list(DAILY_AGG),
+                                index = pd.Index([], name = "date"))
+
+        order = np.argsort(self.dt, kind = "stable")
+        days = self.dt[order] // 86400
+        day_index, starts = np.unique(days, return_index = True)
+        counts = np.diff(np.append(starts, len(days)))
+
+        reducers = {"min": np.minimum.reduceat, "max": np.maximum.reduceat}
+        sums: dict[str, np.ndarray] = {}
+        columns = {}
+        for name, (col, func) in DAILY_AGG.items():
+            values = getattr(self, col)[order]
+            if func in reducers:
+                columns[name] = reducers[func](values, starts)
+                continue
+            if col not in sums:
+                sums[col] = np.add.reduceat(values.astype(np.float64), starts)
+            columns[name] = sums[col] if func == "sum" else sums[col] / counts
+
+        dates = day_index.astype("datetime64[D]").astype(object)   # datetime.date
+        return pd.DataFrame(columns, index = pd.Index(dates, name = "date"))
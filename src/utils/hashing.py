@@ -1,13 +1,153 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
 from passlib.context import CryptContext
 
-# bcrypt 알고리즘 사용
+# argon2 알고리즘 사용
+# argon2는 일부러 CPU/메모리를 많이 쓰는 hash라, 요청 처리 thread에서 돌리면
+# login이 몰릴 때 다른 route까지 threadpool을 기다리게 됨
+# -> async handler는 전용 process pool(크기 제한)에서 hash/verify를 실행하고 결과만 await
+# cost는 env로 조절 (worker process도 같은 env로 같은 설정을 만듦)
+# env가 없으면 passlib(argon2-cffi) 기본 cost를 그대로 사용 (hash 강도를 임의로 바꾸지 않음)
+# 대량 hash(bulk 가입)는 login/가입과 다른 process pool에서 -> bulk import 중에도 login이 밀리지 않음
+
+ARGON2_SETTINGS = {name: int(os.environ[env])
+                   for name, env in (("time_cost", "ARGON2_TIME_COST"),
+                                     ("memory_cost", "ARGON2_MEMORY_COST"),     # KiB
+                                     ("parallelism", "ARGON2_PARALLELISM"))
+                   if os.getenv(env)}
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+HASH_MAX_QUEUE = int(os.getenv("HASH_MAX_QUEUE", "256"))   # 처리 중 + 대기 중 작업 상한
+BULK_HASH_WORKERS = int(os.getenv("BULK_HASH_WORKERS", str(max(1, HASH_WORKERS // 2))))
 
 pwd_context = CryptContext(schemes = ['argon2'],
-                           deprecated = 'auto')
+                           deprecated = 'auto',
+                           **{f"argon2__{name}": value for name, value in ARGON2_SETTINGS.items()})
 
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
 def verify_password(plain_password: str,
                     hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
\ No newline at end of file
+    return pwd_context.verify(plain_password, hashed_password)
+
+def hash_many(passwords: list[str]) -> list[str]:
+    return [pwd_context.hash(password) for password in passwords]
+
+
+class HashQueueFull(Exception):
+    """
+    hash 대기열이 가득 참 (HASH_MAX_QUEUE)
+    """
+
+
+_pool: ProcessPoolExecutor | None = None
+_bulk_pool: ProcessPoolExecutor | None = None
+_lock = threading.Lock()
+_stats = {"in_flight": 0, "completed": 0, "rejected": 0, "max_in_flight": 0,
+          "total_seconds": 0.0, "bulk_in_flight": 0, "bulk_completed": 0}
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers = HASH_WORKERS)
+        return _pool
+
+
+def _get_bulk_pool() -> ProcessPoolExecutor:
+    global _bulk_pool
+    with _lock:
+        if _bulk_pool is None:
+            _bulk_pool = ProcessPoolExecutor(max_workers = BULK_HASH_WORKERS)
+        return _bulk_pool
+
+
+async def _submit(fn, *args):
+    with _lock:
+        if _stats["in_flight"] >= HASH_MAX_QUEUE:
+            _stats["rejected"] += 1
+            raise HashQueueFull("비밀번호 처리 요청이 많습니다")
+        _stats["in_flight"] += 1
+        _stats["max_in_flight"] = max(_stats["max_in_flight"], _stats["in_flight"])
+
+    start = time.perf_counter()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_get_pool(), fn, *args)
+    finally:
+        with _lock:
+            _stats["in_flight"] -= 1
+            _stats["completed"] += 1
+            _stats["total_seconds"] += time.perf_counter() - start
+
+
+async def _submit_bulk(passwords: list[str]) -> list[str]:
+    with _lock:
+        _stats["bulk_in_flight"] += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_get_bulk_pool(), hash_many, passwords)
+    finally:
+        with _lock:
+            _stats["bulk_in_flight"] -= 1
+            _stats["bulk_completed"] += 1
+
+
+async def hash_password_async(password: str) -> str:
+    return await _submit(hash_password, password)
+
+
+async def verify_password_async(plain_password: str,
+                                hashed_password: str) -> bool:
+    return await _submit(verify_password, plain_password, hashed_password)
+
+
+async def hash_passwords_async(passwords: list[str],
+                               chunk_size: int | None = None) -> list[str]:
+    """
+    대량 hash (bulk 가입 등): chunk 단위로 나눠 bulk 전용 pool의 모든 worker에서 처리
+    동시에 제출하는 chunk 수는 bulk worker 수만큼 (여러 bulk 요청이 겹쳐도 pool 대기열이 커지지 않게)
+    """
+    gate = asyncio.Semaphore(BULK_HASH_WORKERS)
+    # worker마다 여러 chunk가 돌아가도록 (IPC 횟수는 줄이고 worker는 놀지 않게)
+    chunk_size = chunk_size or max(1, min(64, -(-len(passwords) // (BULK_HASH_WORKERS * 4))))
+
+    async def run(chunk: list[str]) -> list[str]:
+        async with gate:
+            return await _submit_bulk(chunk)
+
+    chunks = [passwords[i:i + chunk_size] for i in range(0, len(passwords), chunk_size)]
+    results = await asyncio.gather(*(run(chunk) for chunk in chunks))
+    return [hashed for chunk in results for hashed in chunk]
+
+
+def hash_stats() -> dict:
+    """
+    process pool 크기, 처리 중/대기 중 작업 수, 평균 처리 시간(대기 포함)
+    """
+    with _lock:
+        in_flight = _stats["in_flight"]
+        completed = _stats["completed"]
+        return {"workers": HASH_WORKERS,
+                "in_flight": in_flight,
+                "queued": max(0, in_flight - HASH_WORKERS),
+                "max_in_flight": _stats["max_in_flight"],
+                "max_queue": HASH_MAX_QUEUE,
+                "completed": completed,
+                "rejected": _stats["rejected"],
+                "bulk_workers": BULK_HASH_WORKERS,
+                "bulk_in_flight": _stats["bulk_in_flight"],
+                "bulk_completed": _stats["bulk_completed"],
+                "avg_ms": round(_stats["total_seconds"] / completed * 1000, 2) if completed else 0.0}
+
+
+def shutdown_hash_pool():
+    global _pool, _bulk_pool
+    with _lock:
+        pools = (_pool, _bulk_pool)
+        _pool = _bulk_pool = None
+    for pool in pools:
+        if pool is not None:
+            pool.shutdown(wait = False, cancel_futures = True)
@@ -0,0 +1,59 @@
+import hashlib
+import json
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import Request, Response
+
+# HTTP 캐시 헤더 (ETag / Last-Modified / Cache-Control) + 조건부 요청(304) 처리
+# 같은 데이터를 다시 요청하면 body 없이 304로 응답 -> 브라우저/CDN이 재사용
+
+
+def compact_json(body) -> bytes:
+    return json.dumps(body, ensure_ascii = False, separators = (",", ":")).encode()
+
+
+def make_etag(raw: bytes) -> str:
+    return '"' + hashlib.sha1(raw).hexdigest() + '"'
+
+
+def _not_modified(request: Request,
+                  etag: str,
+                  last_modified: datetime) -> bool:
+    # If-None-Match가 있으면 If-Modified-Since보다 우선 (RFC 9110)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo = timezone.utc)   # "-0000"(시간대 정보 없음)은 UTC로 간주
+        return last_modified.replace(microsecond = 0) <= since
+    return False
+
+
+def cached_json_response(request: Request,
+                         body,
+                         last_modified: datetime,
+                         max_age: int) -> Response:
+    """
+    body를 compact JSON으로 직렬화해 캐시 헤더를 붙여 반환
+    조건부 요청이 현재 데이터와 일치하면 304 Not Modified
+    """
+    raw = compact_json(body)
+    etag = make_etag(raw)
+    last_modified = min(last_modified, datetime.now(timezone.utc))   # 미래 시각은 쓰지 않음
+    headers = {
+        "ETag": etag,
+        "Last-Modified": format_datetime(last_modified, usegmt = True),
+        "Cache-Control": f"public, max-age={max(0, int(max_age))}"
+    }
+
+    if _not_modified(request, etag, last_modified):
+        return Response(status_code = 304, headers = headers)
+    return Response(content = raw, media_type = "application/json", headers = headers)
@@ -0,0 +1,102 @@
+import os
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
+from src import models
+from src.api.cache import TTLCache
+from src.utils.schemas import UserRead
+
+# 인증된 사용자 캐시 (token의 sub -> UserRead)
+# 인증이 필요한 route마다 하던 users 조회를 miss일 때만 하도록
+# - TTL + 메모리 상한(LRU)으로 크기 제한
+# - User가 수정/삭제되면 commit 시점에 해당 이름을 캐시에서 제거
+#   (flush 중에 지우면 commit 전에 다른 요청이 옛 값을 다시 채울 수 있음)
+# - 캐시와 무효화는 process 안에서만 유효: 다른 worker/process는 수정/삭제된 사용자를
+#   최대 IDENTITY_CACHE_TTL초(기본 60초) 동안 옛 값으로 인증할 수 있음
+#   (즉시 반영이 필요하면 IDENTITY_CACHE_TTL을 줄이거나 0으로 두어 캐시를 끔)
+
+IDENTITY_CACHE_TTL = float(os.getenv("IDENTITY_CACHE_TTL", "60"))
+IDENTITY_CACHE_MAX_BYTES = int(os.getenv("IDENTITY_CACHE_MAX_BYTES", str(4 * 1024 * 1024)))
+
+_cache = TTLCache(max_bytes = IDENTITY_CACHE_MAX_BYTES)
+_PENDING = "identity_cache_invalidate"
+
+
+def _key(name: str) -> str:
+    return f"user:{name}"
+
+
+def get_cached_user(name: str) -> UserRead | None:
+    data = _cache.get(_key(name))
+    return UserRead(**data) if data is not None else None
+
+
+def cache_user(user: UserRead):
+    _cache.set(_key(user.name), user.model_dump(), IDENTITY_CACHE_TTL)
+
+
+def invalidate_user(name: str):
+    _cache.delete(_key(name))
+
+
+def _user_query(name: str):
+    return select(models.User).where(models.User.name == name)
+
+
+def _remember(db_user) -> UserRead | None:
+    if db_user is None:
+        return None
+    user = UserRead.model_validate(db_user)
+    cache_user(user)
+    return user
+
+
+def fetch_user(db: Session,
+               name: str) -> UserRead | None:
+    """
+    DB에서 조회 후 캐시에 저장 (miss일 때)
+    없는 사용자는 캐시하지 않음 (곧 가입할 수 있으므로)
+    """
+    return _remember(db.scalars(_user_query(name)).first())
+
+
+async def fetch_user_async(db: AsyncSession,
+                           name: str) -> UserRead | None:
+    """
+    fetch_user의 AsyncSession 버전
+    """
+    return _remember((await db.scalars(_user_query(name))).first())
+
+
+def load_user(db: Session,
+              name: str) -> UserRead | None:
+    """
+    캐시에 있으면 DB 조회 없이 반환
+    """
+    return get_cached_user(name) or fetch_user(db, name)
+
+
+def identity_cache_stats() -> dict:
+    return _cache.stats()
+
+
+@event.listens_for(models.User, "after_update")
+@event.listens_for(models.User, "after_delete")
+def _mark_changed(mapper, connection, target):
+    session = object_session(target)
+    if session is None:
+        return
+    names = session.info.setdefault(_PENDING, set())
+    names.add(target.name)
+    names.update(inspect(target).attrs.name.history.deleted or ())   # 이름이 바뀐 경우 이전 이름
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session):
+    for name in session.info.pop(_PENDING, ()):
+        invalidate_user(name)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_pending(session, previous_transaction):
+    session.info.pop(_PENDING, None)
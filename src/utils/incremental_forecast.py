@@ -0,0 +1,133 @@
+import datetime
+import pandas as pd
+from .forecast_fields import DAILY_AGG, SLOT_FIELDS, slot_values
+
+# 예보 갱신 시 바뀐 3시간 slot만 반영하는 날짜별 집계
+# - 날짜는 city.timezone(초)을 더한 현지 날짜 기준
+# - 날짜마다 min/max/sum/count를 유지하고, 새 slot은 O(1)로 반영
+# - 빠지거나 바뀐 slot이 그 날의 최소/최대값이었을 때만 그 날(최대 8개 slot)을 다시 계산
+
+
+class _DayState:
+    __slots__ = ("slots", "count", "sums", "mins", "maxs")
+
+    def __init__(self):
+        self.slots: dict[int, tuple] = {}
+        self.count = 0
+        self.sums = [0] * len(SLOT_FIELDS)
+        self.mins = [None] * len(SLOT_FIELDS)
+        self.maxs = [None] * len(SLOT_FIELDS)
+
+    def add(self, dt: int, values: tuple):
+        self.slots[dt] = values
+        self.count += 1
+        for i, v in enumerate(values):
+            self.sums[i] += v
+            if self.mins[i] is None or v < self.mins[i]:
+                self.mins[i] = v
+            if self.maxs[i] is None or v > self.maxs[i]:
+                self.maxs[i] = v
+
+    def remove(self, dt: int):
+        values = self.slots.pop(dt)
+        self.count -= 1
+        if any(v == lo or v == hi for v, lo, hi in zip(values, self.mins, self.maxs)):
+            self._rebuild()   # 최소/최대값이 빠졌으면 남은 slot으로 다시 계산
+        else:
+            for i, v in enumerate(values):
+                self.sums[i] -= v
+
+    def _rebuild(self):
+        slots = self.slots
+        self.__init__()
+        for dt, values in slots.items():
+            self.add(dt, values)
+
+    def row(self) -> dict:
+        stats = {"min": self.mins, "max": self.maxs, "sum": self.sums,
+                 "mean": [s / self.count for s in self.sums]}
+        return {name: stats[func][SLOT_FIELDS.index(col)]
+                for name, (col, func) in DAILY_AGG.items()}
+
+
+class IncrementalDailyForecast:
+    """
+    같은 지역의 예보 payload를 계속 update() 하면
+    바뀐 slot만 반영해 날짜별 요약(process_forecast와 같은 column)을 유지
+
+    daily = IncrementalDailyForecast()
+    daily.update(get_forecast("서울", API_KEY))
+    daily.frame()
+    """
+
+    def __init__(self):
+        self.tz_offset: int | None = None
+        self._slots: dict[int, tuple] = {}          # dt(UTC epoch) -> 값
+        self._days: dict[datetime.date, _DayState] = {}
+        self._frame: pd.DataFrame | None = None
+        self.applied = 0                            # 누적 반영(추가/변경/삭제) slot 수
+
+    def local_date(self, dt: int) -> datetime.date:
+        return datetime.datetime.fromtimestamp(dt + (self.tz_offset or 0),
+                                               datetime.timezone.utc).date()
+
+    def update(self, data: dict) -> set[datetime.date]:
+        """
+        새 payload 반영 -> 값이 바뀐 현지 날짜 집합 반환
+        """
+        if data.get("cod") != "200" or "list" not in data:
+            raise ValueError(f"예보 데이터가 유효하지 않습니다: {data.get('message', 'list 없음')}")
+
+        tz_offset = data.get("city", {}).get("timezone", 0)
+        if tz_offset != self.tz_offset:
+            # 시간대가 바뀌면 날짜 경계가 모두 달라지므로 처음부터 다시
+            self.__init__()
+            self.tz_offset = tz_offset
+
+        incoming = {slot["dt"]: slot_values(slot) for slot in data["list"]}
+        changed: set[datetime.date] = set()
+
+        # 예보 구간에서 빠진 slot
+        for dt in self._slots.keys() - incoming.keys():
+            changed.add(self._remove(dt))
+
+        # 새로 생기거나 값이 바뀐 slot
+        for dt, values in incoming.items():
+            old = self._slots.get(dt)
+            if old == values:
+                continue
+            if old is not None:
+                self._remove(dt)
+            changed.add(self._add(dt, values))
+
+        if changed:
+            self._frame = None
+        return changed
+
+    def _add(self, dt: int, values: tuple) -> datetime.date:
+        date = self.local_date(dt)
+        self._slots[dt] = values
+        self._days.setdefault(date, _DayState()).add(dt, values)
+        self.applied += 1
+        return date
+
+    def _remove(self, dt: int) -> datetime.date:
+        date = self.local_date(dt)
+        del self._slots[dt]
+        day = self._days[date]
+        day.remove(dt)
+        if day.count == 0:
+            del self._days[date]
+        self.applied += 1
+        return date
+
+    def frame(self) -> pd.DataFrame:
+        """
+        날짜별 요약 DataFrame (index: 현지 날짜 datetime.date)
+        """
+        if self._frame is None:
+            dates = sorted(self._days)
+            self._frame = pd.DataFrame([self._days[d].row() for d in dates],
+                                       index = pd.Index(dates, name = "date"),
+                                       columns = list(DAILY_AGG))
+        return self._frame
@@ -0,0 +1,158 @@
+import threading
+import time
+from collections import deque
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from sqlalchemy.util import queue as sqla_queue
+
+# DB connection pool 계측
+# - checkout 대기 시간: pool 내부 queue.get(빈 connection을 기다리는 구간)을 감싸서 측정
+#   (pool_timeout까지 기다리다 실패하면 timeout으로 집계)
+# - checkout/checkin/connect/close/invalidate 이벤트로 사용 중/overflow 수, connection 나이
+# - pool_pre_ping 실패는 handle_error 이벤트(is_pre_ping)로 집계
+# engine.dispose()로 pool이 다시 만들어져도 같은 PoolMetrics를 이어서 사용
+
+
+class PoolMetrics:
+    """
+    pool 하나의 누적 계측값
+    """
+
+    def __init__(self,
+                 name: str,
+                 window: int = 1000):
+        self.name = name
+        self._lock = threading.Lock()
+        self._waits: deque[float] = deque(maxlen = window)   # 최근 checkout 대기 시간(초)
+        self._connected_at: dict[int, float] = {}           # id(connection record) -> 연결 시각
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.connects = 0
+        self.closes = 0
+        self.invalidations = 0
+        self.ping_failures = 0
+
+    def record_wait(self, seconds: float, timed_out: bool):
+        with self._lock:
+            self._waits.append(seconds)
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            self.timeouts += timed_out
+
+    def snapshot(self, pool) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            waits = sorted(self._waits)
+            ages = [now - connected_at for connected_at in self._connected_at.values()]
+            checkouts = self.checkouts
+
+            def percentile(q: float) -> float:
+                return round(waits[min(len(waits) - 1, int(q * len(waits)))] * 1000, 2) if waits else 0.0
+
+            return {
+                "pool": self.name,
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(0, pool.overflow()),
+                "max_overflow": pool._max_overflow,
+                "timeout": pool.timeout(),
+                "checkouts": checkouts,
+                "wait_ms": {"p50": percentile(0.5),
+                            "p95": percentile(0.95),
+                            "p99": percentile(0.99),
+                            "max": round(self.wait_max * 1000, 2),
+                            "avg": round(self.wait_total / len(self._waits) * 1000, 2) if self._waits else 0.0},
+                "timeouts": self.timeouts,
+                "connects": self.connects,
+                "closes": self.closes,
+                "invalidations": self.invalidations,
+                "ping_failures": self.ping_failures,
+                "connection_age_s": {"count": len(ages),
+                                     "max": round(max(ages), 1) if ages else 0.0,
+                                     "avg": round(sum(ages) / len(ages), 1) if ages else 0.0}
+            }
+
+
+class _InstrumentedPoolMixin:
+    metrics: PoolMetrics | None = None
+
+    def __init__(self, *args, **kw):
+        super().__init__(*args, **kw)
+        get = self._pool.get
+
+        def timed_get(block = True, timeout = None):
+            start = time.perf_counter()
+            timed_out = False
+            try:
+                return get(block, timeout)
+            except sqla_queue.Empty:
+                timed_out = block    # block=False면 overflow connection을 새로 만듦
+                raise
+            finally:
+                if self.metrics is not None:
+                    self.metrics.record_wait(time.perf_counter() - start, timed_out)
+
+        self._pool.get = timed_get
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def instrument(engine: Engine,
+               name: str) -> PoolMetrics:
+    """
+    Instrumented*QueuePool로 만든 engine에 계측 이벤트 연결
+    (async engine은 engine.sync_engine을 넘김)
+    """
+    metrics = PoolMetrics(name)
+    engine.pool.metrics = metrics
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, record):
+        with metrics._lock:
+            metrics.connects += 1
+            metrics._connected_at[id(record)] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def on_checkout(dbapi_connection, record, proxy):
+        with metrics._lock:
+            metrics.checkouts += 1
+
+    @event.listens_for(engine, "close")
+    @event.listens_for(engine, "detach")
+    def on_close(dbapi_connection, record):
+        with metrics._lock:
+            metrics.closes += 1
+            metrics._connected_at.pop(id(record), None)
+
+    @event.listens_for(engine, "invalidate")
+    def on_invalidate(dbapi_connection, record, exception):
+        with metrics._lock:
+            metrics.invalidations += 1
+
+    @event.listens_for(engine, "handle_error")
+    def on_error(context):
+        if getattr(context, "is_pre_ping", False):
+            with metrics._lock:
+                metrics.ping_failures += 1
+
+    return metrics
+
+
+def pool_stats(engine: Engine) -> dict | None:
+    metrics = getattr(engine.pool, "metrics", None)
+    return metrics.snapshot(engine.pool) if metrics is not None else None
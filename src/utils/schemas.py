@@ -1,4 +1,6 @@
-from pydantic import BaseModel, ConfigDict
+from datetime import date
+from typing import Literal
+from pydantic import BaseModel, ConfigDict, Field
 
 '''
 pydantic
@@ -17,4 +19,44 @@ class UserRead(BaseModel):
     name: str
     email: str
 
-    model_config = ConfigDict(from_attributes = True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes = True)
+
+class BulkUserConflict(BaseModel):
+    index: int          # 요청 목록에서의 위치
+    name: str
+    email: str
+    reason: str
+
+class BulkUserResult(BaseModel):
+    created: list[UserRead]
+    conflicts: list[BulkUserConflict]
+
+class AlertSubscriptionCreate(BaseModel):
+    city: str
+    metric: str                                     # forecast_fields.DAILY_AGG column (예: 강수량)
+    op: Literal[">", ">=", "<", "<="]
+    threshold: float
+    window_days: int = Field(7, ge = 0, le = 7)     # 오늘부터 며칠 뒤까지
+    min_days: int = Field(1, ge = 1, le = 8)        # 조건을 만족해야 하는 최소 일수
+
+class AlertSubscriptionRead(BaseModel):
+    id: int
+    location: str
+    metric: str
+    op: str
+    threshold: float
+    window_days: int
+    min_days: int
+    enabled: bool
+
+    model_config = ConfigDict(from_attributes = True)
+
+class AlertEvent(BaseModel):
+    rule_id: int
+    location: str
+    metric: str
+    op: str
+    threshold: float
+    first_date: date
+    matched_days: int
+    value: float
@@ -1,6 +1,27 @@
 import pandas as pd
 import streamlit as st
-import datetime
+from .forecast_fields import DAILY_AGG, flatten_slots
+from .alert_rules import evaluate_single
+
+
+def aggregate_daily(df: pd.DataFrame,
+                    by: str | list[str] = "date") -> pd.DataFrame:
+    """
+    펼쳐진 slot DataFrame을 by 기준으로 묶어 DAILY_AGG 집계
+
+    집계 18개를 따로 돌리지 않고 함수별로 한 번씩(min/max/mean/sum)
+    모든 column에 대해 계산한 뒤 필요한 조합만 골라냄
+    """
+    columns = list(dict.fromkeys(col for col, _ in DAILY_AGG.values()))
+    funcs = list(dict.fromkeys(func for _, func in DAILY_AGG.values()))
+    grouped = df.groupby(by)[columns]
+    stats = {func: getattr(grouped, func)() for func in funcs}
+
+    index = stats[funcs[0]].index
+    return pd.DataFrame({name: stats[func][col].to_numpy()
+                         for name, (col, func) in DAILY_AGG.items()},
+                        index = index)
+
 
 # 3. 가져온 날씨 데이터 가공
 def process_forecast(data: dict) -> pd.DataFrame:
@@ -10,117 +31,71 @@ def process_forecast(data: dict) -> pd.DataFrame:
     if data.get("cod") != "200" or "list" not in data:
         raise ValueError(f"예보 데이터가 유효하지 않습니다: {data.get('message', 'list 없음')}")
 
-    df = pd.DataFrame(data["list"])
+    df = pd.DataFrame(flatten_slots(data["list"]))
 
     # 날짜/시간 처리
         # dt_txt: "2025-10-26 12:00:00": str
         # pd.to_datetime: 날짜/시간 연산 가능
-    df["dt_txt"] = pd.to_datetime(df["dt_txt"])
-        # datetime에서 날짜(df["date"]부분만 추출)
-    df["date"] = df["dt_txt"].dt.date
-
-    # 기온 추출 (main은 dict)
-        # main column: {"temp: 15.3, "humidity": 60, ...} -> dict
-        # 그 중, temp 값만 뽑아서 temp column으로 생성
-    df["temp"] = df["main"].apply(lambda x: x["temp"])
-
-    df["feels_like"] = df["main"].apply(lambda x: x["feels_like"])
-
-
-    # rain / snow column이 없는 경우 None 처리
-    if "rain" not in df.columns:
-        df["rain"] = None
-    if "snow" not in df.columns:
-        df["snow"] = None
-
-    # rain column이 dict일 때만 "3h" 값을 꺼냄. 없으면 0
-    df["rain_3h"] = df["rain"].apply(lambda x: x.get('3h', 0) if isinstance(x, dict) else 0)
-
-    # snow column이 dict일 때만 "3h" 값을 꺼냄. 없으면 0
-    df["snow_3h"] = df["snow"].apply(lambda x: x.get('3h', 0) if isinstance(x, dict) else 0)
+    df["dt_txt"] = pd.to_datetime(df["dt_txt"], format = "%Y-%m-%d %H:%M:%S")
+        # 날짜 부분만 남김 (datetime64로 groupby 해야 python date 객체보다 빠름)
+    df["date"] = df["dt_txt"].dt.normalize()
 
-    # 습도
-    df["humidity"] = df["main"].apply(lambda x: x["humidity"])
+    # 날짜별 집계
+        # date기준 groupby -> 하루 단위로 묶음
+    daily = aggregate_daily(df)
+        # index는 기존과 같이 datetime.date
+    daily.index = pd.Index(daily.index.date, name = "date")
+    return daily
 
-    # 풍속
-    df["wind"] = df["wind"].apply(lambda x: x["speed"])
 
+def process_forecast_batch(payloads: dict[str, dict]) -> pd.DataFrame:
+    """
+    여러 지역의 예보를 하나의 DataFrame으로 합쳐 한 번에 집계
+    지역마다 process_forecast를 호출하지 않으므로 지역 수가 많을수록 유리
 
-    # 날짜별 집계
-        # date기준 groupby -> 하루 단위로 묶음
-        # temp column에 대해 min, max, mean을 계산
-    daily = (
-        df.groupby("date")
-          .agg(t_min=("temp", "min"),
-               t_max=("temp", "max"),
-               t_mean=("temp", "mean"),
-               flt_min=("feels_like", "min"),
-               flt_max=("feels_like", "max"),
-               flt_mean=("feels_like", "mean"),
-               hu_min=("humidity", "min"),
-               hu_max=("humidity", "max"),
-               hu_mean=("humidity", "mean"),
-               w_min=("wind", "min"),
-               w_max=("wind", "max"),
-               w_mean=("wind", "mean"),
-               rain=("rain_3h", "sum"),
-               mean_rain=("rain_3h", "mean"),
-               max_rain=("rain_3h", "max"),
-               snow=("snow_3h", "sum"),
-               mean_snow=("snow_3h", "mean"),
-               max_snow=("snow_3h", "max")
-               )
+    payloads: {지역 key: get_forecast 응답}
+    반환: (location, date) MultiIndex, column은 process_forecast와 동일
+    """
+    columns: dict[str, list] = {}
+    locations: list = []
+    for location, data in payloads.items():
+        if data.get("cod") != "200" or "list" not in data:
+            raise ValueError(f"예보 데이터가 유효하지 않습니다({location}): {data.get('message', 'list 없음')}")
+
+        flat = flatten_slots(data["list"])
+        for name, values in flat.items():
+            columns.setdefault(name, []).extend(values)
+        locations.extend([location] * len(flat["dt_txt"]))
+
+    if not locations:
+        raise ValueError("집계할 예보 데이터가 없습니다")
+
+    df = pd.DataFrame(columns)
+    df["location"] = locations
+    df["date"] = pd.to_datetime(df["dt_txt"], format = "%Y-%m-%d %H:%M:%S").dt.normalize()
+
+    daily = aggregate_daily(df, by = ["location", "date"])
+        # date level은 process_forecast와 같이 datetime.date
+    return daily.set_axis(
+        daily.index.set_levels(daily.index.levels[1].date, level = "date")
     )
 
-    # 사용자 친화적 column명으로 rename
-    daily = daily.rename(columns = {
-        "t_min": "최저기온",
-        "t_max": "최대기온",
-        "t_mean": "평균기온",
-        "flt_min": "최저체감기온",
-        "flt_max": "최대체감기온",
-        "flt_mean": "평균체감기온",
-        "hu_min": "최저습도",
-        "hu_max": "최대습도",
-        "hu_mean": "평균습도",
-        "w_min": "최저풍속",
-        "w_max": "최대풍속",
-        "w_mean": "평균풍속",
-        "rain": "강수량",
-        "mean_rain": "평균강수량",
-        "max_rain": "최대강수량",
-        "snow": "적설량",
-        "mean_snow": "평균적설량",
-        "max_snow": "최대적설량"
-    })
 
-    return daily
+def _has_alert(daily: pd.DataFrame,
+               metric: str) -> bool:
+    # 7일 이내 & metric > 0 (구독 알림과 같은 rule engine 사용)
+    return not evaluate_single(daily, metric, ">", 0, window_days = 7).empty
 
 
 def check_rain_alert(daily: pd.DataFrame):
-    today = datetime.date.today()
-    week_later = today + datetime.timedelta(days = 7)
-
-    # 7일 이내 & 강수량 > 0
-    rain_days = daily.loc[
-        (daily.index >= today) & (daily.index <= week_later) & (daily["강수량"] > 0)
-    ]
-
-    if not rain_days.empty:
+    if _has_alert(daily, "강수량"):
         st.warning(f'☔ 앞으로 7일 이내에 비오는 날이 있습니다!')
     else:
         st.info('☀️ 앞으로 7일이내에는 비 예보가 없습니다.')
 
 
 def check_snow_alert(daily: pd.DataFrame):
-    today = datetime.date.today()
-    week_later = today + datetime.timedelta(days = 7)
-
-    snow_days = daily.loc[
-        (daily.index >= today) & (daily.index <= week_later) & (daily["적설량"] > 0)
-    ]
-
-    if not snow_days.empty:
+    if _has_alert(daily, "적설량"):
         st.warning(f'❄️ 앞으로 7일 이내에 눈오는 날이 있습니다!')
     else:
-        st.info('☀️ 앞으로 7일이내에는 눈 예보가 없습니다.')
\ No newline at end of file
+        st.info('☀️ 앞으로 7일이내에는 눈 예보가 없습니다.')
@@ -0,0 +1,233 @@
+import logging
+import os
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from sqlalchemy import Integer, cast, func, insert, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.api import openweather
+from src.models import WeatherSlot
+from src.utils.forecast_fields import slot_values
+
+# 관측/예보 이력 저장 + 범위 조회
+# - openweather payload listener로 upstream에서 새로 받은 정상 응답을 행으로 변환해 쌓아두고
+#   background thread가 batch_size개 또는 flush_interval초마다 한 번에 INSERT (executemany)
+# - DB가 느리거나 내려가도 요청 경로는 막지 않음 (대기 행이 max_pending을 넘으면 오래된 것부터 버림)
+# - 조회는 (location, kind, ts) index 범위 조건 + DB에서 시간 구간별 집계
+
+logger = logging.getLogger(__name__)
+
+WEATHER_HISTORY_BATCH = int(os.getenv("WEATHER_HISTORY_BATCH", "500"))
+WEATHER_HISTORY_FLUSH_INTERVAL = float(os.getenv("WEATHER_HISTORY_FLUSH_INTERVAL", "5"))
+WEATHER_HISTORY_MAX_PENDING = int(os.getenv("WEATHER_HISTORY_MAX_PENDING", "50000"))
+
+OBSERVATION = "observation"
+FORECAST = "forecast"
+
+# 구간 길이(초), raw는 집계 없이 행 그대로
+RESOLUTIONS = {"raw": None, "hour": 60 * 60, "3h": 3 * 60 * 60, "day": 24 * 60 * 60}
+
+
+def coords_location(lat: float,
+                    lon: float) -> str:
+    lat, lon = openweather.normalize_coords(lat, lon)
+    return f"{lat},{lon}"
+
+
+def _row(location: str,
+         kind: str,
+         item: dict,
+         fetched_at: datetime,
+         period: str) -> dict:
+    temp, feels_like, humidity, wind, rain, snow = slot_values(item, period)
+    return {
+        "location": location,
+        "kind": kind,
+        "ts": datetime.fromtimestamp(item["dt"], timezone.utc),
+        "fetched_at": fetched_at,
+        "temp": temp,
+        "feels_like": feels_like,
+        "humidity": humidity,
+        "wind": wind,
+        "rain": rain,
+        "snow": snow,
+        "description": (item.get("weather") or [{}])[0].get("description")
+    }
+
+
+def rows_from_payload(key: str,
+                      data: dict,
+                      fetched_at: datetime | None = None) -> list[dict]:
+    """
+    캐시 key("forecast:seoul", "weather:seoul", "current:37.5:127.0")와 응답 -> weather_slots 행
+    """
+    fetched_at = fetched_at or datetime.now(timezone.utc)
+    kind, _, rest = key.partition(":")
+    if kind == "forecast":
+        return [_row(rest, FORECAST, slot, fetched_at, "3h")
+                for slot in data.get("list", []) if "dt" in slot]
+    if "dt" not in data:
+        return []
+    if kind == "weather":
+        return [_row(rest, OBSERVATION, data, fetched_at, "1h")]
+    if kind == "current":
+        return [_row(rest.replace(":", ","), OBSERVATION, data, fetched_at, "1h")]
+    return []
+
+
+class WeatherHistoryWriter:
+    """
+    writer = WeatherHistoryWriter(engine)
+    writer.start()       # flush thread 시작 + payload listener 등록
+    writer.stop()        # 남은 행 flush 후 종료
+    """
+
+    def __init__(self,
+                 engine: Engine,
+                 batch_size: int = WEATHER_HISTORY_BATCH,
+                 flush_interval: float = WEATHER_HISTORY_FLUSH_INTERVAL,
+                 max_pending: int = WEATHER_HISTORY_MAX_PENDING):
+        self.engine = engine
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending: deque[dict] = deque(maxlen = max_pending)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread: threading.Thread | None = None
+        self.written = 0
+        self.dropped = 0       # max_pending 초과로 버린 행
+        self.failed = 0        # INSERT 실패로 버린 행
+        self.batches = 0
+
+    def record(self,
+               key: str,
+               data: dict):
+        """
+        payload listener (요청 경로에서 호출되므로 변환 후 넣기만 함)
+        """
+        rows = rows_from_payload(key, data)
+        with self._lock:
+            overflow = len(self._pending) + len(rows) - self._pending.maxlen
+            if overflow > 0:
+                self.dropped += min(overflow, len(self._pending))
+            self._pending.extend(rows)
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def flush(self) -> int:
+        """
+        대기 중인 행을 batch_size개씩 INSERT -> 쓴 행 수
+        """
+        written = 0
+        while True:
+            with self._lock:
+                batch = [self._pending.popleft()
+                         for _ in range(min(self.batch_size, len(self._pending)))]
+            if not batch:
+                return written
+            try:
+                with self.engine.begin() as conn:
+                    conn.execute(insert(WeatherSlot), batch)
+            except Exception:
+                logger.exception("weather 이력 %d행 저장 실패", len(batch))
+                with self._lock:
+                    self.failed += len(batch)
+                continue
+            written += len(batch)
+            with self._lock:
+                self.written += len(batch)
+                self.batches += 1
+
+    def _run(self):
+        while not self._stopping:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+        self.flush()
+
+    def start(self):
+        self._stopping = False
+        self._thread = threading.Thread(target = self._run, name = "weather-history", daemon = True)
+        self._thread.start()
+        openweather.add_payload_listener(self.record)
+
+    def stop(self):
+        openweather.remove_payload_listener(self.record)
+        self._stopping = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"pending": len(self._pending),
+                    "written": self.written,
+                    "batches": self.batches,
+                    "dropped": self.dropped,
+                    "failed": self.failed}
+
+
+def _bucket(dialect: str,
+            seconds: int):
+    # 구간 시작 시각 (epoch 초, UTC 기준)
+    if dialect == "postgresql":
+        return func.floor(func.extract("epoch", WeatherSlot.ts) / seconds) * seconds
+    return cast(func.strftime("%s", WeatherSlot.ts), Integer) // seconds * seconds
+
+
+def to_utc(value: datetime) -> datetime:
+    # tz가 없으면 UTC로 간주 (SQLite는 tz 없이 저장), 있으면 UTC로 변환
+    return value.replace(tzinfo = timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+async def query_history(db: AsyncSession,
+                        location: str,
+                        start: datetime,
+                        end: datetime,
+                        resolution: str = "hour",
+                        kind: str = OBSERVATION,
+                        limit: int = 10_000) -> list[dict]:
+    """
+    location/kind의 [start, end) 구간 이력
+    resolution이 raw가 아니면 구간별 평균(기온은 최저/최고 포함)과 표본 수
+    """
+    seconds = RESOLUTIONS[resolution]
+    in_range = (WeatherSlot.location == location,
+                WeatherSlot.kind == kind,
+                WeatherSlot.ts >= to_utc(start),
+                WeatherSlot.ts < to_utc(end))
+
+    if seconds is None:
+        result = await db.execute(
+            select(WeatherSlot.ts, WeatherSlot.fetched_at, WeatherSlot.temp, WeatherSlot.feels_like,
+                   WeatherSlot.humidity, WeatherSlot.wind, WeatherSlot.rain, WeatherSlot.snow,
+                   WeatherSlot.description)
+            .where(*in_range)
+            .order_by(WeatherSlot.ts, WeatherSlot.fetched_at)
+            .limit(limit))
+        return [{**row._asdict(), "ts": to_utc(row.ts), "fetched_at": to_utc(row.fetched_at)}
+                for row in result]
+
+    bucket = _bucket(db.bind.dialect.name, seconds).label("bucket")
+    result = await db.execute(
+        select(bucket,
+               func.avg(WeatherSlot.temp).label("temp"),
+               func.min(WeatherSlot.temp).label("temp_min"),
+               func.max(WeatherSlot.temp).label("temp_max"),
+               func.avg(WeatherSlot.feels_like).label("feels_like"),
+               func.avg(WeatherSlot.humidity).label("humidity"),
+               func.avg(WeatherSlot.wind).label("wind"),
+               func.avg(WeatherSlot.rain).label("rain"),
+               func.avg(WeatherSlot.snow).label("snow"),
+               func.count().label("samples"))
+        .where(*in_range)
+        .group_by(bucket)
+        .order_by(bucket)
+        .limit(limit))
+    return [{"ts": datetime.fromtimestamp(int(row.bucket), timezone.utc),
+             **{name: value for name, value in row._asdict().items() if name != "bucket"}}
+            for row in result]
@@ -0,0 +1,58 @@
+import os
+
+# app/lifespan의 background 작업은 test에서 띄우지 않음 (import 전에 설정)
+os.environ.setdefault("WEATHER_HISTORY_ENABLED", "0")
+os.environ.setdefault("PREFETCH_ENABLED", "0")
+os.environ.setdefault("ALERTS_ENABLED", "0")
+os.environ.setdefault("ARGON2_MEMORY_COST", "8192")
+os.environ.setdefault("ARGON2_TIME_COST", "1")
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from src.database import Base
+from src import models  # noqa: F401  (table 등록)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """
+    같은 SQLite 파일을 sync engine(writer)과 aiosqlite engine(조회) 양쪽에서 사용
+    """
+    path = tmp_path / "test.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    engine.dispose()
+    return path
+
+
+@pytest.fixture
+def sync_engine(db_path):
+    engine = create_engine(f"sqlite:///{db_path}")
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def async_session_factory(db_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    yield async_sessionmaker(engine, expire_on_commit = False)
+    engine.sync_engine.dispose()
+
+
+@pytest.fixture
+def client(async_session_factory):
+    """
+    lifespan 없이 (with 없이) 만든 TestClient, DB는 test용 SQLite
+    """
+    from fastapi.testclient import TestClient
+    from src.app_fastapi import app
+    from src.database import get_async_db
+
+    async def get_test_db():
+        async with async_session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = get_test_db
+    yield TestClient(app)
+    app.dependency_overrides.clear()
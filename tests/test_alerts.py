@@ -0,0 +1,43 @@
+import datetime
+
+from sqlalchemy import insert
+
+from src import app_fastapi, models
+from src.api.openweather import BACKGROUND
+from src.app_fastapi import app, get_current_user
+from src.utils.schemas import UserRead
+
+
+def rainy_forecast() -> dict:
+    now = datetime.datetime.now(datetime.timezone.utc).replace(minute = 0, second = 0, microsecond = 0)
+    slot = {"dt": int(now.timestamp()), "dt_txt": now.strftime("%Y-%m-%d %H:%M:%S"),
+            "main": {"temp": 10, "feels_like": 8, "humidity": 90}, "wind": {"speed": 3},
+            "rain": {"3h": 2.5}}
+    return {"cod": "200", "list": [slot]}
+
+
+def test_my_alerts_prefers_cache_and_caps_fetches(client, sync_engine, monkeypatch):
+    locations = ["seoul", "a", "b", "c", "d"]
+    with sync_engine.begin() as conn:
+        conn.execute(insert(models.AlertSubscription),
+                     [{"user_id": 1, "location": location, "metric": "강수량", "op": ">",
+                       "threshold": 0, "window_days": 7, "min_days": 1, "enabled": True}
+                      for location in locations])
+
+    fetched = []
+
+    async def get_forecasts(city_names, API_KEY, limit = 10, priority = None):
+        fetched.append((list(city_names), priority))
+        return {city: rainy_forecast() for city in city_names}
+
+    # seoul만 캐시에 있음, 나머지 4곳 중 2곳만 upstream 호출 (background 예산)
+    monkeypatch.setattr(app_fastapi, "cached_forecast",
+                        lambda location: rainy_forecast() if location == "seoul" else None)
+    monkeypatch.setattr(app_fastapi.weather, "get_forecasts", get_forecasts)
+    monkeypatch.setattr(app_fastapi, "ALERT_ME_FETCH_LIMIT", 2)
+    app.dependency_overrides[get_current_user] = lambda: UserRead(id = 1, name = "kim", email = "kim@example.com")
+
+    response = client.get("/alerts/me")
+    assert response.status_code == 200
+    assert fetched == [(["a", "b"], BACKGROUND)]
+    assert sorted(event["location"] for event in response.json()) == ["a", "b", "seoul"]
@@ -0,0 +1,36 @@
+import pytest
+
+from src import app_fastapi
+from src.app_fastapi import app, get_current_user
+from src.utils.schemas import UserRead
+
+
+def login_as(name: str):
+    app.dependency_overrides[get_current_user] = lambda: UserRead(id = 1, name = name, email = f"{name}@example.com")
+
+
+USERS = [{"name": "kim", "email": "kim@example.com", "password": "pw-kim"},
+         {"name": "lee", "email": "lee@example.com", "password": "pw-lee"}]
+
+
+def test_bulk_requires_login(client):
+    assert client.post("/users/bulk", json = USERS).status_code == 401
+
+
+@pytest.mark.parametrize("admins", [frozenset(), frozenset({"admin"})])
+def test_bulk_rejects_non_admin(client, monkeypatch, admins):
+    monkeypatch.setattr(app_fastapi, "BULK_ADMIN_USERS", admins)
+    login_as("someone")
+
+    assert client.post("/users/bulk", json = USERS).status_code == 403
+
+
+def test_bulk_admin_creates_users(client, monkeypatch):
+    monkeypatch.setattr(app_fastapi, "BULK_ADMIN_USERS", frozenset({"admin"}))
+    login_as("admin")
+
+    response = client.post("/users/bulk", json = USERS + [USERS[0]])
+    assert response.status_code == 200
+    body = response.json()
+    assert [user["name"] for user in body["created"]] == ["kim", "lee"]
+    assert len(body["conflicts"]) == 1
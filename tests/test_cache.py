@@ -0,0 +1,140 @@
+import asyncio
+import threading
+import time
+
+import fakeredis
+import pytest
+
+from src.api.cache import TTLCache, SQLiteBackend, RedisBackend, cached_fetch, async_cached_fetch
+
+
+@pytest.fixture(params = ["sqlite", "redis"])
+def make_backend(request, tmp_path):
+    """
+    호출할 때마다 같은 저장소를 보는 새 backend (프로세스 여러 개를 흉내)
+    """
+    if request.param == "sqlite":
+        path = str(tmp_path / "cache.sqlite3")
+        return lambda: SQLiteBackend(path)
+    server = fakeredis.FakeServer()
+    return lambda: RedisBackend(fakeredis.FakeRedis(server = server))
+
+
+class SlowFetch:
+    def __init__(self, delay: float = 0.2, value = None):
+        self.delay = delay
+        self.value = value if value is not None else {"cod": 200}
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return self.value
+
+
+def run_threads(count: int, target) -> list:
+    results = [None] * count
+    barrier = threading.Barrier(count)
+
+    def run(index):
+        barrier.wait()
+        results[index] = target()
+
+    threads = [threading.Thread(target = run, args = (index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_single_flight_one_fetch(make_backend):
+    fetch = SlowFetch()
+    results = run_threads(8, lambda: cached_fetch(make_backend(), "forecast:seoul", 60, fetch, poll = 0.01))
+
+    assert fetch.calls == 1
+    assert results == [fetch.value] * 8
+    assert make_backend().get("forecast:seoul") == fetch.value
+
+
+def test_waiter_fetches_itself_when_holder_never_fills(make_backend):
+    # lock holder가 죽었는데 lock이 아직 만료되지 않음 -> wait초 뒤 직접 호출 (캐시에는 쓰지 않음)
+    assert make_backend().acquire_lock("forecast:seoul", 60) is not None
+    fetch = SlowFetch(delay = 0)
+
+    start = time.monotonic()
+    assert cached_fetch(make_backend(), "forecast:seoul", 60, fetch, wait = 0.2, poll = 0.02) == fetch.value
+    assert fetch.calls == 1
+    assert time.monotonic() - start >= 0.2
+
+
+def test_waiter_takes_over_expired_lock(make_backend):
+    # lock이 lock_ttl 뒤 만료되면 기다리던 쪽이 lock을 잡고 fetch + 캐시 저장
+    assert make_backend().acquire_lock("forecast:seoul", 0.1) is not None
+    fetch = SlowFetch(delay = 0)
+
+    assert cached_fetch(make_backend(), "forecast:seoul", 60, fetch, wait = 5, poll = 0.02) == fetch.value
+    assert fetch.calls == 1
+    assert make_backend().get("forecast:seoul") == fetch.value
+
+
+def test_waiters_fall_back_when_holder_fails():
+    # holder가 캐시할 수 없는 응답(실패)을 받으면 기다리던 쪽은 wait 뒤 각자 호출
+    backend = TTLCache()
+    fetch = SlowFetch(delay = 0.05, value = {"cod": 500})
+    results = run_threads(4, lambda: cached_fetch(backend, "forecast:seoul", 60, fetch,
+                                                  cacheable = lambda value: value["cod"] == 200,
+                                                  wait = 0.2, poll = 0.01))
+
+    assert results == [fetch.value] * 4
+    assert 1 < fetch.calls <= 4
+    assert backend.get("forecast:seoul") is None
+
+
+def test_refresh_overwrites_cached_value():
+    backend = TTLCache()
+    backend.set("forecast:seoul", {"cod": 200, "old": True}, 60)
+    fetch = SlowFetch(delay = 0)
+
+    assert cached_fetch(backend, "forecast:seoul", 60, fetch, refresh = True) == fetch.value
+    assert backend.get("forecast:seoul") == fetch.value
+
+
+def test_async_single_flight_runs_backend_off_loop(make_backend):
+    backend = make_backend()
+    loop_thread = threading.get_ident()
+    threads = set()
+    get = backend.get
+
+    def recording_get(key):
+        threads.add(threading.get_ident())
+        return get(key)
+
+    backend.get = recording_get
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.1)
+        return {"cod": 200}
+
+    async def main():
+        return await asyncio.gather(*(async_cached_fetch(backend, "forecast:seoul", 60, fetch, poll = 0.01)
+                                      for _ in range(8)))
+
+    assert asyncio.run(main()) == [{"cod": 200}] * 8
+    assert calls == 1
+    assert threads and loop_thread not in threads
+
+
+def test_async_waiter_fetches_itself_when_holder_never_fills(make_backend):
+    assert make_backend().acquire_lock("forecast:seoul", 60) is not None
+
+    async def fetch():
+        return {"cod": 200}
+
+    result = asyncio.run(async_cached_fetch(make_backend(), "forecast:seoul", 60, fetch, wait = 0.1, poll = 0.02))
+    assert result == {"cod": 200}
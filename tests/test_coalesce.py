@@ -0,0 +1,93 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.api.coalesce import SingleFlight, AsyncSingleFlight
+
+
+def test_single_flight_shares_one_call():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls = 0
+
+    def fetch():
+        nonlocal calls
+        calls += 1
+        started.set()
+        release.wait()
+        return {"cod": 200}
+
+    results = []
+    leader = threading.Thread(target = lambda: results.append(flight.do("forecast:seoul", fetch)))
+    leader.start()
+    started.wait()
+    waiters = [threading.Thread(target = lambda: results.append(flight.do("forecast:seoul", fetch)))
+               for _ in range(3)]
+    for thread in waiters:
+        thread.start()
+    while flight.stats()["coalesced"] < 3:
+        pass
+    release.set()
+    for thread in [leader, *waiters]:
+        thread.join()
+
+    assert calls == 1 and results == [{"cod": 200}] * 4
+    assert flight.stats() == {"calls": 4, "upstream": 1, "coalesced": 3, "in_flight": 0}
+
+
+def test_async_single_flight_shares_one_call():
+    flight = AsyncSingleFlight()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"cod": 200}
+
+    async def main():
+        return await asyncio.gather(*(flight.do("forecast:seoul", fetch) for _ in range(5)))
+
+    assert asyncio.run(main()) == [{"cod": 200}] * 5
+    assert calls == 1 and flight.stats()["in_flight"] == 0
+
+
+def test_async_leader_cancelled_waiter_still_gets_result():
+    flight = AsyncSingleFlight()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"cod": 200}
+
+    async def main():
+        leader = asyncio.create_task(flight.do("forecast:seoul", fetch))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(flight.do("forecast:seoul", fetch))
+        await asyncio.sleep(0)
+        leader.cancel()   # 먼저 온 client의 연결이 끊김
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await waiter
+
+    assert asyncio.run(main()) == {"cod": 200}
+    assert calls == 1
+
+
+def test_async_error_is_shared_and_entry_cleared():
+    flight = AsyncSingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream 실패")
+
+    async def main():
+        return await asyncio.gather(*(flight.do("forecast:seoul", fail) for _ in range(3)),
+                                    return_exceptions = True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert flight.stats()["in_flight"] == 0
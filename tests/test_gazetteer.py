@@ -0,0 +1,50 @@
+import pytest
+
+from src.api import gazetteer, openweather
+
+
+def test_failed_build_is_not_retried_until_interval(tmp_path, monkeypatch):
+    now = [100.0]
+    builds = []
+
+    def failing_build(cities, path):
+        builds.append(path)
+        raise OSError("read-only cache dir")
+
+    monkeypatch.setattr(gazetteer, "_gazetteer", None)
+    monkeypatch.setattr(gazetteer, "_failure", None)
+    monkeypatch.setattr(gazetteer, "GAZETTEER_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(gazetteer, "GAZETTEER_PATH", str(tmp_path / "missing.bin"))
+    monkeypatch.setattr(gazetteer, "GAZETTEER_RETRY_INTERVAL", 60)
+    monkeypatch.setattr(gazetteer, "build", failing_build)
+    monkeypatch.setattr(gazetteer.time, "monotonic", lambda: now[0])
+    monkeypatch.delenv("GAZETTEER_PATH", raising = False)
+
+    for _ in range(3):
+        with pytest.raises(OSError):
+            gazetteer.get_gazetteer()
+    assert len(builds) == 1
+
+    # 재시도 주기가 지나면 다시 build
+    now[0] += 61
+    with pytest.raises(OSError):
+        gazetteer.get_gazetteer()
+    assert len(builds) == 2
+
+    # gazetteer를 못 읽으면 도시 이름을 그대로 사용
+    assert openweather.normalize_city("서울") == "seoul"
+
+
+def test_request_resolves_city_once(monkeypatch):
+    calls = []
+    city = gazetteer.City(1835848, "Seoul", "서울", "KR", 37.566, 126.978, 10349312)
+
+    def resolve_city(city_name):
+        calls.append(city_name)
+        return city
+
+    monkeypatch.setattr(openweather, "resolve_city", resolve_city)
+    key, _, params = openweather.forecast_request("서울", "test-key")
+
+    assert calls == ["서울"]
+    assert key == "forecast:1835848" and params["id"] == 1835848
@@ -0,0 +1,29 @@
+import asyncio
+
+from src.utils import hashing
+
+
+def test_bulk_hashing_uses_its_own_pool():
+    before = hashing.hash_stats()
+
+    async def main():
+        hashed = await hashing.hash_passwords_async([f"pw-{i}" for i in range(6)], chunk_size = 2)
+        return hashed, await hashing.verify_password_async("pw-3", hashed[3])
+
+    try:
+        hashed, ok = asyncio.run(main())
+    finally:
+        hashing.shutdown_hash_pool()
+
+    after = hashing.hash_stats()
+    assert ok and len(hashed) == 6
+    assert after["bulk_completed"] - before["bulk_completed"] == 3
+    # login/가입 pool에는 verify 1건만
+    assert after["completed"] - before["completed"] == 1
+    assert after["in_flight"] == after["bulk_in_flight"] == 0
+
+
+def test_argon2_cost_only_from_env():
+    # conftest가 설정한 env만 적용되고 나머지는 passlib 기본값
+    assert hashing.ARGON2_SETTINGS == {"time_cost": 1, "memory_cost": 8192}
+    assert ",t=1," in hashing.hash_password("x") and "m=8192," in hashing.hash_password("x")
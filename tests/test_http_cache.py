@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from starlette.requests import Request
+
+from src.utils.http_cache import cached_json_response
+
+LAST_MODIFIED = datetime(2026, 10, 1, 12, 0, 30, 500_000, tzinfo = timezone.utc)
+
+
+def make_request(**headers) -> Request:
+    return Request({"type": "http", "method": "GET", "path": "/", "query_string": b"",
+                    "headers": [(name.replace("_", "-").encode(), value.encode())
+                                for name, value in headers.items()]})
+
+
+def respond(**headers):
+    return cached_json_response(make_request(**headers), {"city": "서울"}, LAST_MODIFIED, 60)
+
+
+def test_headers_and_etag_match():
+    response = respond()
+    assert response.status_code == 200
+    assert response.headers["last-modified"] == "Thu, 01 Oct 2026 12:00:30 GMT"
+    assert response.headers["cache-control"] == "public, max-age=60"
+
+    assert respond(if_none_match = response.headers["etag"]).status_code == 304
+    assert respond(if_none_match = 'W/"other", *').status_code == 304
+    assert respond(if_none_match = '"other"').status_code == 200
+
+
+@pytest.mark.parametrize("since, status", [
+    ("Thu, 01 Oct 2026 12:00:30 GMT", 304),
+    ("Thu, 01 Oct 2026 21:00:30 +0900", 304),
+    ("Thu, 01 Oct 2026 12:00:29 GMT", 200),
+    # 시간대 정보가 없는 "-0000"은 naive datetime으로 parse됨 -> UTC로 간주
+    ("Thu, 01 Oct 2026 12:00:30 -0000", 304),
+    ("Thu, 01 Oct 2026 12:00:29 -0000", 200),
+    ("not a date", 200),
+])
+def test_if_modified_since(since, status):
+    assert respond(if_modified_since = since).status_code == status
+
+
+def test_if_none_match_takes_precedence():
+    since = (LAST_MODIFIED + timedelta(days = 1)).strftime("%a, %d %b %Y %H:%M:%S GMT")
+    assert respond(if_none_match = '"other"', if_modified_since = since).status_code == 200
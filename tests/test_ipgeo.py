@@ -0,0 +1,20 @@
+from src.api.ipgeo import client_ip
+
+
+def test_client_ip_ignores_forwarded_for_by_default():
+    headers = {"x-forwarded-for": "1.2.3.4"}
+    assert client_ip(headers, "203.0.113.7") == "203.0.113.7"
+
+
+def test_client_ip_uses_trusted_proxy_hops():
+    # 사용자가 넣은 왼쪽 값(9.9.9.9)은 무시하고 proxy가 붙인 주소를 사용
+    headers = {"x-forwarded-for": "9.9.9.9, 1.2.3.4, 10.0.0.2"}
+    assert client_ip(headers, "10.0.0.3", hops = 1) == "10.0.0.2"
+    assert client_ip(headers, "10.0.0.3", hops = 2) == "1.2.3.4"
+    assert client_ip(headers, "10.0.0.3", hops = 5) == "9.9.9.9"
+
+
+def test_client_ip_invalid_or_missing():
+    assert client_ip({}, None) is None
+    assert client_ip({"x-forwarded-for": "not-an-ip"}, "10.0.0.3", hops = 1) is None
+    assert client_ip({}, "::ffff:1.2.3.4") == "::ffff:102:304"
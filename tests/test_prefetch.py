@@ -0,0 +1,88 @@
+from src.api.openweather import FORECAST_TTL, BACKGROUND
+from src.api.prefetch import PrefetchScheduler
+from src.api.ratelimit import QuotaGovernor, QuotaExceeded
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+class FakeForecast:
+    """
+    openweather.get_forecast 대신: governor 통과 시 정상 응답, 예산 부족이면 429 dict
+    """
+
+    def __init__(self, governor: QuotaGovernor | None = None):
+        self.governor = governor
+        self.calls: list[str] = []
+
+    def __call__(self, city: str) -> dict:
+        if self.governor is not None:
+            try:
+                self.governor.acquire(BACKGROUND)
+            except QuotaExceeded as e:
+                return {"cod": "429", "message": str(e)}
+        self.calls.append(city)
+        return {"cod": "200", "list": []}
+
+
+def make_scheduler(clock: FakeClock, fetch: FakeForecast, **kwargs) -> PrefetchScheduler:
+    return PrefetchScheduler("test-key", clock = clock, fetchers = {"forecast": fetch},
+                             lead_time = 60, **kwargs)
+
+
+def request(scheduler: PrefetchScheduler, city: str, times: int = 1):
+    for _ in range(times):
+        scheduler.record("forecast", f"forecast:{city}", (city,))
+
+
+def test_refreshes_only_popular_keys_before_expiry():
+    clock, fetch = FakeClock(), FakeForecast()
+    scheduler = make_scheduler(clock, fetch, top_n = 2)
+    request(scheduler, "seoul", 5)
+    request(scheduler, "busan", 3)
+    request(scheduler, "jeju", 1)
+
+    # 방금 채운 캐시는 아직 lead_time 밖
+    assert scheduler.run_once() == 0 and fetch.calls == []
+
+    # 만료 lead_time초 전 -> 인기 상위 2개만 갱신
+    clock.advance(FORECAST_TTL - 60)
+    assert scheduler.run_once() == 2
+    assert sorted(fetch.calls) == ["busan", "seoul"]
+
+    # 갱신한 key는 만료 시각이 다시 뒤로 밀림
+    fetch.calls.clear()
+    clock.advance(30)
+    assert scheduler.run_once() == 0 and fetch.calls == []
+    assert scheduler.stats()["refreshed"] == 2
+
+
+def test_backs_off_when_governor_denies():
+    clock = FakeClock()
+    # 분당 5회, background는 예산의 20%(1회)를 남겨 둠 -> background 4회까지만
+    governor = QuotaGovernor(per_minute = 5, per_day = 1000, clock = clock)
+    fetch = FakeForecast(governor)
+    scheduler = make_scheduler(clock, fetch, top_n = 10)
+    cities = [f"city{index}" for index in range(6)]
+    for index, city in enumerate(cities):
+        request(scheduler, city, 10 - index)
+
+    clock.advance(FORECAST_TTL - 60)
+    assert scheduler.run_once() == 4
+    # 예산 부족 응답을 받은 주기는 바로 중단 (남은 key는 호출하지 않음)
+    assert fetch.calls == cities[:4]
+    assert scheduler.stats()["skipped"] == 1
+    assert governor.stats()["shed"] == 1
+
+    # 예산이 다시 차면 다음 주기에 나머지를 갱신
+    clock.advance(60)
+    assert scheduler.run_once() == 2
+    assert fetch.calls == cities
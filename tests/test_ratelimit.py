@@ -0,0 +1,151 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.api import openweather, openweather_async
+from src.api.cache import TTLCache
+from src.api.ratelimit import QuotaGovernor, QuotaExceeded, INTERACTIVE, BACKGROUND
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+def test_budget_per_minute():
+    clock = FakeClock()
+    governor = QuotaGovernor(per_minute = 3, per_day = 1000, max_wait = 0, clock = clock)
+    for _ in range(3):
+        governor.acquire(INTERACTIVE)
+
+    with pytest.raises(QuotaExceeded):
+        governor.acquire(INTERACTIVE)
+    assert governor.stats()["rejected"] == 1
+
+    # 분당 3개 -> 20초에 1개씩 다시 채워짐
+    clock.advance(20)
+    governor.acquire(INTERACTIVE)
+    assert governor.stats()["granted"] == {INTERACTIVE: 4, BACKGROUND: 0}
+
+
+def test_budget_per_day():
+    clock = FakeClock()
+    governor = QuotaGovernor(per_minute = 100, per_day = 2, max_wait = 0, clock = clock)
+    governor.acquire(INTERACTIVE)
+    clock.advance(60)
+    governor.acquire(INTERACTIVE)
+    clock.advance(60)
+
+    with pytest.raises(QuotaExceeded):
+        governor.acquire(INTERACTIVE)
+
+
+def test_interactive_takes_precedence_over_background():
+    clock = FakeClock()
+    # 분당 10개 중 20%(2개)는 interactive 몫으로 남겨 둠
+    governor = QuotaGovernor(per_minute = 10, per_day = 1000, background_reserve = 0.2,
+                             max_wait = 0, clock = clock)
+    for _ in range(8):
+        governor.acquire(BACKGROUND)
+
+    with pytest.raises(QuotaExceeded):
+        governor.acquire(BACKGROUND)
+    governor.acquire(INTERACTIVE)
+    governor.acquire(INTERACTIVE)
+    stats = governor.stats()
+    assert stats["granted"] == {INTERACTIVE: 2, BACKGROUND: 8}
+    assert stats["shed"] == 1 and stats["rejected"] == 0
+
+
+def test_interactive_waits_for_token(monkeypatch):
+    clock = FakeClock()
+    governor = QuotaGovernor(per_minute = 1, per_day = 1000, max_wait = 5, clock = clock)
+    governor.acquire(INTERACTIVE)
+
+    # 다음 token까지 60초 > max_wait -> 기다리지 않고 포기
+    with pytest.raises(QuotaExceeded):
+        asyncio.run(governor.acquire_async(INTERACTIVE))
+    clock.advance(58)
+
+    async def sleep(seconds):
+        clock.advance(seconds)
+
+    # 남은 2초 < max_wait -> 기다린 뒤 통과 (대기는 fake clock으로)
+    monkeypatch.setattr(asyncio, "sleep", sleep)
+    asyncio.run(governor.acquire_async(INTERACTIVE))
+    assert governor.stats()["waited"] == 1
+
+
+@pytest.fixture
+def client_state(monkeypatch):
+    """
+    openweather 모듈의 캐시/governor를 test용으로 교체 (분당 1회, 대기 없음)
+    """
+    clock = FakeClock()
+    backend = TTLCache()
+    governor = QuotaGovernor(per_minute = 1, per_day = 1000, max_wait = 0, clock = clock)
+    monkeypatch.setattr(openweather, "_backend", backend)
+    monkeypatch.setattr(openweather, "_governor", governor)
+    return clock, backend, governor
+
+
+def test_stale_fallback_when_budget_exhausted(client_state):
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return {"cod": 200, "temp": len(calls)}
+
+    assert openweather._cached("forecast:seoul", 60, fetch) == {"cod": 200, "temp": 1}
+
+    # 예산 소진 + 캐시 만료 -> 마지막 정상 응답을 stale로 표시해 반환 (캐시에는 저장하지 않음)
+    stale = openweather._cached("forecast:seoul", 60, fetch, refresh = True)
+    assert stale == {"cod": 200, "temp": 1, "stale": True}
+    assert len(calls) == 1
+
+    # 정상 응답이 한 번도 없던 key는 429
+    assert str(openweather._cached("forecast:busan", 60, fetch)["cod"]) == "429"
+
+
+def test_async_stale_fallback_runs_backend_off_loop(client_state, monkeypatch):
+    _, backend, _ = client_state
+    threads = set()
+    get, set_ = backend.get, backend.set
+
+    # stale: key만 기록 (memory backend의 일반 캐시 조회는 event loop에서 바로 호출)
+    def recording_get(key):
+        if key.startswith(openweather.STALE_PREFIX):
+            threads.add(threading.get_ident())
+        return get(key)
+
+    def recording_set(key, value, ttl):
+        if key.startswith(openweather.STALE_PREFIX):
+            threads.add(threading.get_ident())
+        return set_(key, value, ttl)
+
+    listener_threads = []
+    monkeypatch.setattr(openweather, "_payload_listeners",
+                        [lambda key, data: listener_threads.append(threading.get_ident())])
+
+    async def fetch():
+        return {"cod": 200, "temp": 1}
+
+    async def main():
+        backend.get, backend.set = recording_get, recording_set
+        first = await openweather_async._cached("forecast:seoul", 60, fetch)
+        stale = await openweather_async._cached("forecast:seoul", 60, fetch, refresh = True)
+        return threading.get_ident(), first, stale
+
+    loop_thread, first, stale = asyncio.run(main())
+    assert first == {"cod": 200, "temp": 1}
+    assert stale == {"cod": 200, "temp": 1, "stale": True}
+    # stale 저장/조회와 payload listener는 event loop thread 밖에서
+    assert listener_threads and loop_thread not in listener_threads
+    assert threads and loop_thread not in threads
@@ -0,0 +1,148 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import select, func, text
+
+from src.api.openweather import normalize_city
+from src.models import WeatherSlot
+from src.weather_history import WeatherHistoryWriter, query_history, rows_from_payload, OBSERVATION, FORECAST
+
+
+def observation(ts: datetime, temp: float, rain: float = 0) -> dict:
+    return {"dt": int(ts.timestamp()),
+            "main": {"temp": temp, "feels_like": temp - 1, "humidity": 50},
+            "wind": {"speed": 2.0},
+            "rain": {"1h": rain},
+            "weather": [{"description": "맑음"}]}
+
+
+def utc(*args) -> datetime:
+    return datetime(*args, tzinfo = timezone.utc)
+
+
+# 2026-10-01 00시에 2개, 01시에 1개, 2026-10-02 05시에 1개
+OBSERVATIONS = [(utc(2026, 10, 1, 0, 10), 10.0),
+                (utc(2026, 10, 1, 0, 40), 20.0),
+                (utc(2026, 10, 1, 1, 20), 30.0),
+                (utc(2026, 10, 2, 5, 0), 40.0)]
+
+
+def record_observations(engine, location: str = "seoul") -> WeatherHistoryWriter:
+    writer = WeatherHistoryWriter(engine, batch_size = 2)
+    for ts, temp in OBSERVATIONS:
+        writer.record(f"weather:{location}", observation(ts, temp))
+    writer.flush()
+    return writer
+
+
+def test_rows_from_payload_forecast_slots():
+    data = {"list": [observation(utc(2026, 10, 1, 3), 10.0), observation(utc(2026, 10, 1, 6), 12.0)]}
+    data["list"][0]["rain"] = {"3h": 1.5}
+    rows = rows_from_payload("forecast:seoul", data)
+    assert [row["kind"] for row in rows] == [FORECAST, FORECAST]
+    assert rows[0]["rain"] == 1.5 and rows[1]["rain"] == 0
+    assert rows_from_payload("current:37.5:127.0", observation(utc(2026, 10, 1), 1.0))[0]["location"] == "37.5,127.0"
+
+
+def test_flush_writes_in_batches(sync_engine):
+    writer = record_observations(sync_engine)
+
+    assert writer.stats() == {"pending": 0, "written": 4, "batches": 2, "dropped": 0, "failed": 0}
+    with sync_engine.connect() as conn:
+        assert conn.scalar(select(func.count()).select_from(WeatherSlot)) == 4
+
+
+def test_flush_counts_failed_batches(sync_engine):
+    with sync_engine.begin() as conn:
+        conn.execute(text("DROP TABLE weather_slots"))
+    writer = WeatherHistoryWriter(sync_engine, batch_size = 10)
+    writer.record("weather:seoul", observation(utc(2026, 10, 1), 1.0))
+
+    assert writer.flush() == 0
+    assert writer.stats()["failed"] == 1 and writer.stats()["pending"] == 0
+
+
+def test_record_drops_oldest_over_max_pending(sync_engine):
+    writer = WeatherHistoryWriter(sync_engine, batch_size = 100, max_pending = 3)
+    for ts, temp in OBSERVATIONS:
+        writer.record("weather:seoul", observation(ts, temp))
+
+    assert writer.stats()["dropped"] == 1
+    writer.flush()
+    with sync_engine.connect() as conn:
+        assert sorted(conn.scalars(select(WeatherSlot.temp))) == [20.0, 30.0, 40.0]
+
+
+def run_query(session_factory, *args, **kwargs) -> list[dict]:
+    async def query():
+        async with session_factory() as db:
+            return await query_history(db, *args, **kwargs)
+    return asyncio.run(query())
+
+
+def test_query_history_hour_buckets(sync_engine, async_session_factory):
+    record_observations(sync_engine)
+    rows = run_query(async_session_factory, "seoul", utc(2026, 10, 1), utc(2026, 10, 3), "hour")
+
+    assert [row["ts"] for row in rows] == [utc(2026, 10, 1, 0), utc(2026, 10, 1, 1), utc(2026, 10, 2, 5)]
+    assert [row["samples"] for row in rows] == [2, 1, 1]
+    assert rows[0]["temp"] == pytest.approx(15.0)
+    assert (rows[0]["temp_min"], rows[0]["temp_max"]) == (10.0, 20.0)
+
+
+def test_query_history_day_buckets(sync_engine, async_session_factory):
+    record_observations(sync_engine)
+    rows = run_query(async_session_factory, "seoul", utc(2026, 10, 1), utc(2026, 10, 3), "day")
+
+    assert [row["ts"] for row in rows] == [utc(2026, 10, 1), utc(2026, 10, 2)]
+    assert [row["samples"] for row in rows] == [3, 1]
+    assert rows[0]["temp"] == pytest.approx(20.0)
+
+
+def test_query_history_raw_range_and_kind(sync_engine, async_session_factory):
+    record_observations(sync_engine)
+    # 끝은 포함하지 않음, naive 시각은 UTC로 간주
+    rows = run_query(async_session_factory, "seoul", datetime(2026, 10, 1, 0, 40), utc(2026, 10, 2, 5), "raw")
+    assert [row["temp"] for row in rows] == [20.0, 30.0]
+    assert rows[0]["ts"].tzinfo is not None
+
+    assert run_query(async_session_factory, "seoul", utc(2026, 10, 1), utc(2026, 10, 3), "raw",
+                     kind = FORECAST) == []
+
+
+def test_history_endpoint(sync_engine, client):
+    record_observations(sync_engine, normalize_city("서울"))
+    response = client.get("/weather/history", params = {"city": "서울",
+                                                         "start": "2026-10-01T00:00:00Z",
+                                                         "end": "2026-10-03T00:00:00Z",
+                                                         "resolution": "day"})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["location"] == normalize_city("서울") and body["kind"] == OBSERVATION
+    assert [row["samples"] for row in body["data"]] == [3, 1]
+
+
+@pytest.mark.parametrize("params", [
+    {"start": "2026-10-01T00:00:00", "end": "2026-10-03T00:00:00Z"},     # naive start, aware(UTC) end
+    {"start": "2026-10-01T00:00:00", "end": "2026-10-03T00:00:00+09:00"},
+    {"start": "2026-10-01T00:00:00+09:00", "end": "2026-10-03T00:00:00"},
+])
+def test_history_endpoint_mixed_naive_and_aware(sync_engine, client, params):
+    record_observations(sync_engine, normalize_city("서울"))
+    response = client.get("/weather/history", params = {"city": "서울", "resolution": "raw", **params})
+
+    assert response.status_code == 200
+    assert len(response.json()["data"]) >= 3
+
+
+@pytest.mark.parametrize("params", [
+    {},                                                                   # city / lat,lon 없음
+    {"city": "서울", "resolution": "minute"},
+    {"city": "서울", "kind": "alert"},
+    {"city": "서울", "start": "2026-10-03T00:00:00Z", "end": "2026-10-01T00:00:00Z"},
+    {"city": "서울", "start": "2024-01-01T00:00:00", "end": "2026-10-01T00:00:00Z"},
+])
+def test_history_endpoint_rejects_invalid(client, params):
+    assert client.get("/weather/history", params = params).status_code == 422